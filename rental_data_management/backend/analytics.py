@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from site_cache import cache_key
+
+# Columns feeding the rollup, in the order apply() expects
+ANALYTICS_COLUMNS = ['SITE', 'REGION', '`DIV`', 'STATUS', '`PRESENT RENT`', '`RENT DEPOSIT`',
+                     '`SQ.FT`', '`AGREEMENT VALID UPTO`']
+
+EXPIRY_WINDOWS = (30, 60, 90)
+
+
+def _empty_totals():
+    return {'count': 0, 'monthly_rent': 0.0, 'deposits': 0.0, 'sqft': 0}
+
+
+class PortfolioRollup:
+    """In-memory portfolio aggregates maintained incrementally on writes.
+
+    Each site's contribution is remembered so an update can subtract the old
+    values before adding the new ones. Totals are kept per (REGION, DIV,
+    STATUS) group and expiry dates are counted per day, so reads cost
+    O(groups + days in the widest expiry window) no matter how many sites exist.
+    """
+
+    def __init__(self, refresh_interval=300):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._sites = {}
+        self._groups = defaultdict(_empty_totals)
+        self._expiry = defaultdict(int)
+        self._loaded_at = None
+        self._invalidated_at = None
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    @property
+    def stale(self):
+        if self._loaded_at is None:
+            return True
+        if self._invalidated_at is not None and self._invalidated_at >= self._loaded_at:
+            return True
+        return time.monotonic() - self._loaded_at > self.refresh_interval
+
+    def invalidate(self):
+        """Mark for a full reload (used after bulk imports); reads keep the current totals until then."""
+        with self._lock:
+            self._invalidated_at = time.monotonic()
+
+    def load(self, rows, as_of=None):
+        """Rebuild from rows selected with ANALYTICS_COLUMNS.
+
+        as_of is the monotonic time the rows were read at; an invalidation
+        after it leaves the rollup stale. The new totals are built aside and
+        swapped in, so reads are answered from the old ones meanwhile.
+        """
+        fresh = PortfolioRollup(self.refresh_interval)
+        for row in rows:
+            fresh._add(row)
+        with self._lock:
+            self._sites, self._groups, self._expiry = fresh._sites, fresh._groups, fresh._expiry
+            self._loaded_at = as_of if as_of is not None else time.monotonic()
+
+    def apply(self, row):
+        """Insert or replace one site's contribution."""
+        with self._lock:
+            self._remove(cache_key(row[0]))
+            self._add(row)
+
+    def remove(self, site_id):
+        with self._lock:
+            self._remove(cache_key(site_id))
+
+    def _add(self, row):
+        site_id, region, div, status, rent, deposit, sqft, valid_upto = row
+        if isinstance(valid_upto, datetime):
+            valid_upto = valid_upto.date()
+        group = (region, div, status)
+        record = (group, float(rent or 0), float(deposit or 0), int(sqft or 0), valid_upto)
+        self._sites[cache_key(site_id)] = record
+        totals = self._groups[group]
+        totals['count'] += 1
+        totals['monthly_rent'] += record[1]
+        totals['deposits'] += record[2]
+        totals['sqft'] += record[3]
+        if valid_upto:
+            self._expiry[valid_upto] += 1
+
+    def _remove(self, key):
+        record = self._sites.pop(key, None)
+        if record is None:
+            return
+        group, rent, deposit, sqft, valid_upto = record
+        totals = self._groups[group]
+        totals['count'] -= 1
+        totals['monthly_rent'] -= rent
+        totals['deposits'] -= deposit
+        totals['sqft'] -= sqft
+        if totals['count'] == 0:
+            del self._groups[group]
+        if valid_upto:
+            self._expiry[valid_upto] -= 1
+            if self._expiry[valid_upto] == 0:
+                del self._expiry[valid_upto]
+
+    def summary(self, today=None):
+        today = today or date.today()
+        with self._lock:
+            groups = [(group, dict(totals)) for group, totals in self._groups.items()]
+            expiring = {}
+            running = 0
+            day = today
+            for window in EXPIRY_WINDOWS:
+                while day <= today + timedelta(days=window):
+                    running += self._expiry.get(day, 0)
+                    day += timedelta(days=1)
+                expiring[str(window)] = running
+
+        overall = _empty_totals()
+        by_region = defaultdict(_empty_totals)
+        by_div = defaultdict(_empty_totals)
+        by_status = defaultdict(_empty_totals)
+        for (region, div, status), totals in groups:
+            for bucket in (overall, by_region[region], by_div[div], by_status[status]):
+                for key, value in totals.items():
+                    bucket[key] += value
+
+        def finish(totals):
+            totals['monthly_rent'] = round(totals['monthly_rent'], 2)
+            totals['deposits'] = round(totals['deposits'], 2)
+            totals['avg_rent_per_sqft'] = round(totals['monthly_rent'] / totals['sqft'], 2) if totals['sqft'] else 0.0
+            return totals
+
+        return {
+            'totals': finish(overall),
+            'by_region': [dict(finish(totals), region=region) for region, totals in sorted(by_region.items())],
+            'by_div': [dict(finish(totals), div=div) for div, totals in sorted(by_div.items())],
+            'by_status': [dict(finish(totals), status=status) for status, totals in sorted(by_status.items())],
+            'expiring': expiring
+        }
@@ -0,0 +1,363 @@
+"""ASGI entry point: the same API served from an event loop.
+
+    uvicorn asgi:application --port 5000
+
+Run several with --workers like the gunicorn setup; see gunicorn.conf.py for
+what the worker processes share.
+
+Read endpoints that mostly wait on MySQL (site lookups and listings, batch
+lookups, JSON reports, analytics, projections, search) run as coroutines on
+an aiomysql pool, so one process can hold hundreds of in-flight queries
+without a thread each. They run inside a Flask request context, so JWT
+checks, ETags, compression, CORS and metrics are the same hooks the sync
+app uses. Every other route (writes, login, uploads, streamed exports) is
+the unchanged Flask view, run through asgiref on a pool of WSGI_THREADS
+threads (asgiref's default would run all of them on one shared thread).
+CPU-heavy steps are offloaded: projections to CPU_WORKERS threads here,
+search index and rollup reloads to a background thread, bcrypt to the
+credential verifier's pool and Excel parsing to the import workers.
+"""
+import asyncio
+import contextvars
+import functools
+import io
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, unquote
+
+import aiomysql
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from flask import current_app, jsonify, request
+from flask_jwt_extended import verify_jwt_in_request
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+
+import config
+import metrics
+from app import app
+from metrics import timed
+from projections import ProjectionTooLarge, parse_projection_args, summarize_projection
+from report_queries import build_report_query, build_summary_query
+from report_routes import parse_report_args, report_payload
+from responses import not_modified, tagged
+from services import versions, portfolio, portfolio_refresh, search_refresh
+from site_routes import (batch_lookup, batch_response, cache_site_rows, listing_page, parse_search_args,
+                         search_response, site_lookup, site_response)
+
+log = logging.getLogger('rental.asgi')
+
+ASYNC_DB_POOL_MIN = int(os.getenv('ASYNC_DB_POOL_MIN', '1'))
+ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', '50'))
+CPU_WORKERS = int(os.getenv('CPU_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Threads for the Flask views that have no async version; one sync pool connection each by default
+WSGI_THREADS = int(os.getenv('WSGI_THREADS', str(app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_size'])))
+
+
+class AsyncDatabase:
+    """An aiomysql connection pool opened and closed with the ASGI lifespan."""
+
+    def __init__(self, minsize=1, maxsize=50):
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self.pool = None
+
+    async def start(self):
+        self.pool = await aiomysql.create_pool(
+            host=config.DB_HOST, port=config.DB_PORT, db=config.DB_DATABASE,
+            user=config.DB_USER, password=config.DB_PASSWORD,
+            minsize=self.minsize, maxsize=self.maxsize, autocommit=True,
+            pool_recycle=app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_recycle']
+        )
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    async def fetchall(self, query, params=None):
+        """Run one query; return (description, rows), timed like TimedCursor."""
+        with timed('db_connect'):
+            conn = await self.pool.acquire()
+        try:
+            async with conn.cursor() as cursor:
+                with timed('db_execute'):
+                    await cursor.execute(query, params)
+                with timed('db_fetch'):
+                    rows = await cursor.fetchall()
+                return cursor.description, rows
+        finally:
+            self.pool.release(conn)
+
+    def stats(self):
+        if self.pool is None:
+            return {}
+        return {'size': self.pool.size, 'free': self.pool.freesize, 'maxsize': self.pool.maxsize}
+
+
+database = AsyncDatabase(ASYNC_DB_POOL_MIN, ASYNC_DB_POOL_SIZE)
+cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix='cpu')
+wsgi_executor = ThreadPoolExecutor(max_workers=WSGI_THREADS, thread_name_prefix='wsgi')
+metrics.registry.add_gauges('async_db_pool', 'aiomysql pool statistics', database.stats)
+
+
+async def run_cpu(fn, *args):
+    """Run fn on the CPU executor, keeping the request context (and its phase timings)."""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        cpu_executor, functools.partial(context.run, fn, *args))
+
+
+# Async versions of the read views. Each is the view of the same name in
+# site_routes.py or report_routes.py, sharing its argument parsing and
+# response building, with the blocking query awaited on the aiomysql pool.
+
+async def get_sites():
+    site_id, etag, read_versions, listing, response = site_lookup(request.args)
+    if response is not None:
+        return response
+
+    try:
+        if site_id:
+            description, rows = await database.fetchall("SELECT * FROM RENTDETAILS WHERE SITE = %s", (site_id,))
+            return site_response(description, rows[0] if rows else None, etag, read_versions)
+
+        query, params, sort, order, limit = listing
+        description, rows = await database.fetchall(query, params)
+        with timed('transform'):
+            page = listing_page(description, rows, sort, order, limit)
+        return tagged(jsonify(page), etag), 200
+    except Exception as e:
+        log.exception("SQL error")
+        return jsonify({'message': f'Database error: {str(e)}'}), 500
+
+async def get_sites_batch():
+    try:
+        requested, found, pending, read_versions = batch_lookup(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    if pending:
+        try:
+            placeholders = ', '.join(['%s'] * len(pending))
+            description, rows = await database.fetchall(
+                f"SELECT * FROM RENTDETAILS WHERE SITE IN ({placeholders})", pending)
+            with timed('transform'):
+                found.update(cache_site_rows(description, rows, read_versions))
+        except Exception as e:
+            log.exception("SQL error")
+            return jsonify({'message': f'Database error: {str(e)}'}), 500
+
+    return batch_response(requested, found)
+
+async def get_report():
+    try:
+        report_type, where, params = parse_report_args(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    etag = versions.table_etag()
+    unchanged = not_modified(etag)
+    if unchanged is not None:
+        return unchanged
+
+    try:
+        # Rows and rollup are independent queries, so they run concurrently
+        (query, keys), (summary_query, summary_keys) = (build_report_query(report_type, where),
+                                                        build_summary_query(report_type, where))
+        (description, rows), (summary_description, summary_rows) = await asyncio.gather(
+            database.fetchall(query, params), database.fetchall(summary_query, params))
+        payload = report_payload((description, rows, keys), (summary_description, summary_rows, summary_keys))
+        return tagged(jsonify(payload), etag), 200
+    except Exception as e:
+        log.exception("Report generation error")
+        return jsonify({'message': f'Error generating report: {str(e)}'}), 500
+
+async def get_analytics():
+    try:
+        # Same single-flight reload as the sync view; only a never-loaded rollup blocks
+        await run_cpu(portfolio_refresh.ensure)
+        return jsonify(portfolio.summary()), 200
+    except Exception as e:
+        log.exception("Analytics error")
+        return jsonify({'message': f'Error loading analytics: {str(e)}'}), 500
+
+async def get_projections():
+    try:
+        query, params, start, months, detail = parse_projection_args(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    try:
+        _, rows = await database.fetchall(query, params)
+        with timed('transform'):
+            result = await run_cpu(summarize_projection, rows, start, months, detail,
+                                   current_app.config['PROJECTION_MAX_DETAIL_CELLS'])
+        return jsonify(result), 200
+    except ProjectionTooLarge as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        log.exception("Projection error")
+        return jsonify({'message': f'Error generating projections: {str(e)}'}), 500
+
+async def search_sites():
+    try:
+        query, limit = parse_search_args(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    try:
+        await run_cpu(search_refresh.ensure)
+        return search_response(query, limit)
+    except Exception as e:
+        log.exception("Site search error")
+        return jsonify({'message': f'Error searching sites: {str(e)}'}), 500
+
+
+# Flask endpoint -> (async view, method, predicate on the query string deciding whether it applies).
+# Only that method is routed here: OPTIONS is exempt from verify_jwt_in_request and
+# HEAD would run the view too, so both are left to Flask.
+ASYNC_VIEWS = {
+    'sites.get_sites': (get_sites, 'GET', None),
+    'sites.get_sites_batch': (get_sites_batch, 'POST', None),
+    # Streamed formats stay on the sync view, which reads through a server-side cursor
+    'reports.get_report': (get_report, 'GET', lambda args: args.get('format', 'json') == 'json'),
+    'reports.get_analytics': (get_analytics, 'GET', None),
+    'reports.get_projections': (get_projections, 'GET', None),
+    'sites.search_sites': (search_sites, 'GET', None)
+}
+
+
+def build_environ(scope, body):
+    """A WSGI environ for an ASGI http scope, so Flask can build its request from it."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': unquote(scope['path'], errors='surrogateescape').encode('utf-8', 'surrogateescape').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+        else:
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class ThreadedWsgiToAsgiInstance(WsgiToAsgiInstance):
+    # asgiref runs the WSGI app thread-sensitively, i.e. every request on one
+    # shared thread; these requests are independent, so they get a pool
+    run_wsgi_app = sync_to_async(WsgiToAsgiInstance.__dict__['run_wsgi_app'].func,
+                                 thread_sensitive=False, executor=wsgi_executor)
+
+
+class ThreadedWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi serving requests concurrently on wsgi_executor."""
+
+    async def __call__(self, scope, receive, send):
+        await ThreadedWsgiToAsgiInstance(self.wsgi_application, self.duplicate_header_limit)(
+            scope, receive, send)
+
+
+class AsyncApp:
+    """Routes requests to the async views, falling back to the Flask app."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.fallback = ThreadedWsgiToAsgi(flask_app)
+        self.url_adapter = flask_app.url_map.bind('localhost')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        view = self.match(scope) if scope['type'] == 'http' else None
+        if view is None:
+            return await self.fallback(scope, receive, send)
+        return await self.dispatch(view, scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await database.start()
+                except Exception as e:
+                    log.exception("Could not open the async MySQL pool")
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                self.flask_app.extensions['warmup'].start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await database.close()
+                cpu_executor.shutdown(wait=False)
+                wsgi_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def match(self, scope):
+        try:
+            endpoint, _ = self.url_adapter.match(scope['path'], scope['method'])
+        except HTTPException:
+            return None  # 404/405/redirects are rendered by Flask
+        view, method, applies = ASYNC_VIEWS.get(endpoint, (None, None, None))
+        if view is None or method != scope['method'] or database.pool is None:
+            return None
+        if applies is not None and not applies(MultiDict(parse_qsl(scope['query_string'].decode('latin-1')))):
+            return None
+        return view
+
+    async def dispatch(self, view, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.extend(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+
+        flask_app = self.flask_app
+        # Request contexts live in context variables, so each request's task has its own
+        with flask_app.request_context(build_environ(scope, bytes(body))):
+            try:
+                try:
+                    rv = flask_app.preprocess_request()
+                    if rv is None:
+                        verify_jwt_in_request()
+                        rv = await view()
+                except Exception as e:
+                    rv = flask_app.handle_user_exception(e)
+            except Exception as e:
+                rv = flask_app.handle_exception(e)
+            response = flask_app.finalize_request(rv)
+
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                        for name, value in response.headers.items()]
+        })
+        await send({'type': 'http.response.body', 'body': response.get_data()})
+
+
+application = AsyncApp(app)
@@ -0,0 +1,112 @@
+import logging
+import time
+import uuid
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt, get_jwt_identity
+from credentials import VerifierBusy
+from extensions import get_db_connection, jwt
+from services import revoked_tokens, verifier
+
+log = logging.getLogger('rental.api')
+
+bp = Blueprint('auth', __name__)
+
+@jwt.token_in_blocklist_loader
+def token_revoked(jwt_header, jwt_payload):
+    # Purely in-memory, so protected routes authenticate without touching the database
+    family = jwt_payload.get('family')
+    if family and revoked_tokens.is_revoked(f'family:{family}'):
+        return True
+    is_refresh = jwt_payload.get('type') == 'refresh'
+    grace = current_app.config['JWT_REFRESH_REUSE_GRACE'] if is_refresh else 0
+    if not revoked_tokens.is_revoked(jwt_payload['jti'], grace):
+        return False
+    if family and is_refresh:
+        # A rotated-out refresh token was replayed: end the whole session
+        log.warning("Refresh token reuse", extra={'fields': {'username': jwt_payload.get('sub')}})
+        revoke_family(family)
+    return True
+
+def revoke_family(family):
+    expires_at = time.time() + current_app.config['JWT_REFRESH_TOKEN_EXPIRES'].total_seconds()
+    revoked_tokens.revoke(f'family:{family}', expires_at)
+
+def issue_tokens(username, role, family=None):
+    """Access and refresh tokens sharing a family id, so logout revokes both."""
+    claims = {'role': role, 'family': family or uuid.uuid4().hex}
+    return {
+        'access_token': create_access_token(identity=username, additional_claims=claims),
+        'refresh_token': create_refresh_token(identity=username, additional_claims=claims)
+    }
+
+@bp.route('/api/auth/login', methods=['POST'])
+def login():
+    try:
+        data = request.get_json()
+        log.info("Login attempt", extra={'fields': {'username': data['username']}})
+        
+        # Accounts, including the default krishna/kuber admins, live in USERS (see init_db.py)
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            # Query for user
+            cursor.execute("SELECT password, role FROM USERS WHERE username = %s", (data['username'],))
+            user_data = cursor.fetchone()
+            
+            if user_data:
+                # bcrypt runs on the verifier's worker pool, or not at all on a cache hit
+                ok, new_hash = verifier.verify(data['username'], data['password'], user_data[0])
+                
+                if ok:
+                    if new_hash:
+                        # Transparently upgrade hashes made with a different BCRYPT_ROUNDS
+                        cursor.execute(
+                            "UPDATE USERS SET password = %s WHERE username = %s AND password = %s",
+                            (new_hash, data['username'], user_data[0])
+                        )
+                        conn.commit()
+                    return jsonify(dict(issue_tokens(data['username'], user_data[1]), user={
+                        'username': data['username'],
+                        'role': user_data[1]
+                    })), 200
+            
+            log.info("Invalid credentials", extra={'fields': {'username': data['username']}})
+            return jsonify({'message': 'Invalid credentials'}), 401
+            
+        except VerifierBusy as e:
+            return jsonify({'message': str(e)}), 503
+        except Exception:
+            log.exception("Database error during login")
+            return jsonify({'message': 'Invalid credentials'}), 401
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+                
+    except Exception:
+        log.exception("Login error")
+        return jsonify({'message': 'An error occurred during login'}), 500
+
+@bp.route('/api/auth/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    # Rotate: the presented refresh token is spent and a new pair is issued.
+    # Check and spend in one step, so a concurrent reuse cannot slip between them.
+    claims = get_jwt()
+    if not revoked_tokens.rotate(claims['jti'], claims['exp'], current_app.config['JWT_REFRESH_REUSE_GRACE']):
+        log.warning("Refresh token reuse", extra={'fields': {'username': claims.get('sub')}})
+        if claims.get('family'):
+            revoke_family(claims['family'])
+        return jsonify({'msg': 'Token has been revoked'}), 401
+    return jsonify(issue_tokens(get_jwt_identity(), claims.get('role'), claims.get('family'))), 200
+
+@bp.route('/api/auth/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    claims = get_jwt()
+    revoked_tokens.revoke(claims['jti'], claims['exp'])
+    if claims.get('family'):
+        revoke_family(claims['family'])
+    return jsonify({'message': 'Logged out'}), 200
@@ -0,0 +1,570 @@
+"""Reproducible API benchmark against a disposable local MySQL database.
+
+Creates a scratch database (BENCH_DB_DATABASE, default RENT_BENCH) on the
+configured MySQL server, seeds RENTDETAILS with a synthetic portfolio, then
+drives the API through the Flask test client and reports p50/p95/p99 latency
+and sequential throughput per scenario. --mode asgi drives the async entry
+point (asgi.py) in-process instead, so the two can be compared directly.
+
+    python benchmark.py --sites 10000 --output baseline.json
+    python benchmark.py --sites 10000 --compare baseline.json
+    python benchmark.py --sites 10000 --mode asgi --concurrency 50 --compare baseline.json
+
+The queries use MySQL-only SQL (DATE_FORMAT, WITH ROLLUP, ON DUPLICATE KEY),
+so a real MySQL server is required; the scratch database is dropped afterwards
+unless --keep is given.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from io import BytesIO
+
+import pymysql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BENCH_DATABASE = os.getenv('BENCH_DB_DATABASE', 'RENT_BENCH')
+BENCH_USER = 'bench'
+BENCH_PASSWORD = 'bench@123'
+
+REGIONS = ['NORTH', 'SOUTH', 'EAST', 'WEST', 'CENTRAL']
+DIVS = ['D1', 'D2', 'D3', 'D4']
+STATUSES = ['ACTIVE', 'ACTIVE', 'ACTIVE', 'CLOSED']
+SEED_BATCH_SIZE = 1000
+UPLOAD_POLL_INTERVAL = 0.05
+
+
+def synthetic_site(rng, site_id):
+    """One RENTDETAILS row keyed by column name, deterministic for a given rng state."""
+    from excel_import import RENTDETAILS_SCHEMA
+
+    agreement = date(2015, 1, 1) + timedelta(days=rng.randrange(3650))
+    lease_period = rng.choice([3, 5, 9, 11])
+    effective = agreement + timedelta(days=rng.randrange(0, 120))
+    amount = round(rng.uniform(15000, 250000), 2)
+    hike_pct = rng.choice([5.0, 10.0, 15.0])
+    hike_year = rng.choice([1, 3])
+    owners = rng.randrange(1, 4)
+    row = {
+        'SITE': site_id,
+        'STORE NAME': f'Store {site_id}',
+        'REGION': rng.choice(REGIONS),
+        'DIV': rng.choice(DIVS),
+        'MANAGER': f'Manager {rng.randrange(500)}',
+        'ASST.MANAGER': f'Asst {rng.randrange(500)}',
+        'EXECUTIVE': f'Executive {rng.randrange(200)}',
+        'D.O.O': agreement + timedelta(days=rng.randrange(30, 90)),
+        'SQ.FT': rng.randrange(400, 6000),
+        'AGREEMENT DATE': agreement,
+        'RENT POSITION DATE': effective,
+        'RENT EFFECTIVE DATE': effective,
+        'AGREEMENT VALID UPTO': agreement + timedelta(days=365 * lease_period),
+        'CURRENT DATE': date.today(),
+        'LEASE PERIOD': lease_period,
+        'RENT_FREE_PERIOD_DAYS': rng.choice([0, 30, 60, 90]),
+        'RENT EFFECTIVE AMOUNT': amount,
+        'PRESENT RENT': round(amount * (1 + hike_pct / 100) ** rng.randrange(0, 4), 2),
+        'HIKE %': hike_pct,
+        'HIKE YEAR': hike_year,
+        'RENT DEPOSIT': round(amount * rng.choice([3, 6, 10]), 2),
+        'OWNER MOBILE NUMBER': f'9{rng.randrange(10 ** 9):09d}',
+        'CURRENT DATE 1': None,
+        'VALIDITY DATE': None,
+        'GST_NUMBER': f'GST{rng.randrange(10 ** 12):012d}',
+        'PAN_NUMBER': f'PAN{rng.randrange(10 ** 7):07d}',
+        'TDS_PERCENTAGE': rng.choice([0.0, 2.0, 10.0]),
+        'MATURE': rng.choice(['YES', 'NO']),
+        'STATUS': rng.choice(STATUSES),
+        'REMARKS': None
+    }
+    for i in range(1, 7):
+        row[f'OWNER NAME-{i}'] = f'Owner {rng.randrange(10000)}' if i <= owners else None
+    return {column: row[column] for column in RENTDETAILS_SCHEMA}
+
+
+def server_connection(database=None):
+    return pymysql.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        port=int(os.getenv('DB_PORT', '3306')),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', '2#06A9a'),
+        database=database
+    )
+
+
+def setup_database(sites, seed):
+    """Recreate the scratch database, apply migrations and seed the portfolio."""
+    import create_mysql_db
+    import migrate
+    from credentials import hash_password
+    from excel_import import RENTDETAILS_SCHEMA, build_insert_query
+
+    conn = server_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{BENCH_DATABASE}`")
+    finally:
+        conn.close()
+
+    create_mysql_db.create_database(BENCH_DATABASE)
+    migrate.migrate()
+
+    rng = random.Random(seed)
+    columns = list(RENTDETAILS_SCHEMA)
+    query = build_insert_query(columns)
+    conn = server_connection(BENCH_DATABASE)
+    try:
+        with conn.cursor() as cursor:
+            print(f"Seeding {sites} sites...")
+            batch = []
+            for n in range(sites):
+                batch.append(tuple(synthetic_site(rng, f'B{n:07d}').values()))
+                if len(batch) == SEED_BATCH_SIZE:
+                    cursor.executemany(query, batch)
+                    batch = []
+            if batch:
+                cursor.executemany(query, batch)
+            cursor.execute(
+                "INSERT INTO USERS (username, password, role) VALUES (%s, %s, %s)",
+                (BENCH_USER, hash_password(BENCH_PASSWORD), 'admin')
+            )
+            cursor.execute("ANALYZE TABLE RENTDETAILS")
+            cursor.fetchall()
+            cursor.execute("SELECT VERSION()")
+            version = cursor.fetchone()[0]
+        conn.commit()
+    finally:
+        conn.close()
+    return version
+
+
+def drop_database():
+    conn = server_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{BENCH_DATABASE}`")
+    finally:
+        conn.close()
+
+
+def upload_file(rng, prefix, rows, extension):
+    """Write an upload in the same column layout the import expects."""
+    from excel_import import RENTDETAILS_SCHEMA
+
+    fd, path = tempfile.mkstemp(suffix=extension)
+    os.close(fd)
+    header = list(RENTDETAILS_SCHEMA)
+    data = (list(synthetic_site(rng, f'{prefix}{n:06d}').values()) for n in range(rows))
+    if extension == '.csv':
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for row in data:
+                writer.writerow(['' if value is None else value for value in row])
+    else:
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(header)
+        for row in data:
+            sheet.append(row)
+        workbook.save(path)
+    return path
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies, errors):
+    values = sorted(latencies)
+    total = sum(values)
+    return {
+        'count': len(values),
+        'errors': errors,
+        'mean_ms': round(total / len(values) * 1000, 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if values else 0.0,
+        'throughput_rps': round(len(values) / total, 2) if total else 0.0
+    }
+
+
+class AsgiClient:
+    """Test-client style get/post/put against an ASGI app on a background event loop.
+
+    Requests are built with werkzeug's EnvironBuilder, like the Flask test
+    client, and may be issued from several threads at once.
+    """
+
+    def __init__(self, asgi_app, response_class):
+        self.asgi_app = asgi_app
+        self.response_class = response_class
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        self._shutdown = asyncio.Event()
+        self._call(self._start())
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def _start(self):
+        ready = self.loop.create_future()
+        messages = iter([{'type': 'lifespan.startup'}])
+
+        async def receive():
+            message = next(messages, None)
+            if message is None:
+                await self._shutdown.wait()
+                return {'type': 'lifespan.shutdown'}
+            return message
+
+        async def send(message):
+            if message['type'].startswith('lifespan.startup'):
+                ready.set_result(message)
+
+        self._lifespan = self.loop.create_task(self.asgi_app({'type': 'lifespan'}, receive, send))
+        message = await ready
+        if message['type'] != 'lifespan.startup.complete':
+            raise RuntimeError(message.get('message', 'ASGI startup failed'))
+
+    def close(self):
+        async def stop():
+            self._shutdown.set()
+            await self._lifespan
+        self._call(stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+    async def _request(self, environ):
+        body = environ['wsgi.input'].read()
+        headers = [(b'content-type', environ['CONTENT_TYPE'].encode('latin-1'))] if environ.get('CONTENT_TYPE') else []
+        headers += [(key[5:].replace('_', '-').lower().encode('latin-1'), value.encode('latin-1'))
+                    for key, value in environ.items() if key.startswith('HTTP_')]
+        headers.append((b'content-length', str(len(body)).encode('latin-1')))
+        scope = {
+            'type': 'http', 'http_version': '1.1', 'method': environ['REQUEST_METHOD'],
+            'scheme': 'http', 'path': environ['PATH_INFO'], 'root_path': '',
+            'query_string': environ['QUERY_STRING'].encode('latin-1'), 'headers': headers,
+            'server': ('localhost', 80), 'client': ('127.0.0.1', 0)
+        }
+        sent = False
+        status, response_headers, chunks = 500, [], []
+
+        async def receive():
+            nonlocal sent
+            if sent:
+                await self._shutdown.wait()
+                return {'type': 'http.disconnect'}
+            sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message):
+            nonlocal status, response_headers
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                response_headers = [(name.decode('latin-1'), value.decode('latin-1'))
+                                    for name, value in message.get('headers', [])]
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+
+        await self.asgi_app(scope, receive, send)
+        return self.response_class(b''.join(chunks), status=status, headers=response_headers)
+
+    def open(self, path, method, **kwargs):
+        from werkzeug.test import EnvironBuilder
+        builder = EnvironBuilder(path=path, method=method, **kwargs)
+        try:
+            environ = builder.get_environ()
+        finally:
+            builder.close()
+        return self._call(self._request(environ))
+
+    def get(self, path, **kwargs):
+        return self.open(path, 'GET', **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.open(path, 'POST', **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.open(path, 'PUT', **kwargs)
+
+
+class Bench:
+    def __init__(self, client, iterations, warmup):
+        self.client = client
+        self.iterations = iterations
+        self.warmup = warmup
+        self.results = {}
+        self.headers = {}
+
+    def run(self, name, call, expect=200, iterations=None, before=None):
+        """Time call() sequentially; before() runs untimed ahead of each call."""
+        iterations = iterations or self.iterations
+        latencies = []
+        errors = 0
+        for i in range(self.warmup + iterations):
+            if before:
+                before()
+            start = time.perf_counter()
+            response = call()
+            response.get_data()
+            elapsed = time.perf_counter() - start
+            if response.status_code != expect:
+                errors += 1
+            if i >= self.warmup:
+                latencies.append(elapsed)
+        self.results[name] = summarize(latencies, errors)
+        result = self.results[name]
+        print(f"{name:48} p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+              f"p99 {result['p99_ms']:9.2f} ms  {result['throughput_rps']:8.1f} req/s"
+              + (f"  errors {errors}" if errors else ''))
+
+    def run_concurrent(self, name, call, concurrency, iterations=None):
+        """Time iterations calls issued from concurrency threads; throughput is wall-clock."""
+        iterations = iterations or self.iterations
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+
+        def timed_call(_):
+            nonlocal errors
+            start = time.perf_counter()
+            response = call()
+            response.get_data()
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code != 200:
+                    errors += 1
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(timed_call, range(self.warmup)))
+            latencies.clear()
+            started = time.perf_counter()
+            list(executor.map(timed_call, range(iterations)))
+            wall = time.perf_counter() - started
+        result = self.results[name] = summarize(latencies, errors)
+        result['throughput_rps'] = round(len(latencies) / wall, 2) if wall else 0.0
+        print(f"{name:48} p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+              f"p99 {result['p99_ms']:9.2f} ms  {result['throughput_rps']:8.1f} req/s"
+              + (f"  errors {errors}" if errors else ''))
+
+    def get(self, url):
+        return self.client.get(url, headers=self.headers)
+
+
+def run_scenarios(client, sites, args):
+    from report_queries import REPORTS
+    from services import site_cache
+
+    bench = Bench(client, args.requests, args.warmup)
+    rng = random.Random(args.seed + 1)
+    credentials = {'username': BENCH_USER, 'password': BENCH_PASSWORD}
+
+    bench.run('login', lambda: client.post('/api/auth/login', json=credentials))
+    token = client.post('/api/auth/login', json=credentials).get_json()['access_token']
+    bench.headers = {'Authorization': f'Bearer {token}'}
+
+    def random_site():
+        return f'B{rng.randrange(sites):07d}'
+
+    bench.run('get_sites single (uncached)', lambda: bench.get(f'/api/sites?site_id={random_site()}'),
+              before=site_cache.clear)
+    hot_site = random_site()
+    bench.run('get_sites single (cached)', lambda: bench.get(f'/api/sites?site_id={hot_site}'))
+    bench.run('get_sites list first page', lambda: bench.get('/api/sites?limit=100'))
+    bench.run('get_sites list sorted by rent',
+              lambda: bench.get('/api/sites?limit=100&sort=present_rent&order=desc'))
+    bench.run('get_sites list filtered', lambda: bench.get('/api/sites?limit=100&region=NORTH&div=D1'))
+
+    cursor = {'next': None}
+
+    def next_page():
+        url = '/api/sites?limit=100'
+        if cursor['next']:
+            url += f"&cursor={cursor['next']}"
+        response = bench.get(url)
+        cursor['next'] = (response.get_json() or {}).get('next_cursor')
+        return response
+
+    bench.run('get_sites list page walk', next_page)
+
+    if args.concurrency > 1:
+        bench.run_concurrent(f'get_sites single (uncached, {args.concurrency} concurrent)',
+                             lambda: bench.get(f'/api/sites?site_id={random_site()}'), args.concurrency)
+        bench.run_concurrent(f'get_report Rent Report ({args.concurrency} concurrent)',
+                             lambda: bench.get(f'/api/reports?type=Rent Report&from_date=2015-01-01'
+                                               f'&to_date={date.today().isoformat()}'),
+                             args.concurrency, iterations=args.report_requests)
+
+    bench.run('update_site', lambda: client.put(
+        f'/api/sites/{random_site()}', headers=bench.headers,
+        json={'remarks': f'bench {rng.randrange(10 ** 6)}'}
+    ))
+
+    today = date.today()
+    dates = f'from_date=2015-01-01&to_date={today.isoformat()}'
+    for report_type in REPORTS:
+        bench.run(f'get_report {report_type}', lambda: bench.get(f'/api/reports?type={report_type}&{dates}'),
+                  iterations=args.report_requests)
+    bench.run('get_report ALL SITES DATA REPORTS (ndjson)',
+              lambda: bench.get(f'/api/reports?type=ALL SITES DATA REPORTS&{dates}&format=ndjson'),
+              iterations=args.report_requests)
+    bench.run('get_analytics', lambda: bench.get('/api/analytics'))
+    bench.run('get_projections', lambda: bench.get('/api/projections?months=60'),
+              iterations=args.report_requests)
+
+    uploads = iter(range(10 ** 6))
+
+    def upload():
+        n = next(uploads)
+        path = upload_file(rng, f'U{n:03d}', args.upload_rows, args.upload_format)
+        try:
+            with open(path, 'rb') as f:
+                response = client.post(
+                    '/api/upload', headers=bench.headers,
+                    data={'file': (BytesIO(f.read()), f'bench{args.upload_format}')}
+                )
+        finally:
+            os.remove(path)
+        if response.status_code != 202:
+            return response
+        # Time the whole import, not just the 202 hand-off
+        job_url = f"/api/upload/{response.get_json()['job_id']}"
+        while True:
+            status = bench.get(job_url)
+            if status.get_json().get('status') in ('completed', 'failed', 'cancelled'):
+                break
+            time.sleep(UPLOAD_POLL_INTERVAL)
+        if status.get_json().get('status') != 'completed':
+            status.status_code = 500
+        return status
+
+    bench.run(f'upload_excel {args.upload_rows} rows', upload, iterations=args.upload_runs)
+    return bench.results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Print p95 changes against a baseline; return the scenarios that regressed."""
+    regressions = []
+    print(f"\nComparison with baseline (p95, tolerance {tolerance:.0%}):")
+    for name, result in results.items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f"  {name:48} new scenario")
+            continue
+        ratio = result['p95_ms'] / before['p95_ms'] if before['p95_ms'] else 1.0
+        regressed = ratio > 1 + tolerance
+        print(f"  {name:48} {before['p95_ms']:9.2f} -> {result['p95_ms']:9.2f} ms  "
+              f"({ratio - 1:+.1%}){'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the rental API against a scratch MySQL database')
+    parser.add_argument('--sites', type=int, default=1000, help='synthetic portfolio size (e.g. 1000, 10000, 100000)')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per scenario')
+    parser.add_argument('--report-requests', type=int, default=20, help='timed requests per report scenario')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests before each scenario')
+    parser.add_argument('--upload-rows', type=int, default=1000, help='rows per benchmark upload')
+    parser.add_argument('--upload-runs', type=int, default=3, help='timed uploads')
+    parser.add_argument('--upload-format', choices=['.xlsx', '.csv'], default='.xlsx')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for the synthetic portfolio')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--compare', help='baseline JSON to compare p95 latencies against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p95 slowdown before failing')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch database afterwards')
+    parser.add_argument('--mode', choices=['sync', 'asgi'], default='sync',
+                        help='drive the Flask app directly or through the async entry point')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='also run concurrent lookup and report scenarios with this many callers')
+    args = parser.parse_args()
+
+    if BENCH_DATABASE == os.getenv('DB_DATABASE', 'RENT'):
+        sys.exit(f"Refusing to benchmark against the application database {BENCH_DATABASE}; "
+                 "set BENCH_DB_DATABASE to a scratch database name.")
+
+    # The app, migrations and import reader all pick the database up from the environment
+    os.environ['DB_DATABASE'] = BENCH_DATABASE
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    mysql_version = setup_database(args.sites, args.seed)
+    try:
+        from app import app
+        if args.mode == 'asgi':
+            import asgi
+            client = AsgiClient(asgi.application, app.response_class)
+        else:
+            client = app.test_client()
+        try:
+            results = run_scenarios(client, args.sites, args)
+        finally:
+            if args.mode == 'asgi':
+                client.close()
+    finally:
+        if not args.keep:
+            drop_database()
+
+    report = {
+        'meta': {
+            'sites': args.sites,
+            'mode': args.mode,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'report_requests': args.report_requests,
+            'upload_rows': args.upload_rows,
+            'seed': args.seed,
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'mysql': mysql_version,
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds')
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('sites') != args.sites:
+            print(f"Warning: baseline was recorded with {baseline['meta'].get('sites')} sites")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
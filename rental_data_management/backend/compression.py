@@ -0,0 +1,58 @@
+import gzip
+from flask import request
+from metrics import timed
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'text/')
+ENCODINGS = ('br', 'gzip')
+
+
+def encoded_etags(etag):
+    """Every ETag a response tagged etag can leave with, one per encoding."""
+    return [etag] + [f'{etag}-{encoding}' for encoding in ENCODINGS]
+
+
+def compress(body, encoding, level):
+    if encoding == 'br':
+        # Brotli quality runs 0-11; scale the shared 1-9 level onto it
+        return brotli.compress(body, quality=min(11, level + 2))
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def init_app(app, min_size=1024, level=6):
+    """Compress buffered responses of at least min_size bytes (0 disables).
+
+    Brotli is preferred when installed and accepted by the client, gzip
+    otherwise. Streamed responses (NDJSON/CSV reports) are left alone so they
+    keep flushing row batches as they are produced.
+    """
+    if not min_size:
+        return
+    encodings = list(ENCODINGS) if brotli is not None else ['gzip']
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code >= 300
+                or 'Content-Encoding' in response.headers
+                or not response.mimetype.startswith(COMPRESSIBLE_TYPES)):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+        with timed('compress'):
+            response.set_data(compress(body, encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        # A strong ETag names one exact representation, so it gets the encoding appended
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f'{etag}-{encoding}')
+        return response
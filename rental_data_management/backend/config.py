@@ -0,0 +1,68 @@
+import os
+import urllib.parse
+from datetime import timedelta
+from dotenv import load_dotenv
+from excel_import import DEFAULT_CHUNK_SIZE
+from metrics import TimedCursor
+from projections import MAX_DETAIL_CELLS
+from streaming import XLSX_MAX_ROWS
+
+# Load environment variables
+load_dotenv()
+
+# Get database connection details from environment variables
+DB_HOST = os.getenv('DB_HOST', 'localhost')
+DB_PORT = int(os.getenv('DB_PORT', '3306'))
+DB_DATABASE = os.getenv('DB_DATABASE', 'RENT')
+DB_USER = os.getenv('DB_USER', 'root')
+DB_PASSWORD = os.getenv('DB_PASSWORD', '2#06A9a')
+
+# Create the connection string
+password = urllib.parse.quote_plus(DB_PASSWORD)
+connection_string = f"mysql+pymysql://{DB_USER}:{password}@{DB_HOST}:{DB_PORT}/{DB_DATABASE}"
+
+
+class Config:
+    """Default settings for create_app(), read from the environment (and .env)."""
+
+    SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key')
+    SQLALCHEMY_DATABASE_URI = connection_string
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': True,
+        'connect_args': {'cursorclass': TimedCursor}
+    }
+    SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', '1000'))
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.getenv('JWT_ACCESS_MINUTES', '60')))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv('JWT_REFRESH_DAYS', '7')))
+    # Seconds a just-rotated refresh token still works, for tabs that refresh at the same time
+    JWT_REFRESH_REUSE_GRACE = int(os.getenv('JWT_REFRESH_REUSE_GRACE', '10'))
+
+    # Response encoding
+    JSON_BACKEND = os.getenv('JSON_BACKEND')
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))
+
+    # Request size limits for POST /api/sites/batch, PATCH /api/sites and search
+    SITE_BATCH_LIMIT = int(os.getenv('SITE_BATCH_LIMIT', '500'))
+    BULK_UPDATE_LIMIT = int(os.getenv('BULK_UPDATE_LIMIT', '1000'))
+    SEARCH_RESULT_LIMIT = int(os.getenv('SEARCH_RESULT_LIMIT', '100'))
+
+    # Rows per .xlsx export; each is spooled to a temporary file before the first byte is sent
+    XLSX_MAX_ROWS = int(os.getenv('XLSX_MAX_ROWS', str(XLSX_MAX_ROWS)))
+
+    # Sites x months in a GET /api/projections?detail=true response
+    PROJECTION_MAX_DETAIL_CELLS = int(os.getenv('PROJECTION_MAX_DETAIL_CELLS', str(MAX_DETAIL_CELLS)))
+
+    # Excel uploads: rows per multi-row INSERT and the background import queue
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(DEFAULT_CHUNK_SIZE)))
+    IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', '2'))
+    IMPORT_QUEUE_SIZE = int(os.getenv('IMPORT_QUEUE_SIZE', '8'))
+    UPLOAD_SPOOL_DIR = os.getenv('UPLOAD_SPOOL_DIR')
+
+    WARMUP_RETRY_INTERVAL = int(os.getenv('WARMUP_RETRY_INTERVAL', '5'))
@@ -0,0 +1,33 @@
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
+from extensions import db, pool_stats
+from services import site_cache, static_assets
+
+bp = Blueprint('core', __name__)
+
+@bp.route('/')
+def serve_index():
+    return static_assets.send('index.html', request, current_app.response_class)
+
+@bp.route('/<path:path>')
+def serve_static(path):
+    return static_assets.send(path, request, current_app.response_class)
+
+@bp.route('/api/health/live', methods=['GET'])
+def liveness():
+    return jsonify({'status': 'ok'}), 200
+
+@bp.route('/api/health/ready', methods=['GET'])
+def readiness():
+    status = current_app.extensions['warmup'].status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@bp.route('/api/pool/stats', methods=['GET'])
+@jwt_required()
+def get_pool_stats():
+    return jsonify({'pool': pool_stats.snapshot(db.engine.pool)}), 200
+
+@bp.route('/api/cache/stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    return jsonify({'site_cache': site_cache.stats()}), 200
@@ -1,5 +1,5 @@
 import pymysql
-import bcrypt
+from credentials import hash_password
 import os
 from dotenv import load_dotenv
 
@@ -12,7 +12,7 @@ DB_PORT = int(os.getenv('DB_PORT', '3306'))
 DB_USER = os.getenv('DB_USER', 'root')
 DB_PASSWORD = os.getenv('DB_PASSWORD', '2#06A9a')
 
-def create_database():
+def create_database(database='RENT'):
     try:
         # Connect to MySQL server
         conn = pymysql.connect(
@@ -25,11 +25,11 @@ def create_database():
         cursor = conn.cursor()
         
         # Create database if it doesn't exist
-        print("Creating database RENT if it doesn't exist...")
-        cursor.execute("CREATE DATABASE IF NOT EXISTS RENT")
+        print(f"Creating database {database} if it doesn't exist...")
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}`")
         
-        # Switch to the RENT database
-        cursor.execute("USE RENT")
+        # Switch to the database
+        cursor.execute(f"USE `{database}`")
         
         # Create USERS table
         print("Creating USERS table...")
@@ -49,10 +49,9 @@ def create_database():
         # Create admin user if not exists
         if not admin_exists:
             print("Creating admin user...")
-            hashed = bcrypt.hashpw('admin123'.encode('utf-8'), bcrypt.gensalt())
             cursor.execute(
                 "INSERT INTO USERS (username, password, role) VALUES (%s, %s, %s)",
-                ('admin', hashed.decode('utf-8'), 'admin')
+                ('admin', hash_password('admin123'), 'admin')
             )
         
         # Create RENTDETAILS table
@@ -63,7 +62,7 @@ def create_database():
                 SITE VARCHAR(10) UNIQUE NOT NULL,
                 `STORE NAME` VARCHAR(100) NOT NULL,
                 REGION VARCHAR(50) NOT NULL,
-                DIV VARCHAR(10) NOT NULL,
+                `DIV` VARCHAR(10) NOT NULL,
                 MANAGER VARCHAR(100) NOT NULL,
                 `ASST.MANAGER` VARCHAR(100) NOT NULL,
                 EXECUTIVE VARCHAR(100) NOT NULL,
@@ -0,0 +1,140 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# Work factor for new and rehashed passwords; existing hashes keep working at any cost
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+
+
+class VerifierBusy(Exception):
+    """Raised when too many credential checks are already queued, or one takes too long."""
+
+
+def hash_password(password, rounds=BCRYPT_ROUNDS):
+    import bcrypt  # Only logins and user setup need it; loaded on first use
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def hash_rounds(stored_hash):
+    # bcrypt hashes look like $2b$12$<salt+digest>
+    try:
+        return int(stored_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class CredentialVerifier:
+    """Runs bcrypt on a bounded worker pool and remembers recent successes.
+
+    Request threads only wait on a future, so at most max_workers bcrypt
+    computations compete for CPU and bursts beyond max_pending fail fast with
+    VerifierBusy instead of tying up every worker. A check still unanswered
+    after timeout seconds raises VerifierBusy too: an overloaded pool is a
+    503, not a wrong password. Successful checks are cached in memory for ttl
+    seconds under an HMAC of the username, password and stored hash with a
+    per-process key, so the plaintext is never kept and a password change
+    invalidates the entry.
+    """
+
+    def __init__(self, max_workers=2, max_pending=32, ttl=300, maxsize=1024,
+                 rounds=BCRYPT_ROUNDS, timeout=10):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.rounds = rounds
+        self.timeout = timeout
+        self._key = secrets.token_bytes(32)
+        self._lock = threading.Lock()
+        self._verified = OrderedDict()
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+        self.cache_hits = 0
+        self.checks = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.rehashed = 0
+
+    def _cache_key(self, username, password, stored_hash):
+        message = '\0'.join((username, password, stored_hash)).encode('utf-8')
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def _cached(self, key):
+        now = time.monotonic()
+        with self._lock:
+            expires_at = self._verified.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= now:
+                del self._verified[key]
+                return False
+            self.cache_hits += 1
+            return True
+
+    def _remember(self, key):
+        with self._lock:
+            self._verified[key] = time.monotonic() + self.ttl
+            self._verified.move_to_end(key)
+            while len(self._verified) > self.maxsize:
+                self._verified.popitem(last=False)
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise VerifierBusy('Too many login attempts in progress, please retry shortly')
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self.timeouts += 1
+            raise VerifierBusy('Login check timed out, please retry shortly')
+
+    def _check(self, password, stored_hash):
+        import bcrypt
+        ok = bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+        # Rehash while still on the worker so the request thread never runs bcrypt
+        if ok and hash_rounds(stored_hash) != self.rounds:
+            return ok, hash_password(password, self.rounds)
+        return ok, None
+
+    def verify(self, username, password, stored_hash):
+        """Return (ok, new_hash); new_hash is set when the stored cost is outdated."""
+        key = self._cache_key(username, password, stored_hash)
+        if self._cached(key):
+            return True, None
+        with self._lock:
+            self.checks += 1
+        ok, new_hash = self._submit(self._check, password, stored_hash)
+        if ok:
+            if new_hash:
+                with self._lock:
+                    self.rehashed += 1
+                key = self._cache_key(username, password, new_hash)
+            self._remember(key)
+        return ok, new_hash
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'rounds': self.rounds,
+                'cached': len(self._verified),
+                'cache_hits': self.cache_hits,
+                'checks': self.checks,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'rehashed': self.rehashed
+            }
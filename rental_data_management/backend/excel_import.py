@@ -0,0 +1,302 @@
+import csv
+import math
+import os
+from datetime import date, datetime
+from site_cache import cache_key as site_key
+
+# Columns that must be present in an uploaded sheet
+REQUIRED_COLUMNS = [
+    'SITE', 'STORE NAME', 'REGION', 'DIV', 'MANAGER', 'ASST.MANAGER',
+    'EXECUTIVE', 'D.O.O', 'SQ.FT', 'AGREEMENT DATE', 'RENT POSITION DATE',
+    'RENT EFFECTIVE DATE', 'LEASE PERIOD', 'RENT_FREE_PERIOD_DAYS',
+    'RENT EFFECTIVE AMOUNT', 'PRESENT RENT', 'HIKE %', 'HIKE YEAR',
+    'RENT DEPOSIT', 'OWNER NAME-1', 'GST_NUMBER', 'PAN_NUMBER',
+    'TDS_PERCENTAGE', 'MATURE', 'STATUS'
+]
+
+# RENTDETAILS column types as created by create_mysql_db.py: (type, length, nullable)
+RENTDETAILS_SCHEMA = {
+    'SITE': ('varchar', 10, False),
+    'STORE NAME': ('varchar', 100, False),
+    'REGION': ('varchar', 50, False),
+    'DIV': ('varchar', 10, False),
+    'MANAGER': ('varchar', 100, False),
+    'ASST.MANAGER': ('varchar', 100, False),
+    'EXECUTIVE': ('varchar', 100, False),
+    'D.O.O': ('date', None, False),
+    'SQ.FT': ('int', None, False),
+    'AGREEMENT DATE': ('date', None, False),
+    'RENT POSITION DATE': ('date', None, False),
+    'RENT EFFECTIVE DATE': ('date', None, False),
+    'AGREEMENT VALID UPTO': ('date', None, True),
+    'CURRENT DATE': ('date', None, True),
+    'LEASE PERIOD': ('int', None, False),
+    'RENT_FREE_PERIOD_DAYS': ('int', None, False),
+    'RENT EFFECTIVE AMOUNT': ('float', None, False),
+    'PRESENT RENT': ('float', None, False),
+    'HIKE %': ('float', None, False),
+    'HIKE YEAR': ('int', None, False),
+    'RENT DEPOSIT': ('float', None, False),
+    'OWNER NAME-1': ('varchar', 100, False),
+    'OWNER NAME-2': ('varchar', 100, True),
+    'OWNER NAME-3': ('varchar', 100, True),
+    'OWNER NAME-4': ('varchar', 100, True),
+    'OWNER NAME-5': ('varchar', 100, True),
+    'OWNER NAME-6': ('varchar', 100, True),
+    'OWNER MOBILE NUMBER': ('varchar', 20, True),
+    'CURRENT DATE 1': ('varchar', 50, True),
+    'VALIDITY DATE': ('varchar', 50, True),
+    'GST_NUMBER': ('varchar', 20, False),
+    'PAN_NUMBER': ('varchar', 20, False),
+    'TDS_PERCENTAGE': ('float', None, False),
+    'MATURE': ('varchar', 3, False),
+    'STATUS': ('varchar', 10, False),
+    'REMARKS': ('text', None, True)
+}
+
+# Column layout of exports: every RENTDETAILS column, in upload header form
+EXPORT_COLUMNS = list(RENTDETAILS_SCHEMA)
+
+# Formats of the re-importable exports (full RENTDETAILS rows, upload headers)
+EXPORT_FORMATS = ('xlsx', 'csv')
+
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xls', '.csv', '.parquet')
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+
+DATE_FORMATS = ['%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d']
+
+
+def _clean_number(value):
+    return str(value).replace('₹', '').replace(',', '').replace('%', '').strip()
+
+def to_int(value):
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(float(_clean_number(value)))
+
+def to_float(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(_clean_number(value))
+
+def to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()[:10]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognized date '{value}'")
+
+def to_text(value):
+    # Whole numbers read from numeric cells (e.g. SITE codes) should not gain a '.0'
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+def varchar(length):
+    def convert(value):
+        text = to_text(value)
+        if len(text) > length:
+            raise ValueError(f"longer than {length} characters")
+        return text
+    return convert
+
+def build_converter(column):
+    """Return a function coercing one cell to the column's RENTDETAILS type."""
+    kind, length, nullable = RENTDETAILS_SCHEMA[column]
+    convert = {
+        'int': to_int,
+        'float': to_float,
+        'date': to_date,
+        'text': to_text
+    }.get(kind) or varchar(length)
+
+    def coerce(value):
+        if value is None or (isinstance(value, float) and math.isnan(value)) or \
+                (isinstance(value, str) and not value.strip()):
+            if not nullable:
+                raise ValueError(f"{column} is required")
+            return None
+        try:
+            return convert(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{column}: {str(e)}")
+    return coerce
+
+
+def iter_raw_rows(path):
+    """Yield the header row and then each data row of an uploaded file.
+
+    .xlsx is read with openpyxl in read-only mode and .csv/.parquet are read
+    incrementally, so memory does not grow with the file. Legacy .xls has no
+    streaming reader and is loaded through pandas.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.xlsx':
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    elif extension == '.csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            yield from csv.reader(f)
+    elif extension == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError('Parquet uploads require pyarrow')
+        parquet = pq.ParquetFile(path)
+        yield parquet.schema_arrow.names
+        for batch in parquet.iter_batches():
+            yield from zip(*batch.to_pydict().values())
+    elif extension == '.xls':
+        import pandas as pd
+        df = pd.read_excel(path)
+        yield list(df.columns)
+        yield from df.astype(object).itertuples(index=False, name=None)
+    else:
+        raise ValueError(f'Unsupported file type: {extension}')
+
+
+class SheetReader:
+    """Reads an uploaded sheet as fixed-size batches of typed RENTDETAILS rows.
+
+    Converters are chosen once from the header. Rows that fail coercion are
+    counted and reported instead of aborting the import.
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_CHUNK_SIZE):
+        self.batch_size = batch_size
+        self._rows = iter_raw_rows(path)
+        header = [str(col).strip() if col is not None else '' for col in next(self._rows, [])]
+
+        for col in REQUIRED_COLUMNS:
+            if col not in header:
+                raise ValueError(f'Missing required column: {col}')
+
+        self._indexes = [i for i, col in enumerate(header) if col in RENTDETAILS_SCHEMA]
+        self.columns = [header[i] for i in self._indexes]
+        self.ignored_columns = [col for col in header if col and col not in RENTDETAILS_SCHEMA]
+        self._converters = [build_converter(col) for col in self.columns]
+        self.rows_parsed = 0
+        self.errored = 0
+        self.errors = []
+
+    def _coerce(self, line, values):
+        try:
+            return tuple(convert(values[i] if i < len(values) else None)
+                         for i, convert in zip(self._indexes, self._converters))
+        except ValueError as e:
+            self.errored += 1
+            if len(self.errors) < MAX_REPORTED_ERRORS:
+                self.errors.append({'row': line, 'error': str(e)})
+            return None
+
+    def batches(self):
+        batch = []
+        # Line 1 is the header
+        for line, values in enumerate(self._rows, start=2):
+            if not any(value is not None and str(value).strip() for value in values):
+                continue
+            self.rows_parsed += 1
+            row = self._coerce(line, values)
+            if row is not None:
+                batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def fetch_existing_sites(cursor, site_ids):
+    """Return the keys of the given SITEs that already exist, in one query."""
+    if not site_ids:
+        return set()
+    placeholders = ', '.join(['%s'] * len(site_ids))
+    cursor.execute(f"SELECT SITE FROM RENTDETAILS WHERE SITE IN ({placeholders})", list(site_ids))
+    return {site_key(row[0]) for row in cursor.fetchall()}
+
+
+def build_insert_query(columns, upsert=False):
+    """Multi-row INSERT for cursor.executemany (not execute).
+
+    pymysql's executemany %-formats the INSERT ... VALUES (...) part but sends
+    an ON DUPLICATE KEY UPDATE clause as is, so the literal % in `HIKE %` is
+    doubled only before it.
+    """
+    quoted = [f"`{col}`" for col in columns]
+    placeholders = ', '.join(['%s'] * len(columns))
+    query = f"INSERT INTO RENTDETAILS ({', '.join(quoted)}) VALUES ({placeholders})"
+    query = query.replace('HIKE %`', 'HIKE %%`')
+    if upsert:
+        updates = [f"`{col}` = VALUES(`{col}`)" for col in columns if col != 'SITE']
+        query += f" ON DUPLICATE KEY UPDATE {', '.join(updates)}"
+    return query
+
+
+def build_export_query(where=None, order_by='SITE'):
+    """SELECT every RENTDETAILS column under its upload header, so exports re-import as is.
+
+    The query is always run with parameters (possibly none), so % is doubled.
+    """
+    select = ', '.join(f"`{col}`" for col in EXPORT_COLUMNS)
+    query = f"SELECT {select} FROM RENTDETAILS"
+    if where:
+        query += f" WHERE {where}"
+    query += f" ORDER BY {order_by}"
+    return query.replace('HIKE %`', 'HIKE %%`')
+
+
+def import_batches(cursor, reader, upsert=False, progress=None):
+    """Set-based import of a SheetReader into RENTDETAILS.
+
+    Each batch costs one IN query for existing SITEs and one multi-row
+    executemany. In insert mode existing SITEs are skipped; in upsert mode they
+    are updated via ON DUPLICATE KEY UPDATE. Repeated SITEs keep the first row.
+    The caller owns the transaction. progress, if given, is called after each
+    batch with the running totals.
+    """
+    query = build_insert_query(reader.columns, upsert)
+    site_index = reader.columns.index('SITE')
+    seen = set()
+    totals = {'inserted': 0, 'updated': 0, 'skipped': 0}
+    batch_count = 0
+
+    for rows in reader.batches():
+        fresh = []
+        for row in rows:
+            key = site_key(row[site_index])
+            if key in seen:
+                totals['skipped'] += 1
+                continue
+            seen.add(key)
+            fresh.append(row)
+
+        existing = fetch_existing_sites(cursor, [row[site_index] for row in fresh])
+        if upsert:
+            totals['updated'] += len(existing)
+            totals['inserted'] += len(fresh) - len(existing)
+        else:
+            totals['skipped'] += len(existing)
+            fresh = [row for row in fresh if site_key(row[site_index]) not in existing]
+            totals['inserted'] += len(fresh)
+
+        if fresh:
+            cursor.executemany(query, fresh)
+
+        batch_count += 1
+        if progress:
+            progress(dict(totals, batch=batch_count, rows=len(rows),
+                          rows_parsed=reader.rows_parsed, errored=reader.errored))
+
+    return dict(totals, batches=batch_count, rows_parsed=reader.rows_parsed, errored=reader.errored,
+                errors=reader.errors, ignored_columns=reader.ignored_columns)
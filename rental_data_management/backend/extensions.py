@@ -0,0 +1,27 @@
+from contextlib import contextmanager
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+from flask_jwt_extended import JWTManager
+from metrics import timed
+from pool import PoolStats, checkout
+
+# Created unbound and attached to the app by create_app() (see factory.py)
+db = SQLAlchemy()
+jwt = JWTManager()
+
+# Raw SQL and the ORM share the engine's connection pool
+pool_stats = PoolStats()
+
+# Direct connection for custom queries, checked out of the shared pool.
+# Calling close() on it returns the connection to the pool.
+def get_db_connection():
+    with timed('db_connect'):
+        return checkout(db.engine, pool_stats, current_app.config['SQLALCHEMY_ENGINE_OPTIONS']['max_overflow'])
+
+@contextmanager
+def db_connection():
+    conn = get_db_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
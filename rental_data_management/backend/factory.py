@@ -0,0 +1,56 @@
+"""Application factory.
+
+    from factory import create_app
+    app = create_app({'SQLALCHEMY_DATABASE_URI': ...})
+
+Importing this module is cheap: Flask, the extensions and the blueprints are
+only loaded when create_app() runs, and dependencies that a single endpoint
+needs (pandas, openpyxl, numpy, bcrypt, dateutil) are imported inside the
+functions that use them. startup_check.py keeps it that way.
+"""
+
+
+def create_app(config=None):
+    """Build the API app. config (a mapping or settings object) overrides Config."""
+    from flask import Flask
+    from flask_cors import CORS
+    import compression
+    import metrics
+    from config import Config
+    from extensions import db, jwt, pool_stats
+    from json_provider import create_json_provider
+    from logging_setup import configure_logging
+    import auth_routes
+    import core_routes
+    import report_routes
+    import site_routes
+    import upload_routes
+    from services import create_warmup
+
+    configure_logging()
+
+    # The frontend is served by serve_static (with cache headers), not Flask's static route
+    app = Flask(__name__, static_folder=None)
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+    CORS(app)
+
+    # Initialize extensions
+    db.init_app(app)
+    jwt.init_app(app)
+    metrics.init_app(app)
+    app.json = create_json_provider(app, app.config['JSON_BACKEND'])
+    compression.init_app(app, min_size=app.config['COMPRESS_MIN_SIZE'], level=app.config['COMPRESS_LEVEL'])
+
+    with app.app_context():
+        pool_stats.install(db.engine)
+
+    # Routes, one blueprint per area; core also serves the frontend
+    for blueprint in (auth_routes.bp, site_routes.bp, report_routes.bp, upload_routes.bp, core_routes.bp):
+        app.register_blueprint(blueprint)
+
+    app.extensions['warmup'] = create_warmup(app)
+    return app
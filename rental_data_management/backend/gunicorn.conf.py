@@ -0,0 +1,76 @@
+"""Production server settings.
+
+    cd backend
+    gunicorn app:app
+
+Pre-forked worker processes each serve GUNICORN_THREADS requests at a time.
+The app is imported once in the master (preload_app), so workers fork with
+every module loaded. Each worker is recycled after about MAX_REQUESTS
+requests; one that is still running upload imports finishes them first
+(worker_exit below). Before it accepts traffic, a worker primes its DB pool
+and loads its caches (see warmup.py), for up to WARMUP_TIMEOUT seconds.
+
+State the workers must agree on is shared through files on the host:
+upload job status in UPLOAD_SPOOL_DIR and revoked tokens in REVOCATION_DIR.
+The site cache, search index and analytics rollup stay per worker: a write
+refreshes them in its own worker, and the others catch up within
+SITE_CACHE_TTL, SEARCH_REFRESH and ANALYTICS_REFRESH seconds (300 each).
+
+Graceful reload: `kill -HUP <master pid>` replaces the workers with new ones
+while the old ones finish their in-flight requests (up to graceful_timeout).
+Because the app is preloaded, new code needs a binary upgrade instead:
+`kill -USR2 <master pid>` starts a new master, then `kill -TERM` the old one.
+"""
+import multiprocessing
+import os
+import time
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', str(min(multiprocessing.cpu_count() * 2 + 1, 8))))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+preload_app = True
+
+max_requests = int(os.getenv('MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('MAX_REQUESTS_JITTER', '100'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = os.getenv('ACCESS_LOG') or None
+
+WARMUP_TIMEOUT = float(os.getenv('WARMUP_TIMEOUT', '60'))
+
+
+def post_fork(server, worker):
+    # Connections must never be shared across processes; drop any the master opened
+    from app import app
+    from extensions import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    # Keep a handle on the heartbeat file: gunicorn closes worker.tmp before worker_exit
+    worker.heartbeat = os.dup(worker.tmp.fileno())
+    # Warm up before accepting requests. If MySQL is not reachable in time the
+    # worker starts anyway, and /api/health/ready stays 503 while it retries.
+    from app import warmup
+    if not warmup.start().wait(WARMUP_TIMEOUT):
+        worker.log.warning("Worker %s serving before warm-up finished", worker.pid)
+
+
+def worker_exit(server, worker):
+    # Imports run on this worker's threads and die with it. A recycled worker
+    # finishes them first, heartbeating like worker.notify() so the master
+    # does not time it out. A shutdown still kills it after graceful_timeout;
+    # its jobs then read as failed.
+    from app import app
+    jobs = app.extensions['import_jobs']
+    if jobs.active():
+        worker.log.info("Worker %s finishing %s upload imports", worker.pid, jobs.active())
+    while jobs.active():
+        now = time.monotonic()
+        os.utime(worker.heartbeat, (now, now))
+        time.sleep(1)
@@ -0,0 +1,268 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger('rental.import')
+
+JOB_ID = re.compile(r'[0-9a-f]{32}')
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class QueueFull(Exception):
+    pass
+
+
+class ImportJob:
+    """State of one background upload, updated by the worker as it runs."""
+
+    def __init__(self, job_id, filename, path, options, submitted_by=None):
+        self.id = job_id
+        self.filename = filename
+        self.path = path
+        self.options = options
+        self.submitted_by = submitted_by
+        self.status = 'queued'
+        self.rows_parsed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+        self.errored = 0
+        self.batches = 0
+        self.errors = []
+        self.ignored_columns = []
+        self.message = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self.owner_pid = os.getpid()
+        self._cancel = threading.Event()
+        self._cancel_path = None
+        self._save = None
+
+    @property
+    def finished(self):
+        return self.status in ('completed', 'failed', 'cancelled')
+
+    def check_cancelled(self):
+        # A cancel from another worker process arrives as a marker file next to the status file
+        if self._cancel.is_set() or (self._cancel_path and os.path.exists(self._cancel_path)):
+            raise JobCancelled()
+
+    def record_batch(self, batch):
+        # Called between batches, so a cancel takes effect before the next INSERT
+        self.batches += 1
+        for key in ('rows_parsed', 'inserted', 'updated', 'skipped', 'errored'):
+            setattr(self, key, batch[key])
+        if self._save:
+            self._save(self)
+        self.check_cancelled()
+
+    @classmethod
+    def from_dict(cls, data):
+        """A read-only copy of a job run by another process, from its status file."""
+        job = cls(data['job_id'], data['filename'], None, {}, data['submitted_by'])
+        for key, value in data.items():
+            if key not in ('job_id', 'filename', 'submitted_by'):
+                setattr(job, key, value)
+        return job
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'filename': self.filename,
+            'status': self.status,
+            'rows_parsed': self.rows_parsed,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'errored': self.errored,
+            'batches': self.batches,
+            'errors': self.errors,
+            'ignored_columns': self.ignored_columns,
+            'message': self.message,
+            'error': self.error,
+            'submitted_by': self.submitted_by,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+    def to_state(self):
+        return dict(self.to_dict(), owner_pid=self.owner_pid)
+
+
+class ImportJobManager:
+    """Runs spooled uploads on a bounded thread pool.
+
+    runner(job) does the parse/validate/insert work and fills in the job
+    counters. At most max_workers jobs run at once and at most max_pending
+    more wait in the queue; further submissions raise QueueFull.
+
+    Jobs run in the process that accepted the upload, but each one's state is
+    also written to <job_id>.json in the spool directory on every change, so
+    any worker process can answer a status poll or pass on a cancel.
+    """
+
+    def __init__(self, runner, max_workers=2, max_pending=8, spool_dir=None, retention=3600):
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.spool_dir = spool_dir or os.path.join(tempfile.gettempdir(), 'rental_uploads')
+        self.retention = retention
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='import')
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+    def submit(self, file, options=None, submitted_by=None):
+        """Spool an uploaded file to disk and queue it for import."""
+        job_id = uuid.uuid4().hex
+        extension = os.path.splitext(file.filename)[1].lower()
+        path = os.path.join(self.spool_dir, f"{job_id}{extension}")
+        with self._lock:
+            self._prune()
+            active = sum(1 for job in self._jobs.values() if not job.finished)
+            if active >= self.max_workers + self.max_pending:
+                raise QueueFull('Too many imports in progress, try again later')
+            job = ImportJob(job_id, file.filename, path, options or {}, submitted_by)
+            job._cancel_path = self._state_path(job_id, '.cancel')
+            job._save = self._save
+            self._jobs[job_id] = job
+        try:
+            file.save(path)
+            self._save(job)
+        except Exception:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            self._discard(job_id)
+            raise
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        """The job, from memory if it runs here or from its status file if another process has it."""
+        if not JOB_ID.fullmatch(job_id):
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        try:
+            with open(self._state_path(job_id)) as f:
+                job = ImportJob.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+        if not job.finished and not process_alive(job.owner_pid):
+            # Its worker was recycled or killed mid-import; the transaction was rolled back
+            job.status = 'failed'
+            job.error = 'The import was interrupted, please upload the file again'
+        return job
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job.future is None:
+            # Running in another process: it checks for this marker between batches
+            open(self._state_path(job_id, '.cancel'), 'w').close()
+            return job
+        job._cancel.set()
+        if job.future.cancel():
+            # Never started, so nothing to roll back
+            self._finish(job, 'cancelled')
+        return job
+
+    def active(self):
+        """Jobs of this process that are queued or running."""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {'max_workers': self.max_workers, 'max_pending': self.max_pending, 'jobs': counts}
+
+    def _run(self, job):
+        job.status = 'running'
+        job.started_at = time.time()
+        self._save(job)
+        try:
+            job.check_cancelled()
+            self.runner(job)
+            self._finish(job, 'completed')
+        except JobCancelled:
+            self._finish(job, 'cancelled')
+        except Exception as e:
+            log.exception("Import job failed", extra={'fields': {'job_id': job.id, 'filename': job.filename}})
+            job.error = str(e)
+            self._finish(job, 'failed')
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        self._save(job)
+        for path in (job.path, job._cancel_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _state_path(self, job_id, suffix='.json'):
+        return os.path.join(self.spool_dir, job_id + suffix)
+
+    def _save(self, job):
+        # Write then rename, so a reader in another process never sees a partial file
+        path = self._state_path(job.id)
+        temp = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp, 'w') as f:
+                json.dump(job.to_state(), f)
+            os.replace(temp, path)
+        except OSError as e:
+            log.warning("Could not save import job state: %s", e, extra={'fields': {'job_id': job.id}})
+
+    def _discard(self, job_id):
+        for suffix in ('.json', '.cancel'):
+            try:
+                os.remove(self._state_path(job_id, suffix))
+            except OSError:
+                pass
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+        # Status files of every process, including ones that have since exited
+        for name in os.listdir(self.spool_dir):
+            job_id, extension = os.path.splitext(name)
+            if extension != '.json' or not JOB_ID.fullmatch(job_id):
+                continue
+            try:
+                if os.path.getmtime(os.path.join(self.spool_dir, name)) < cutoff:
+                    self._discard(job_id)
+            except OSError:
+                pass
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -1,12 +1,15 @@
-from app import app, db, User
-import bcrypt
+from credentials import hash_password
+from extensions import db
+from factory import create_app
+from models import User
 
 def init_db():
+    app = create_app()
     with app.app_context():
         # Create all tables
         db.create_all()
         
-        # Create default users if they don't exist
+        # Create default users if they don't exist; these are the only built-in logins
         default_users = [
             {
                 'username': 'krishna',
@@ -23,13 +26,10 @@ def init_db():
         for user_data in default_users:
             user = User.query.filter_by(username=user_data['username']).first()
             if not user:
-                # Generate a new salt and hash the password
-                salt = bcrypt.gensalt()
-                hashed = bcrypt.hashpw(user_data['password'].encode('utf-8'), salt)
-                # Store the complete hash (including salt) as a string
+                # Store the complete hash (including salt and BCRYPT_ROUNDS cost) as a string
                 user = User(
                     username=user_data['username'],
-                    password=hashed.decode('utf-8'),
+                    password=hash_password(user_data['password']),
                     role=user_data['role']
                 )
                 db.session.add(user)
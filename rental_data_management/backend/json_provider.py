@@ -0,0 +1,82 @@
+import json
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from metrics import timed
+from serializers import DISPLAY_DATE_FORMAT
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+
+def encode_default(value):
+    """Encode the non-JSON types our payloads carry; dates use the display format."""
+    if isinstance(value, (date, datetime)):
+        return value.strftime(DISPLAY_DATE_FORMAT)
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, 'tolist'):  # numpy arrays and scalars
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's stdlib provider with native date/Decimal encoding and serialize timing."""
+
+    default = staticmethod(encode_default)
+
+    def dumps(self, obj, **kwargs):
+        with timed('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """orjson-backed provider; responses are built from bytes without a str round trip."""
+
+    def _options(self, sort_keys=None, indent=None):
+        # Dates are passed through to encode_default so they keep the display format
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        # orjson imports numpy for this option; only ask once something (projections) has loaded it
+        if 'numpy' in sys.modules:
+            option |= orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        with timed('serialize'):
+            return orjson.dumps(
+                obj, default=encode_default,
+                option=self._options(kwargs.get('sort_keys'), kwargs.get('indent'))
+            ).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        with timed('serialize'):
+            body = orjson.dumps(obj, default=encode_default, option=self._options(indent=indent))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def create_json_provider(app, backend=None):
+    """orjson when installed (or JSON_BACKEND=orjson), otherwise the stdlib encoder."""
+    if backend == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_BACKEND=orjson but orjson is not installed')
+    if orjson is not None and backend in (None, '', 'orjson'):
+        return OrjsonProvider(app)
+    return StdlibJSONProvider(app)
+
+
+def dumps(obj):
+    """Module-level encoder for code outside a request (e.g. streaming chunks)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=encode_default, option=orjson.OPT_PASSTHROUGH_DATETIME).decode('utf-8')
+    return json.dumps(obj, default=encode_default)
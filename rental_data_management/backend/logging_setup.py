@@ -0,0 +1,108 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from datetime import datetime, timezone
+
+# Any key containing one of these words has its value masked before a record is written
+SENSITIVE_KEYS = ('password', 'passwd', 'secret', 'token', 'authorization', 'hash', 'api_key')
+REDACTED = '[REDACTED]'
+
+_listener = None
+
+
+def redact(value):
+    """Return a copy of value with credential-like entries masked."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if any(word in str(key).lower() for word in SENSITIVE_KEYS) else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return type(value)(redact(item) for item in value)
+    return value
+
+
+class RedactingFilter(logging.Filter):
+    def filter(self, record):
+        if isinstance(record.args, (dict, tuple)):
+            record.args = redact(record.args)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            record.fields = redact(fields)
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Keep only a fraction of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        payload.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def configure_logging(level=None, debug_sample_rate=None, fmt=None):
+    """Route the 'rental' loggers through a non-blocking queue.
+
+    Request threads only enqueue records; a QueueListener thread formats and
+    writes them. Level (LOG_LEVEL), DEBUG sampling rate (LOG_DEBUG_SAMPLE) and
+    output format (LOG_FORMAT=json|text) come from the environment by default.
+    """
+    global _listener
+    logger = logging.getLogger('rental')
+    if _listener is not None:
+        return logger
+
+    level = level or os.getenv('LOG_LEVEL', 'INFO')
+    rate = float(debug_sample_rate if debug_sample_rate is not None else os.getenv('LOG_DEBUG_SAMPLE', '1.0'))
+    fmt = fmt or os.getenv('LOG_FORMAT', 'json')
+
+    output = logging.StreamHandler()
+    if fmt == 'json':
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    records = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(records)
+    handler.addFilter(DebugSampler(rate))
+    handler.addFilter(RedactingFilter())
+
+    logger.setLevel(level.upper())
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, output)
+    _listener.start()
+    atexit.register(_listener.stop)
+    # Threads do not survive fork: pre-forked server workers need their own writer
+    os.register_at_fork(after_in_child=_restart_listener)
+    return logger
+
+
+def _restart_listener():
+    global _listener
+    atexit.unregister(_listener.stop)
+    _listener = logging.handlers.QueueListener(_listener.queue, *_listener.handlers)
+    _listener.start()
+    atexit.register(_listener.stop)
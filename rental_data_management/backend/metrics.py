@@ -0,0 +1,228 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+import pymysql
+
+log = logging.getLogger('rental.metrics')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Queries kept per request for the slow-request log
+MAX_CAPTURED_QUERIES = 20
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}' if pairs else ''
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += 1
+            series[2] += value
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total, value_sum) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    labels = _labels(self.labels + ('le',), label_values + (bound,))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _labels(self.labels + ('le',), label_values + ('+Inf',))
+                lines.append(f"{self.name}_bucket{labels} {total}")
+                lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {total}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {value_sum:.6f}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, *args, **kwargs):
+        metric = Counter(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs):
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def add_gauges(self, prefix, help_text, collect):
+        """Expose the numeric values of a dict returned by collect() as gauges."""
+        self.collectors.append((prefix, help_text, collect))
+
+    def expose(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.expose())
+        for prefix, help_text, collect in self.collectors:
+            try:
+                values = collect()
+            except Exception as e:
+                log.warning("Metrics collector %s failed: %s", prefix, e)
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"# HELP {prefix}_{key} {help_text}")
+                    lines.append(f"# TYPE {prefix}_{key} gauge")
+                    lines.append(f"{prefix}_{key} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+requests_total = registry.counter(
+    'http_requests_total', 'HTTP requests by route, method and status', ('route', 'method', 'status'))
+request_duration = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route', ('route', 'method'))
+phase_duration = registry.histogram(
+    'request_phase_duration_seconds',
+    'Time per request spent in db_connect, db_execute, db_fetch, transform, serialize and compress',
+    ('route', 'phase'))
+
+
+def record_phase(phase, seconds):
+    """Attribute time to a phase of the current request (or to 'background')."""
+    if has_request_context():
+        phases = g.setdefault('_metrics_phases', {})
+        phases[phase] = phases.get(phase, 0.0) + seconds
+    else:
+        phase_duration.observe(seconds, 'background', phase)
+
+
+@contextmanager
+def timed(phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - start)
+
+
+def capture_query(query, args, seconds):
+    if has_request_context():
+        queries = g.setdefault('_metrics_queries', [])
+        if len(queries) < MAX_CAPTURED_QUERIES:
+            if 'password' in query.lower():
+                args = '[REDACTED]'
+            queries.append({'query': query, 'params': args, 'ms': round(seconds * 1000, 3)})
+
+
+class TimedCursorMixin:
+    """Times execute and fetches on pymysql cursors (executemany runs through execute)."""
+
+    def execute(self, query, args=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            elapsed = time.perf_counter() - start
+            record_phase('db_execute', elapsed)
+            capture_query(query, args, elapsed)
+
+    def fetchone(self):
+        with timed('db_fetch'):
+            return super().fetchone()
+
+    def fetchmany(self, size=None):
+        with timed('db_fetch'):
+            return super().fetchmany(size)
+
+    def fetchall(self):
+        with timed('db_fetch'):
+            return super().fetchall()
+
+
+class TimedCursor(TimedCursorMixin, pymysql.cursors.Cursor):
+    pass
+
+
+class TimedSSCursor(TimedCursorMixin, pymysql.cursors.SSCursor):
+    pass
+
+
+def init_app(app, slow_request_ms=None):
+    """Install request timing hooks and the /metrics endpoint.
+
+    Serialization time is recorded by the JSON providers in json_provider.py.
+    """
+    slow_request_ms = slow_request_ms if slow_request_ms is not None else app.config.get('SLOW_REQUEST_MS', 0)
+
+    @app.before_request
+    def start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        requests_total.inc(route, request.method, response.status_code)
+        request_duration.observe(elapsed, route, request.method)
+        phases = g.pop('_metrics_phases', {})
+        for phase, seconds in phases.items():
+            phase_duration.observe(seconds, route, phase)
+        queries = g.pop('_metrics_queries', [])
+        if slow_request_ms and elapsed * 1000 >= slow_request_ms:
+            log.warning("Slow request", extra={'fields': {
+                'route': route,
+                'method': request.method,
+                'status': response.status_code,
+                'ms': round(elapsed * 1000, 3),
+                'phases_ms': {phase: round(seconds * 1000, 3) for phase, seconds in phases.items()},
+                'queries': queries
+            }})
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        return app.response_class(registry.expose(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,271 @@
+import argparse
+import sys
+import pymysql
+import os
+from datetime import date, timedelta
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Database connection parameters
+DB_HOST = os.getenv('DB_HOST', 'localhost')
+DB_PORT = int(os.getenv('DB_PORT', '3306'))
+DB_DATABASE = os.getenv('DB_DATABASE', 'RENT')
+DB_USER = os.getenv('DB_USER', 'root')
+DB_PASSWORD = os.getenv('DB_PASSWORD', '2#06A9a')
+
+# Versioned schema changes applied on top of create_mysql_db.py, in order.
+# Each index is named after the endpoint predicate it serves.
+MIGRATIONS = [
+    (1, 'Index report date range and lease period filters', [
+        # get_report: WHERE `AGREEMENT DATE` BETWEEN ... ORDER BY `AGREEMENT DATE`, ENTRY_NO
+        "CREATE INDEX idx_rent_agreement_date ON RENTDETAILS (`AGREEMENT DATE`)",
+        # get_report: ... AND `LEASE PERIOD` = %s
+        "CREATE INDEX idx_rent_lease_agreement ON RENTDETAILS (`LEASE PERIOD`, `AGREEMENT DATE`)"
+    ]),
+    (2, 'Index site listing filters and sort keys', [
+        # get_sites listing: region/div/status equality filters
+        "CREATE INDEX idx_rent_region_div_status ON RENTDETAILS (REGION, `DIV`, STATUS)",
+        "CREATE INDEX idx_rent_status_mature ON RENTDETAILS (STATUS, MATURE)",
+        # get_sites listing: ORDER BY <column>, ENTRY_NO keyset sorts
+        "CREATE INDEX idx_rent_present_rent ON RENTDETAILS (`PRESENT RENT`)",
+        "CREATE INDEX idx_rent_lease_period ON RENTDETAILS (`LEASE PERIOD`)"
+    ]),
+    (3, 'Index agreement expiry', [
+        # get_sites listing expires_within and expiry analytics
+        "CREATE INDEX idx_rent_valid_upto ON RENTDETAILS (`AGREEMENT VALID UPTO`)"
+    ]),
+    (4, 'Index the exact present rent sort key', [
+        # get_sites listing: sort=present_rent orders and compares FLOAT rents as DECIMAL(12,2)
+        # (functional index, MySQL 8.0.13+)
+        "CREATE INDEX idx_rent_present_rent_cents ON RENTDETAILS ((CAST(`PRESENT RENT` AS DECIMAL(12,2))))"
+    ]),
+    (5, 'Index each listing filter on its own', [
+        # get_sites listing and PATCH /api/sites expressions: one equality filter, ORDER BY ENTRY_NO.
+        # InnoDB appends the primary key, so each page is a ref scan read in ENTRY_NO order.
+        "CREATE INDEX idx_rent_region ON RENTDETAILS (REGION)",
+        "CREATE INDEX idx_rent_div ON RENTDETAILS (`DIV`)",
+        "CREATE INDEX idx_rent_status ON RENTDETAILS (STATUS)",
+        "CREATE INDEX idx_rent_mature ON RENTDETAILS (MATURE)"
+    ])
+]
+
+
+def get_connection(cursorclass=pymysql.cursors.Cursor):
+    return pymysql.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        database=DB_DATABASE,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        cursorclass=cursorclass
+    )
+
+
+def applied_versions(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS SCHEMA_MIGRATIONS (
+            version INT PRIMARY KEY,
+            description VARCHAR(200) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT version FROM SCHEMA_MIGRATIONS")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate():
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        done = applied_versions(cursor)
+        pending = [m for m in MIGRATIONS if m[0] not in done]
+        if not pending:
+            print("Schema is up to date.")
+        for version, description, statements in pending:
+            print(f"Applying migration {version}: {description}...")
+            # MySQL DDL commits implicitly, so each migration is recorded right after it runs
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute(
+                "INSERT INTO SCHEMA_MIGRATIONS (version, description) VALUES (%s, %s)",
+                (version, description)
+            )
+            conn.commit()
+        print("Migrations completed successfully.")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def status():
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        done = applied_versions(cursor)
+        for version, description, _ in MIGRATIONS:
+            print(f"{'applied' if version in done else 'pending':8} {version:4} {description}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# Plan issues check() reports; a query lists the ones it is allowed to have
+FULL_SCAN = 'full scan'
+INDEX_SCAN = 'full index scan'
+FILESORT = 'filesort'
+WHOLE_TABLE = frozenset({FULL_SCAN, INDEX_SCAN, FILESORT})
+
+
+def explain_queries():
+    """Every RENTDETAILS query the API issues, built by the code that issues it.
+
+    Returns (name, query, params, allowed): allowed is the set of plan issues
+    the query may have. Whole-table reads (reloads, unfiltered exports,
+    filters: 'all' updates) may scan. Keyset listing pages may not sort, and
+    only an unfiltered first page may walk an index, since each page must
+    stay proportional to its LIMIT. A listing filter combined with a sort on
+    another column is filtered then sorted and not checked here.
+    """
+    from analytics import ANALYTICS_COLUMNS
+    from excel_import import build_export_query
+    from pagination import FILTER_COLUMNS, SORT_COLUMNS, build_site_listing_query, encode_cursor
+    from projections import parse_projection_args
+    from report_queries import REPORTS, report_filter, build_report_query, build_summary_query
+    from search_index import SEARCH_COLUMNS
+    from site_routes import listing_columns
+    from site_updates import EXPRESSIONS, build_expression_query, build_update_query
+
+    today = date.today()
+    filter_values = {'region': 'NORTH', 'div': 'D1', 'status': 'ACTIVE', 'mature': 'YES'}
+    sites = ['S001', 'S002']
+    queries = [
+        ('site lookup', "SELECT * FROM RENTDETAILS WHERE SITE = %s", ['S001'], frozenset()),
+        ('site exists', "SELECT COUNT(*) FROM RENTDETAILS WHERE SITE = %s", ['S001'], frozenset()),
+        ('site update', build_update_query(('`REMARKS`', '`STATUS`')), ['x', 'ACTIVE', 'S001'], frozenset()),
+        ('site batch lookup', "SELECT * FROM RENTDETAILS WHERE SITE IN (%s, %s)", sites, frozenset()),
+        ('upload existing sites', "SELECT SITE FROM RENTDETAILS WHERE SITE IN (%s, %s)", sites, frozenset()),
+        ('analytics site sync',
+         f"SELECT {', '.join(ANALYTICS_COLUMNS)} FROM RENTDETAILS WHERE SITE IN (%s)", ['S001'], frozenset()),
+        ('analytics reload', f"SELECT {', '.join(ANALYTICS_COLUMNS)} FROM RENTDETAILS", [], WHOLE_TABLE),
+        ('search index site sync',
+         f"SELECT {', '.join(SEARCH_COLUMNS)} FROM RENTDETAILS WHERE SITE IN (%s)", ['S001'], frozenset()),
+        ('search index reload',
+         f"SELECT {', '.join(SEARCH_COLUMNS)} FROM RENTDETAILS ORDER BY SITE", [], WHOLE_TABLE),
+        ('site export', build_export_query(), [], WHOLE_TABLE)
+    ]
+
+    # PATCH /api/sites expressions, under each filter they accept
+    expression_args = {'percent': 5, 'status': 'ACTIVE'}
+    for op, (_, param_names) in EXPRESSIONS.items():
+        args = {name: expression_args[name] for name in param_names}
+        for name in list(FILTER_COLUMNS) + ['site_ids']:
+            filters = {name: sites if name == 'site_ids' else filter_values[name]}
+            query, params = build_expression_query(dict(args, op=op, filters=filters))
+            queries.append((f"expression {op} by {name}", query, params, frozenset()))
+        query, params = build_expression_query(dict(args, op=op, filters='all'))
+        queries.append((f"expression {op} on all sites", query, params, WHOLE_TABLE))
+
+    # Site listing: every sort key, first and later pages, and every filter
+    cursor_values = {'entry_no': 42, 'site': 'S042', 'agreement_date': today.isoformat(),
+                     'present_rent': 12500.5, 'lease_period': 36}
+    listing_args = []
+    for sort in SORT_COLUMNS:
+        for order in ('asc', 'desc'):
+            listing_args.append({'sort': sort, 'order': order})
+            listing_args.append({'sort': sort, 'order': order,
+                                 'cursor': encode_cursor(sort, order, cursor_values[sort], 42)})
+    for name, value in filter_values.items():
+        listing_args.append({name: value})
+    listing_args.append({'min_rent': '10000', 'sort': 'present_rent'})
+    listing_args.append({'max_rent': '50000', 'sort': 'present_rent', 'order': 'desc'})
+    for args in listing_args:
+        query, params = build_site_listing_query(args, listing_columns)[:2]
+        # Unfiltered first pages read the sort key's index from one end and stop after LIMIT rows
+        first_page = set(args) <= {'sort', 'order'}
+        queries.append((f"site listing {args}", query, params, frozenset({INDEX_SCAN} if first_page else ())))
+    # A 90-day expiry window is small enough to sort
+    query, params = build_site_listing_query({'expires_within': '90'}, listing_columns)[:2]
+    queries.append(("site listing {'expires_within': '90'}", query, params, frozenset({FILESORT})))
+
+    # Filtered site exports are sorted by SITE after filtering
+    for name, value in filter_values.items():
+        column = FILTER_COLUMNS[name]
+        queries.append((f"site export by {name}", build_export_query(f"{column} = %s"), [value], frozenset({FILESORT})))
+
+    for args in [{}] + [{name: value} for name, value in dict(filter_values, site_id='S001').items() if name != 'mature']:
+        query, params = parse_projection_args(args)[:2]
+        queries.append((f"projections {args}", query, params, WHOLE_TABLE if not args else frozenset()))
+
+    for lease_period in (None, '3'):
+        where, params = report_filter(today - timedelta(days=365), today, lease_period)
+        suffix = f" lease_period={lease_period}" if lease_period else ''
+        for report_type in REPORTS:
+            queries.append((f"{report_type}{suffix}", build_report_query(report_type, where)[0], params, frozenset()))
+            # GROUP BY ... WITH ROLLUP sorts the rows of the date range
+            queries.append((f"{report_type} totals{suffix}", build_summary_query(report_type, where)[0], params,
+                            frozenset({FILESORT})))
+        queries.append((f"report export{suffix}", build_export_query(where, order_by='`AGREEMENT DATE`, ENTRY_NO'),
+                        params, frozenset()))
+    return queries
+
+
+def plan_issues(plan):
+    issues = set()
+    if plan.get('type') == 'ALL':
+        issues.add(FULL_SCAN)
+    elif plan.get('type') == 'index':
+        issues.add(INDEX_SCAN)
+    if 'Using filesort' in (plan.get('Extra') or ''):
+        issues.add(FILESORT)
+    return issues
+
+
+def check():
+    """EXPLAIN every app query and fail on unexpected scans or sorts of RENTDETAILS.
+
+    Run against a database with a realistic row count (e.g. one seeded by the
+    benchmark suite): on a near-empty table MySQL may prefer a scan anyway.
+    """
+    conn = get_connection(pymysql.cursors.DictCursor)
+    cursor = conn.cursor()
+    failures = []
+    try:
+        for name, query, params, allowed in explain_queries():
+            cursor.execute("EXPLAIN " + query, params)
+            for plan in cursor.fetchall():
+                if plan.get('table') != 'RENTDETAILS':
+                    continue
+                issues = plan_issues(plan)
+                unexpected = issues - allowed
+                label = ', '.join(sorted(unexpected)).upper() if unexpected else ('allowed' if issues else 'ok')
+                print(f"{label:9} {name}: type={plan.get('type')} key={plan.get('key')} "
+                      f"rows={plan.get('rows')} extra={plan.get('Extra')}")
+                if unexpected:
+                    failures.append(f"{name} ({', '.join(sorted(unexpected))})")
+    finally:
+        cursor.close()
+        conn.close()
+
+    if failures:
+        print(f"\n{len(failures)} queries scan or sort RENTDETAILS unexpectedly:")
+        for name in failures:
+            print(f"  - {name}")
+        return False
+    print("\nNo unexpected scans or sorts.")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Apply RENTDETAILS schema migrations')
+    parser.add_argument('--status', action='store_true', help='list applied and pending migrations')
+    parser.add_argument('--check', action='store_true', help='EXPLAIN app queries and fail on unexpected scans or sorts')
+    args = parser.parse_args()
+
+    if args.status:
+        status()
+    elif args.check:
+        sys.exit(0 if check() else 1)
+    else:
+        migrate()
@@ -0,0 +1,50 @@
+from extensions import db
+
+# Models
+class User(db.Model):
+    __tablename__ = 'USERS'  # If your SQL Server table has a different name
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    password = db.Column(db.String(120), nullable=False)
+    role = db.Column(db.String(20), nullable=False, default='user')
+
+
+class Site(db.Model):
+    __tablename__ = 'RENTDETAILS'  # Actual table name from the database
+    ENTRY_NO = db.Column(db.Integer, primary_key=True)
+    SITE = db.Column('SITE', db.String(10), unique=True, nullable=False)
+    STORE_NAME = db.Column('STORE NAME', db.String(100), nullable=False)
+    REGION = db.Column(db.String(50), nullable=False)
+    DIV = db.Column(db.String(10), nullable=False)
+    MANAGER = db.Column(db.String(100), nullable=False)
+    ASST_MANAGER = db.Column('ASST.MANAGER', db.String(100), nullable=False)
+    EXECUTIVE = db.Column(db.String(100), nullable=False)
+    DOO = db.Column('D.O.O', db.Date, nullable=False)
+    SQFT = db.Column('SQ.FT', db.Integer, nullable=False)
+    AGREEMENT_DATE = db.Column('AGREEMENT DATE', db.Date, nullable=False)
+    RENT_POSITION_DATE = db.Column('RENT POSITION DATE', db.Date, nullable=False)
+    RENT_EFFECTIVE_DATE = db.Column('RENT EFFECTIVE DATE', db.Date, nullable=False)
+    AGREEMENT_VALID_UPTO = db.Column('AGREEMENT VALID UPTO', db.Date)
+    CURRENT_DATE = db.Column('CURRENT DATE', db.Date)
+    LEASE_PERIOD = db.Column('LEASE PERIOD', db.Integer, nullable=False)
+    RENT_FREE_PERIOD_DAYS = db.Column('RENT FREE PERIOD_DAYS', db.Integer, nullable=False)
+    RENT_EFFECTIVE_AMOUNT = db.Column('RENT EFFECTIVE AMOUNT', db.Float, nullable=False)
+    PRESENT_RENT = db.Column('PRESENT RENT', db.Float, nullable=False)
+    HIKE_PERCENTAGE = db.Column('HIKE %', db.Float, nullable=False)
+    HIKE_YEAR = db.Column('HIKE YEAR', db.Integer, nullable=False)
+    RENT_DEPOSIT = db.Column('RENT DEPOSIT', db.Float, nullable=False)
+    OWNER_NAME1 = db.Column('OWNER NAME-1', db.String(100), nullable=False)
+    OWNER_NAME2 = db.Column('OWNER NAME-2', db.String(100))
+    OWNER_NAME3 = db.Column('OWNER NAME-3', db.String(100))
+    OWNER_NAME4 = db.Column('OWNER NAME-4', db.String(100))
+    OWNER_NAME5 = db.Column('OWNER NAME-5', db.String(100))
+    OWNER_NAME6 = db.Column('OWNER NAME-6', db.String(100))
+    OWNER_MOBILE = db.Column('OWNER MOBILE NUMBER', db.String(20))
+    CURRENT_DATE1 = db.Column('CURRENT DATE 1', db.String(50))
+    VALIDITY_DATE = db.Column('VALIDITY DATE', db.String(50))
+    GST_NUMBER = db.Column('GST_NUMBER', db.String(20), nullable=False)
+    PAN_NUMBER = db.Column('PAN_NUMBER', db.String(20), nullable=False)
+    TDS_PERCENTAGE = db.Column('TDS_PERCENTAGE', db.Float, nullable=False)
+    MATURE = db.Column(db.String(3), nullable=False)
+    STATUS = db.Column(db.String(10), nullable=False)
+    REMARKS = db.Column(db.Text)
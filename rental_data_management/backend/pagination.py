@@ -0,0 +1,134 @@
+import base64
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Sortable fields for the site listing. Every column here is NOT NULL and
+# indexed, so keyset predicates on (column, ENTRY_NO) stay index range scans.
+# `PRESENT RENT` is a FLOAT: a value read back and sent in a cursor does not
+# compare equal to the stored one, so it is sorted and compared as the
+# DECIMAL(12,2) it is rounded to (migration 4 indexes that expression).
+SORT_COLUMNS = {
+    'entry_no': 'ENTRY_NO',
+    'site': 'SITE',
+    'agreement_date': '`AGREEMENT DATE`',
+    'present_rent': 'CAST(`PRESENT RENT` AS DECIMAL(12,2))',
+    'lease_period': '`LEASE PERIOD`'
+}
+
+DATE_SORTS = {'agreement_date'}
+DECIMAL_SORTS = {'present_rent'}
+CENTS = Decimal('0.01')
+
+# Equality filters accepted as query parameters
+FILTER_COLUMNS = {
+    'region': 'REGION',
+    'div': '`DIV`',
+    'status': 'STATUS',
+    'mature': 'MATURE'
+}
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+
+def decimal_key(value):
+    """A FLOAT as MySQL's CAST(... AS DECIMAL(12,2)) rounds it (half away from zero)."""
+    return Decimal(repr(float(value))).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def encode_cursor(sort, order, value, entry_no):
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()[:10]
+    elif sort in DECIMAL_SORTS:
+        value = str(decimal_key(value))
+    payload = json.dumps({'s': sort, 'o': order, 'v': value, 'id': entry_no}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort, order):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        value, entry_no = payload['v'], int(payload['id'])
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if payload.get('s') != sort or payload.get('o') != order:
+        raise ValueError('Cursor does not match the requested sort order')
+    try:
+        if sort in DATE_SORTS:
+            value = datetime.strptime(value, '%Y-%m-%d').date()
+        elif sort in DECIMAL_SORTS:
+            value = Decimal(value).quantize(CENTS)
+            if not value.is_finite():
+                raise ValueError(value)
+    except (TypeError, ValueError, InvalidOperation):
+        raise ValueError('Invalid cursor')
+    return value, entry_no
+
+
+def build_site_listing_query(args, columns):
+    """Build the keyset-paginated listing query from request arguments.
+
+    Returns (query, params, sort, order, limit). Raises ValueError on bad input.
+    """
+    sort = args.get('sort', 'entry_no')
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Invalid sort field: {sort}")
+    order = args.get('order', 'asc').lower()
+    if order not in ('asc', 'desc'):
+        raise ValueError(f"Invalid sort order: {order}")
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    where = []
+    params = []
+    for arg, column in FILTER_COLUMNS.items():
+        value = args.get(arg)
+        if value:
+            where.append(f"{column} = %s")
+            params.append(value)
+
+    try:
+        # Compared as the sort key, so sort=present_rent pages stay range scans of one index
+        if args.get('min_rent'):
+            where.append(f"{SORT_COLUMNS['present_rent']} >= CAST(%s AS DECIMAL(12,2))")
+            params.append(float(args['min_rent']))
+        if args.get('max_rent'):
+            where.append(f"{SORT_COLUMNS['present_rent']} <= CAST(%s AS DECIMAL(12,2))")
+            params.append(float(args['max_rent']))
+        if args.get('expires_within'):
+            today = date.today()
+            where.append("`AGREEMENT VALID UPTO` BETWEEN %s AND %s")
+            params.extend([today, today + timedelta(days=int(args['expires_within']))])
+    except ValueError:
+        raise ValueError('min_rent, max_rent and expires_within must be numeric')
+
+    sort_column = SORT_COLUMNS[sort]
+    cursor = args.get('cursor')
+    if cursor:
+        value, entry_no = decode_cursor(cursor, sort, order)
+        op = '>' if order == 'asc' else '<'
+        if sort == 'entry_no':
+            where.append(f"ENTRY_NO {op} %s")
+            params.append(entry_no)
+        else:
+            placeholder = 'CAST(%s AS DECIMAL(12,2))' if sort in DECIMAL_SORTS else '%s'
+            where.append(f"({sort_column} {op} {placeholder} OR ({sort_column} = {placeholder} AND ENTRY_NO {op} %s))")
+            params.extend([value, value, entry_no])
+
+    query = f"SELECT {', '.join(columns)} FROM RENTDETAILS"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    direction = order.upper()
+    if sort == 'entry_no':
+        query += f" ORDER BY ENTRY_NO {direction}"
+    else:
+        query += f" ORDER BY {sort_column} {direction}, ENTRY_NO {direction}"
+    # Fetch one extra row to learn whether another page exists
+    query += " LIMIT %s"
+    params.append(limit + 1)
+    return query, params, sort, order, limit
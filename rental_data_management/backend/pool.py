@@ -0,0 +1,82 @@
+import threading
+import time
+from sqlalchemy import event
+
+
+class PoolStats:
+    """Counters describing how requests use the shared SQLAlchemy connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def install(self, engine):
+        # Pool events fire for both raw connections and ORM sessions
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'invalidate', self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def record_wait(self, elapsed):
+        with self._lock:
+            self.waits += 1
+            self.wait_time += elapsed
+            self.max_wait = max(self.max_wait, elapsed)
+
+    def snapshot(self, pool=None):
+        with self._lock:
+            stats = {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'waits': self.waits,
+                'wait_time_ms': round(self.wait_time * 1000, 3),
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+                'avg_wait_ms': round(self.wait_time * 1000 / self.waits, 3) if self.waits else 0.0
+            }
+        if pool is not None:
+            stats.update({
+                'size': pool.size(),
+                'checked_in': pool.checkedin(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow()
+            })
+        return stats
+
+
+def checkout(engine, stats, max_overflow):
+    """Check a raw DBAPI connection out of the engine pool, recording waits.
+
+    A checkout counts as a wait when every pooled connection was busy and the
+    overflow was exhausted, i.e. the caller had to block until one was returned.
+    """
+    pool = engine.pool
+    saturated = pool.checkedin() == 0 and pool.overflow() >= max_overflow
+    start = time.perf_counter()
+    conn = engine.raw_connection()
+    if saturated:
+        stats.record_wait(time.perf_counter() - start)
+    return conn
@@ -0,0 +1,170 @@
+from datetime import date, datetime
+
+# Columns needed to project a site's rent, in the order project_rows expects
+PROJECTION_COLUMNS = [
+    'SITE', 'REGION', '`DIV`', '`RENT EFFECTIVE AMOUNT`', '`RENT EFFECTIVE DATE`', '`HIKE %%`',
+    '`HIKE YEAR`', 'RENT_FREE_PERIOD_DAYS', '`LEASE PERIOD`', 'TDS_PERCENTAGE'
+]
+
+MAX_MONTHS = 600
+
+# Sites x months projected per numpy pass; each pass holds about ten such matrices
+CHUNK_CELLS = 250_000
+
+# Sites x months returned per site when detail is asked for
+MAX_DETAIL_CELLS = 120_000
+
+
+class ProjectionTooLarge(Exception):
+    pass
+
+
+def month_index(dates):
+    """Months since 1970-01 for an array of datetime64 values (NaT stays NaT)."""
+    return dates.astype('datetime64[M]')
+
+
+def project_rent(amount, effective_date, hike_pct, hike_year, rent_free_days,
+                 lease_period, tds_pct, start, months):
+    """Project monthly gross, TDS and net rent for every site in one pass.
+
+    All site arguments are 1-D arrays of equal length; dates are datetime64[D].
+    Rent is billed from the month the rent-free period ends until the lease
+    runs out (LEASE PERIOD years after the effective date, open-ended when 0).
+    It starts at RENT EFFECTIVE AMOUNT and compounds by HIKE % every HIKE YEAR
+    years on the calendar-month anniversary of RENT EFFECTIVE DATE.
+
+    Returns (month_labels, gross, tds, net) with matrices shaped (sites, months).
+    """
+    import numpy as np  # Loaded on the first projection, not at app startup
+    horizon = np.datetime64(start, 'M') + np.arange(months)
+
+    effective = effective_date.astype('datetime64[D]')
+    valid = ~np.isnat(effective)
+    effective_month = month_index(np.where(valid, effective, np.datetime64('1970-01-01')))
+    rent_start = month_index(np.where(
+        valid, effective + rent_free_days.astype('timedelta64[D]'), np.datetime64('1970-01-01')
+    ))
+
+    # Months since the effective date, per site and horizon month
+    elapsed = (horizon[None, :] - effective_month[:, None]).astype(np.int64)
+    interval = hike_year.astype(np.int64) * 12
+    steps = np.where(interval[:, None] > 0, elapsed // np.maximum(interval, 1)[:, None], 0)
+
+    lease_months = lease_period.astype(np.int64) * 12
+    active = valid[:, None] & (horizon[None, :] >= rent_start[:, None])
+    active &= (lease_months[:, None] <= 0) | (elapsed < lease_months[:, None])
+
+    growth = 1.0 + hike_pct.astype(np.float64)[:, None] / 100.0
+    gross = np.where(active, amount.astype(np.float64)[:, None] * growth ** np.maximum(steps, 0), 0.0)
+    tds = gross * (tds_pct.astype(np.float64)[:, None] / 100.0)
+    net = gross - tds
+    return horizon, gross, tds, net
+
+
+def project_rows(rows, start, months):
+    """Project rent for rows selected with PROJECTION_COLUMNS.
+
+    Returns (sites, month_labels, gross, tds, net) where sites is a list of
+    (site_id, region, div) tuples aligned with the matrix rows.
+    """
+    import numpy as np
+    if rows:
+        (sites, regions, divs, amount, effective, hike_pct, hike_year,
+         rent_free, lease_period, tds_pct) = zip(*rows)
+    else:
+        sites = regions = divs = amount = effective = hike_pct = hike_year = rent_free = lease_period = tds_pct = ()
+
+    def numbers(values, dtype):
+        return np.array([value or 0 for value in values], dtype=dtype)
+
+    def dates(values):
+        # pymysql hands back zero dates ('0000-00-00') as strings; like NULL, they project no rent
+        return np.array([value if isinstance(value, date) else None for value in values], dtype='datetime64[D]')
+
+    horizon, gross, tds, net = project_rent(
+        numbers(amount, np.float64),
+        dates(effective),
+        numbers(hike_pct, np.float64),
+        numbers(hike_year, np.int64),
+        numbers(rent_free, np.int64),
+        numbers(lease_period, np.int64),
+        numbers(tds_pct, np.float64),
+        start, months
+    )
+    return list(zip(sites, regions, divs)), [str(month) for month in horizon], gross, tds, net
+
+
+def parse_projection_args(args):
+    """Return (query, params, start, months, detail) for GET /api/projections.
+
+    Raises ValueError with a client-facing message on bad input.
+    """
+    try:
+        months = int(args.get('months', '12'))
+        start = args.get('start') or date.today().strftime('%Y-%m')
+        datetime.strptime(start, '%Y-%m')
+    except ValueError:
+        raise ValueError('months must be an integer and start must be YYYY-MM')
+    if not 1 <= months <= MAX_MONTHS:
+        raise ValueError(f'months must be between 1 and {MAX_MONTHS}')
+
+    # Optional filters; per-site rows are only returned when asked for
+    where = []
+    params = []
+    for arg, column in [('site_id', 'SITE'), ('region', 'REGION'), ('div', '`DIV`'), ('status', 'STATUS')]:
+        if args.get(arg):
+            where.append(f"{column} = %s")
+            params.append(args[arg])
+    detail = args.get('detail', 'false').lower() in ('1', 'true', 'yes')
+
+    query = f"SELECT {', '.join(PROJECTION_COLUMNS)} FROM RENTDETAILS"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    return query, params, start, months, detail
+
+
+def summarize_projection(rows, start, months, detail=False, max_detail_cells=MAX_DETAIL_CELLS):
+    """The GET /api/projections payload: monthly totals, plus per-site rows if detail.
+
+    Sites are projected in chunks of CHUNK_CELLS // months, so memory stays
+    bounded whatever the portfolio size. Per-site rows for more than
+    max_detail_cells sites x months raise ProjectionTooLarge.
+    """
+    import numpy as np
+    if detail and len(rows) * months > max_detail_cells:
+        raise ProjectionTooLarge(
+            f'detail is limited to {max_detail_cells} sites x months; '
+            f'this request has {len(rows)} sites x {months} months. Filter the sites or ask for fewer months.'
+        )
+    totals = np.zeros((3, months))
+    site_rows = []
+    chunk_size = max(1, CHUNK_CELLS // months)
+    # A vectorized pass per chunk of sites; an empty portfolio still gets its month labels
+    for offset in range(0, max(len(rows), 1), chunk_size):
+        sites, month_labels, gross, tds, net = project_rows(rows[offset:offset + chunk_size], start, months)
+        totals += [gross.sum(axis=0), tds.sum(axis=0), net.sum(axis=0)]
+        if detail:
+            site_rows.extend(
+                {
+                    'site_id': site_id,
+                    'region': region,
+                    'div': div,
+                    'gross': gross[i].round(2).tolist(),
+                    'tds': tds[i].round(2).tolist(),
+                    'net': net[i].round(2).tolist()
+                }
+                for i, (site_id, region, div) in enumerate(sites)
+            )
+    result = {
+        'months': month_labels,
+        'site_count': len(rows),
+        'totals': {
+            'gross': totals[0].round(2).tolist(),
+            'tds': totals[1].round(2).tolist(),
+            'net': totals[2].round(2).tolist()
+        }
+    }
+    if detail:
+        result['sites'] = site_rows
+    return result
@@ -0,0 +1,130 @@
+# Report definitions as SQL projections.
+#
+# Each report lists the (expression, key) pairs it returns per site and the
+# numeric measures summed into totals and REGION/DIV subtotals. Queries are
+# parameterized, so literal % signs are doubled.
+
+def _date(column):
+    return f"DATE_FORMAT({column}, '%%Y-%%m-%%d')"
+
+REPORTS = {
+    'Hike Report': {
+        'fields': [
+            ("SITE", 'site_id'),
+            ("`OWNER NAME-1`", 'owner_name'),
+            ("`PRESENT RENT`", 'present_rent'),
+            ("`HIKE %%`", 'hike_percentage'),
+            ("`HIKE YEAR`", 'hike_year'),
+            (_date("DATE_ADD(`AGREEMENT DATE`, INTERVAL 365 * `HIKE YEAR` DAY)"), 'last_hike'),
+            (_date("DATE_ADD(`AGREEMENT DATE`, INTERVAL 365 * (`HIKE YEAR` + 1) DAY)"), 'next_hike'),
+            ("`PRESENT RENT` * (1 + `HIKE %%` / 100)", 'amount')
+        ],
+        'measures': ['present_rent', 'amount']
+    },
+    'Rent Report': {
+        'fields': [
+            ("SITE", 'site_id'),
+            ("`PRESENT RENT`", 'present_rent'),
+            ("TDS_PERCENTAGE", 'tds_percentage'),
+            ("`PRESENT RENT` * (1 - TDS_PERCENTAGE / 100)", 'net'),
+            ("`PRESENT RENT`", 'jan_2023'),
+            ("`PRESENT RENT`", 'feb_2023'),
+            ("`PRESENT RENT`", 'mar_2023'),
+            ("`PRESENT RENT`", 'apr_2023')
+        ],
+        'measures': ['present_rent', 'net']
+    },
+    'Owner Wise Report': {
+        'fields': [
+            ("SITE", 'site_id'),
+            ("`OWNER NAME-1`", 'owner_name'),
+            (_date("`CURRENT DATE`"), 'current_date'),
+            (_date("`AGREEMENT DATE`"), 'agreement_date'),
+            (_date("`AGREEMENT VALID UPTO`"), 'agreement_valid_upto')
+        ],
+        'measures': []
+    },
+    'Negotiation Report': {
+        'fields': [
+            ("SITE", 'site_id'),
+            ("`HIKE %%`", 'old_hike_percentage'),
+            ("`HIKE %%` + 2", 'new_hike_percentage'),  # Example
+            ("`LEASE PERIOD`", 'old_lease_period'),
+            ("`LEASE PERIOD` + 1", 'new_lease_period'),  # Example
+            ("`PRESENT RENT`", 'old_present_rent'),
+            ("`PRESENT RENT` * 1.1", 'new_present_rent')  # Example
+        ],
+        'measures': ['old_present_rent', 'new_present_rent']
+    },
+    'Lease Period Report': {
+        'fields': [
+            ("SITE", 'site_id'),
+            ("`LEASE PERIOD`", 'lease_period'),
+            ("`HIKE %%`", 'hike_percentage'),
+            ("`PRESENT RENT`", 'present_rent'),
+            (_date("`AGREEMENT VALID UPTO`"), 'agreement_valid_upto')
+        ],
+        'measures': ['present_rent']
+    },
+    'ALL SITES DATA REPORTS': {
+        'fields': [
+            ("SITE", 'site_id'),
+            ("`STORE NAME`", 'store_name'),
+            ("REGION", 'region'),
+            ("`DIV`", 'div'),
+            ("STATUS", 'status'),
+            ("`PRESENT RENT`", 'present_rent'),
+            ("`LEASE PERIOD`", 'lease_period'),
+            ("`HIKE %%`", 'hike_percentage')
+        ],
+        'measures': ['present_rent']
+    }
+}
+
+
+def report_filter(from_date, to_date, lease_period=None):
+    where = "`AGREEMENT DATE` BETWEEN %s AND %s"
+    params = [from_date, to_date]
+    if lease_period:
+        where += " AND `LEASE PERIOD` = %s"
+        params.append(int(lease_period))
+    return where, params
+
+
+def build_report_query(report_type, where):
+    """Return (query, keys) selecting only the columns the report needs."""
+    fields = REPORTS[report_type]['fields']
+    select = ', '.join(f"{expr} AS `{key}`" for expr, key in fields)
+    query = f"SELECT {select} FROM RENTDETAILS WHERE {where} ORDER BY `AGREEMENT DATE`, ENTRY_NO"
+    return query, [key for _, key in fields]
+
+
+def build_summary_query(report_type, where):
+    """Return (query, keys) for totals and REGION/DIV subtotals.
+
+    WITH ROLLUP adds a per-REGION subtotal row (DIV is NULL) and a grand total
+    row (REGION and DIV are NULL) after the REGION/DIV groups.
+    """
+    expressions = dict((key, expr) for expr, key in REPORTS[report_type]['fields'])
+    measures = REPORTS[report_type]['measures']
+    select = ["REGION", "`DIV`", "COUNT(*)"]
+    select += [f"SUM({expressions[key]})" for key in measures]
+    query = (f"SELECT {', '.join(select)} FROM RENTDETAILS WHERE {where} "
+             f"GROUP BY REGION, `DIV` WITH ROLLUP")
+    return query, ['region', 'div', 'count'] + measures
+
+
+def split_rollup(rows, keys):
+    """Split WITH ROLLUP rows into (totals, subtotals)."""
+    totals = {key: 0 for key in keys[2:]}
+    subtotals = []
+    for row in rows:
+        entry = dict(zip(keys, row))
+        if entry['region'] is None and entry['div'] is None:
+            entry.pop('region')
+            entry.pop('div')
+            totals = entry
+        else:
+            entry['level'] = 'region' if entry['div'] is None else 'div'
+            subtotals.append(entry)
+    return totals, subtotals
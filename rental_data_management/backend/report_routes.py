@@ -0,0 +1,176 @@
+import logging
+from datetime import datetime
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
+from excel_import import EXPORT_COLUMNS, EXPORT_FORMATS, build_export_query
+from extensions import get_db_connection
+from metrics import timed
+from projections import ProjectionTooLarge, parse_projection_args, summarize_projection
+from report_queries import REPORTS, report_filter, build_report_query, build_summary_query, split_rollup
+from responses import not_modified, stream_query, tagged
+from serializers import row_serializer
+from services import portfolio, portfolio_refresh, versions
+from streaming import STREAM_FORMATS
+
+log = logging.getLogger('rental.api')
+
+bp = Blueprint('reports', __name__)
+
+def parse_report_args(args):
+    """Return (report_type, where, params) for GET /api/reports.
+
+    Raises ValueError with a client-facing message on bad input.
+    """
+    report_type = args.get('type')
+    from_date = args.get('from_date')
+    to_date = args.get('to_date')
+    
+    if not all([report_type, from_date, to_date]):
+        raise ValueError('Missing required parameters')
+    if report_type not in REPORTS:
+        raise ValueError('Invalid report type')
+    try:
+        from_date_obj = datetime.strptime(from_date, '%Y-%m-%d').date()
+        to_date_obj = datetime.strptime(to_date, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError('from_date and to_date must be YYYY-MM-DD')
+    
+    where, params = report_filter(from_date_obj, to_date_obj, args.get('lease_period'))
+    return report_type, where, params
+
+def summary_payload(summary):
+    """{'totals', 'subtotals'} from the (description, rows, keys) of a build_summary_query result."""
+    description, rows, keys = summary
+    rows = row_serializer(description, keys).tuples(rows)
+    totals, subtotals = split_rollup(rows, keys)
+    return {'totals': totals, 'subtotals': subtotals}
+
+def report_payload(report, summary):
+    """The JSON report body. report and summary are (description, rows, keys)
+    of the build_report_query and build_summary_query results."""
+    description, rows, keys = report
+    with timed('transform'):
+        data = row_serializer(description, keys).dicts(rows)
+        # Totals and REGION/DIV subtotals
+        return dict({'data': data}, **summary_payload(summary))
+
+def summary_trailer(report_type, where, params):
+    """The last record of an NDJSON report stream: {'summary': {'totals', 'subtotals'}}."""
+    def trailer(cursor):
+        query, keys = build_summary_query(report_type, where)
+        cursor.execute(query, params)
+        return {'summary': summary_payload((cursor.description, cursor.fetchall(), keys))}
+    return trailer
+
+@bp.route('/api/reports', methods=['GET'])
+@jwt_required()
+def get_report():
+    try:
+        report_type, where, params = parse_report_args(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    output = request.args.get('format', 'json')
+    if output != 'json' and output not in STREAM_FORMATS:
+        return jsonify({'message': f'Invalid format: {output}'}), 400
+    
+    etag = versions.table_etag()
+    unchanged = not_modified(etag)
+    if unchanged is not None:
+        return unchanged
+    
+    try:
+        if output != 'json':
+            # Rows first, then the totals the JSON format returns alongside them
+            query, keys = build_report_query(report_type, where)
+            trailer = summary_trailer(report_type, where, params)
+            return tagged(stream_query(query, params, keys, output, 'report', trailer), etag)
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Rows: only the columns the report needs, derived values computed in SQL
+        query, keys = build_report_query(report_type, where)
+        cursor.execute(query, params)
+        report = (cursor.description, cursor.fetchall(), keys)
+        
+        query, keys = build_summary_query(report_type, where)
+        cursor.execute(query, params)
+        summary = (cursor.description, cursor.fetchall(), keys)
+        
+        return tagged(jsonify(report_payload(report, summary)), etag), 200
+    except Exception as e:
+        log.exception("Report generation error")
+        return jsonify({'message': f'Error generating report: {str(e)}'}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+@bp.route('/api/reports/export', methods=['GET'])
+@jwt_required()
+def export_report():
+    from_date = request.args.get('from_date')
+    to_date = request.args.get('to_date')
+    output = request.args.get('format', 'xlsx')
+    
+    if not all([from_date, to_date]):
+        return jsonify({'message': 'Missing required parameters'}), 400
+    if output not in EXPORT_FORMATS:
+        return jsonify({'message': f'Invalid format: {output}'}), 400
+    
+    etag = versions.table_etag()
+    unchanged = not_modified(etag)
+    if unchanged is not None:
+        return unchanged
+    
+    try:
+        from_date_obj = datetime.strptime(from_date, '%Y-%m-%d').date()
+        to_date_obj = datetime.strptime(to_date, '%Y-%m-%d').date()
+        where, params = report_filter(from_date_obj, to_date_obj, request.args.get('lease_period'))
+        query = build_export_query(where, order_by='`AGREEMENT DATE`, ENTRY_NO')
+        return tagged(stream_query(query, params, EXPORT_COLUMNS, output, 'report'), etag)
+    except ValueError as e:
+        return jsonify({'message': f'Invalid parameter: {str(e)}'}), 400
+    except Exception as e:
+        log.exception("Report export error")
+        return jsonify({'message': f'Error exporting report: {str(e)}'}), 500
+
+@bp.route('/api/analytics', methods=['GET'])
+@jwt_required()
+def get_analytics():
+    try:
+        portfolio_refresh.ensure()
+        return jsonify(portfolio.summary()), 200
+    except Exception as e:
+        log.exception("Analytics error")
+        return jsonify({'message': f'Error loading analytics: {str(e)}'}), 500
+
+@bp.route('/api/projections', methods=['GET'])
+@jwt_required()
+def get_projections():
+    try:
+        query, params, start, months, detail = parse_projection_args(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        
+        with timed('transform'):
+            result = summarize_projection(rows, start, months, detail, current_app.config['PROJECTION_MAX_DETAIL_CELLS'])
+        return jsonify(result), 200
+    except ProjectionTooLarge as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        log.exception("Projection error")
+        return jsonify({'message': f'Error generating projections: {str(e)}'}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
@@ -0,0 +1,71 @@
+import functools
+import logging
+from flask import Response, current_app, request
+from compression import encoded_etags
+from extensions import get_db_connection
+from json_provider import dumps
+from metrics import TimedSSCursor
+from streaming import STREAM_FORMATS
+
+log = logging.getLogger('rental.api')
+
+def stream_query(query, params, keys, output, filename, trailer=None):
+    """Stream query results as NDJSON or CSV with a chunked response.
+
+    Rows are read through an unbuffered server-side cursor as the client
+    consumes them, so worker memory stays flat whatever the row count.
+    trailer(cursor), if given, is called with a cursor on the same
+    connection after the last row; its record ends an NDJSON stream.
+    The 200 status has been sent by the time a read can fail, so a failed
+    NDJSON stream ends with an {"error": ...} record instead of more rows.
+    CSV and XLSX downloads re-raise instead, so the server aborts the
+    response and the browser marks the download as failed rather than
+    saving a truncated file.
+    """
+    mimetype, chunks = STREAM_FORMATS[output]
+    if output == 'xlsx':
+        chunks = functools.partial(chunks, max_rows=current_app.config['XLSX_MAX_ROWS'])
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(TimedSSCursor)
+        cursor.execute(query, params)
+    except Exception:
+        conn.close()
+        raise
+    
+    def generate():
+        try:
+            yield from chunks(cursor, keys)
+            if trailer is not None and output == 'ndjson':
+                trailer_cursor = conn.cursor()
+                try:
+                    record = trailer(trailer_cursor)
+                finally:
+                    trailer_cursor.close()
+                yield dumps(record) + '\n'
+        except Exception as e:
+            log.exception("Streaming error")
+            if output != 'ndjson':
+                raise
+            yield dumps({'error': f'Error streaming rows: {str(e)}'}) + '\n'
+        finally:
+            cursor.close()
+            conn.close()
+    
+    return Response(generate(), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename={filename}.{output}',
+        'X-Accel-Buffering': 'no'
+    })
+
+def not_modified(etag):
+    """A 304 response if the client already holds etag (in any encoding), else None."""
+    if not any(request.if_none_match.contains(candidate) for candidate in encoded_etags(etag)):
+        return None
+    response = current_app.response_class(status=304)
+    return tagged(response, etag)
+
+def tagged(response, etag):
+    response.set_etag(etag)
+    # Browsers may keep the response but must revalidate it before each use
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import threading
+import time
+
+
+class RevocationList:
+    """Revoked token ids and token families with TTL eviction.
+
+    Entries only need to live until the revoked token would have expired
+    anyway, so each one carries that expiry and is dropped once it passes.
+    Lookups never touch the database. Without a directory the set lives in
+    this process only; with one, every entry is also a small file there, so
+    all worker processes on the host see each other's revocations.
+
+    Refresh tokens are spent with rotate(), which checks and revokes in one
+    step (an O_EXCL create when a directory is shared). A token rotated less
+    than grace seconds ago still passes is_revoked and rotate, so two tabs
+    refreshing with the same token both get a new pair instead of one of them
+    looking like a replay.
+    """
+
+    def __init__(self, prune_interval=60, directory=None):
+        self.prune_interval = prune_interval
+        self.directory = directory
+        self._lock = threading.Lock()
+        # key -> (expires_at, rotated_at); rotated_at is 0 for a hard revocation
+        self._entries = {}
+        self._next_prune = time.time() + prune_interval
+        self.revocations = 0
+        self.rotations = 0
+        self.reuses = 0
+        self.expirations = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def revoke(self, key, expires_at):
+        """Revoke key (a jti or 'family:<id>') until the epoch time expires_at."""
+        with self._lock:
+            current = self._read(key)
+            self._write(key, (max(expires_at, current[0] if current else 0), 0))
+            self.revocations += 1
+            self._prune()
+
+    def rotate(self, key, expires_at, grace=0):
+        """Spend a refresh token; False if it was already spent more than grace seconds ago."""
+        now = time.time()
+        with self._lock:
+            if self._write(key, (expires_at, now), exclusive=True):
+                self.rotations += 1
+                self._prune()
+                return True
+            current = self._read(key)
+            if current and current[1] and now - current[1] <= grace:
+                return True
+            self.reuses += 1
+            return False
+
+    def is_revoked(self, key, grace=0):
+        now = time.time()
+        with self._lock:
+            current = self._read(key)
+            if current is None:
+                return False
+            expires_at, rotated_at = current
+            if expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                return False
+            return not (rotated_at and now - rotated_at <= grace)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    def _read(self, key):
+        if not self.directory:
+            return self._entries.get(key)
+        try:
+            with open(self._path(key)) as f:
+                expires_at, rotated_at = f.read().split()
+            return float(expires_at), float(rotated_at)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # Created by a rotate() in another process that has not written it yet
+            return float('inf'), time.time()
+
+    def _write(self, key, entry, exclusive=False):
+        if not self.directory:
+            if exclusive and key in self._entries:
+                return False
+            self._entries[key] = entry
+            return True
+        path = self._path(key)
+        data = f'{entry[0]} {entry[1]}'
+        if exclusive:
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            except FileExistsError:
+                return False
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+            return True
+        temp = f'{path}.{os.getpid()}.{threading.get_ident()}'
+        with open(temp, 'w') as f:
+            f.write(data)
+        os.replace(temp, path)
+        return True
+
+    def _remove(self, key):
+        if not self.directory:
+            self._entries.pop(key, None)
+            return
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _keys(self):
+        if not self.directory:
+            return list(self._entries)
+        return [name for name in os.listdir(self.directory) if '.' not in name]
+
+    def _prune(self):
+        now = time.time()
+        if now < self._next_prune:
+            return
+        expired = 0
+        if self.directory:
+            for name in self._keys():
+                try:
+                    with open(os.path.join(self.directory, name)) as f:
+                        expires_at = float(f.read().split()[0])
+                except (FileNotFoundError, ValueError, IndexError):
+                    continue
+                if expires_at <= now:
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                        expired += 1
+                    except FileNotFoundError:
+                        pass
+        else:
+            for key, (expires_at, _) in list(self._entries.items()):
+                if expires_at <= now:
+                    del self._entries[key]
+                    expired += 1
+        self.expirations += expired
+        self._next_prune = now + self.prune_interval
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._keys()),
+                'shared': bool(self.directory),
+                'revocations': self.revocations,
+                'rotations': self.rotations,
+                'reuses': self.reuses,
+                'expirations': self.expirations
+            }
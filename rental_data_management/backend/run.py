@@ -1,5 +1,9 @@
-from app import app, DB_SERVER, DB_DATABASE, DB_USER
+import os
+from app import app, warmup
+from config import DB_HOST, DB_DATABASE, DB_USER
 
 if __name__ == '__main__':
-    print(f"Connecting to database {DB_DATABASE} on server {DB_SERVER} as user {DB_USER}")
-    app.run(debug=True, port=5000) 
\ No newline at end of file
+    print(f"Connecting to database {DB_DATABASE} on server {DB_HOST} as user {DB_USER}")
+    # Development server; production runs under gunicorn (see gunicorn.conf.py)
+    warmup.start()
+    app.run(debug=os.getenv('FLASK_DEBUG', '0') == '1', port=int(os.getenv('PORT', '5000')))
\ No newline at end of file
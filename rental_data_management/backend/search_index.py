@@ -0,0 +1,253 @@
+import bisect
+import heapq
+import re
+import threading
+import time
+from collections import defaultdict
+from site_cache import cache_key
+
+# Columns feeding the index, in the order apply() expects, with a ranking weight each
+SEARCH_FIELDS = [
+    ('SITE', 'site_id', 4.0),
+    ('`STORE NAME`', 'store_name', 3.0),
+    ('REGION', 'region', 0.5),
+    ('STATUS', 'status', 0.5),
+    ('`OWNER NAME-1`', 'owner_name1', 2.0),
+    ('`OWNER NAME-2`', 'owner_name2', 2.0),
+    ('`OWNER NAME-3`', 'owner_name3', 2.0),
+    ('`OWNER NAME-4`', 'owner_name4', 2.0),
+    ('`OWNER NAME-5`', 'owner_name5', 2.0),
+    ('`OWNER NAME-6`', 'owner_name6', 2.0),
+    ('MANAGER', 'manager', 1.5),
+    ('EXECUTIVE', 'executive', 1.5),
+    ('GST_NUMBER', 'gst_number', 3.0),
+    ('PAN_NUMBER', 'pan_number', 3.0)
+]
+SEARCH_COLUMNS = [column for column, _, _ in SEARCH_FIELDS]
+
+# Fields echoed back with each hit
+RESULT_FIELDS = ('site_id', 'store_name', 'region', 'status')
+
+# How much an exact, prefix or typo-tolerant token match is worth
+EXACT, PREFIX, FUZZY = 3.0, 2.0, 1.0
+
+MIN_PREFIX_LENGTH = 2
+MIN_FUZZY_LENGTH = 4
+MAX_EXPANSIONS = 200
+
+TOKEN = re.compile(r'[^\W_]+')
+
+
+def tokenize(text):
+    return TOKEN.findall(str(text).casefold()) if text else []
+
+
+def trigrams(token):
+    padded = f'^{token}$'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def within_distance(a, b, limit):
+    """True if the Levenshtein distance between a and b is at most limit."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class SearchIndex:
+    """In-memory inverted index over site names, people and tax ids.
+
+    Postings map each token to the sites containing it and the best field
+    weight it appears with. A sorted vocabulary answers prefix lookups with
+    bisect, and a trigram index over the vocabulary finds typo candidates,
+    which are confirmed with a bounded edit distance. Every query term must
+    match; hits are ranked by the sum of match quality times field weight,
+    ties in index order.
+    Sites are indexed and removed one at a time as they are written.
+    """
+
+    def __init__(self, refresh_interval=300):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._vocabulary = []
+        self._grams = defaultdict(set)
+        self._sites = {}
+        self._loaded_at = None
+        self._invalidated_at = None
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    @property
+    def stale(self):
+        if self._loaded_at is None:
+            return True
+        if self._invalidated_at is not None and self._invalidated_at >= self._loaded_at:
+            return True
+        return time.monotonic() - self._loaded_at > self.refresh_interval
+
+    def invalidate(self):
+        """Mark for a full rebuild (used after bulk writes); searches keep using the current index until then."""
+        with self._lock:
+            self._invalidated_at = time.monotonic()
+
+    def load(self, rows, as_of=None):
+        """Rebuild from rows selected with SEARCH_COLUMNS.
+
+        as_of is the monotonic time the rows were read at; an invalidation
+        after it leaves the index stale. The new index is built aside and
+        swapped in, so searches keep being answered from the old one while a
+        rebuild runs.
+        """
+        fresh = SearchIndex(self.refresh_interval)
+        for row in rows:
+            fresh._add(row)
+        fresh._vocabulary = sorted(fresh._postings)
+        with self._lock:
+            self._postings, self._vocabulary = fresh._postings, fresh._vocabulary
+            self._grams, self._sites = fresh._grams, fresh._sites
+            self._loaded_at = as_of if as_of is not None else time.monotonic()
+
+    def apply(self, row):
+        """Insert or replace one site."""
+        with self._lock:
+            self._remove(cache_key(row[0]))
+            self._add(row, incremental=True)
+
+    def remove(self, site_id):
+        with self._lock:
+            self._remove(cache_key(site_id))
+
+    def _add(self, row, incremental=False):
+        key = cache_key(row[0])
+        weights = {}
+        for (_, _, weight), value in zip(SEARCH_FIELDS, row):
+            for token in tokenize(value):
+                weights[token] = max(weights.get(token, 0.0), weight)
+        result = {name: value for (_, name, _), value in zip(SEARCH_FIELDS, row) if name in RESULT_FIELDS}
+        self._sites[key] = (result, tuple(weights))
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                for gram in trigrams(token):
+                    self._grams[gram].add(token)
+                if incremental:
+                    bisect.insort(self._vocabulary, token)
+            postings[key] = weight
+
+    def _remove(self, key):
+        entry = self._sites.pop(key, None)
+        if entry is None:
+            return
+        for token in entry[1]:
+            postings = self._postings[token]
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[token]
+                for gram in trigrams(token):
+                    self._grams[gram].discard(token)
+                    if not self._grams[gram]:
+                        del self._grams[gram]
+                i = bisect.bisect_left(self._vocabulary, token)
+                if i < len(self._vocabulary) and self._vocabulary[i] == token:
+                    del self._vocabulary[i]
+
+    def _expand(self, term, is_last):
+        """Vocabulary tokens matching a query term, each with its match quality.
+
+        Earlier terms are complete words: an exact hit is taken as is. The
+        last term may still be being typed, so it also matches as a prefix.
+        Typo tolerance only kicks in when nothing else matched.
+        """
+        matches = {}
+        if term in self._postings:
+            matches[term] = EXACT
+            if not is_last:
+                return matches
+        if len(term) >= MIN_PREFIX_LENGTH:
+            start = bisect.bisect_left(self._vocabulary, term)
+            for token in self._vocabulary[start:start + MAX_EXPANSIONS]:
+                if not token.startswith(term):
+                    break
+                matches.setdefault(token, PREFIX)
+        if not matches and len(term) >= MIN_FUZZY_LENGTH:
+            limit = 1 if len(term) < 8 else 2
+            grams = trigrams(term)
+            # q-gram lemma: an edit touches at most three trigrams
+            needed = max(1, len(grams) - 3 * limit)
+            shared = defaultdict(int)
+            for gram in grams:
+                for token in self._grams.get(gram, ()):
+                    shared[token] += 1
+            candidates = [token for token, count in shared.items() if count >= needed]
+            for token in candidates[:MAX_EXPANSIONS * 5]:
+                if within_distance(term, token, limit):
+                    matches[token] = FUZZY
+        return matches
+
+    def _score(self, matches):
+        """Best match score per site for one query term."""
+        if len(matches) == 1:
+            (token, quality), = matches.items()
+            return {key: quality * weight for key, weight in self._postings[token].items()}
+        scores = {}
+        for token, quality in matches.items():
+            for key, weight in self._postings[token].items():
+                score = quality * weight
+                if score > scores.get(key, 0.0):
+                    scores[key] = score
+        return scores
+
+    def _narrow(self, scores, matches):
+        """Keep the sites in scores that also match the next term, adding its score."""
+        if len(matches) == 1:
+            (token, quality), = matches.items()
+            postings = self._postings[token]
+            if len(postings) < len(scores):
+                return {key: scores[key] + quality * weight for key, weight in postings.items() if key in scores}
+            return {key: score + quality * postings[key] for key, score in scores.items() if key in postings}
+        term_scores = self._score(matches)
+        return {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+
+    def search(self, query, limit=20):
+        """Return (hits, total) for a free-text query, best match first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return [], 0
+        with self._lock:
+            expanded = [self._expand(term, position == len(terms) - 1) for position, term in enumerate(terms)]
+            if not all(expanded):
+                return [], 0
+            if len(expanded) == 1 and len(expanded[0]) == 1:
+                # One token: rank its postings directly instead of copying them
+                (token, quality), = expanded[0].items()
+                postings = self._postings[token]
+                ranked = heapq.nlargest(limit, postings, key=postings.get)
+                hits = [dict(self._sites[key][0], score=round(quality * postings[key], 2)) for key in ranked]
+                return hits, len(postings)
+            # Most selective term first, so the rest only narrow its survivors
+            expanded.sort(key=lambda matches: sum(len(self._postings[token]) for token in matches))
+            scores = self._score(expanded[0])
+            for matches in expanded[1:]:
+                scores = self._narrow(scores, matches)
+                if not scores:
+                    return [], 0
+            # nlargest is stable: equal scores keep index order
+            ranked = heapq.nlargest(limit, scores, key=scores.get)
+            hits = [dict(self._sites[key][0], score=round(scores[key], 2)) for key in ranked]
+        return hits, len(scores)
+
+    def stats(self):
+        with self._lock:
+            return {'sites': len(self._sites), 'tokens': len(self._postings), 'trigrams': len(self._grams)}
@@ -0,0 +1,89 @@
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+from pymysql.constants import FIELD_TYPE
+
+# Dates in API payloads are dd-mm-yyyy, as the frontend displays them
+DISPLAY_DATE_FORMAT = '%d-%m-%Y'
+
+DATE_TYPES = {FIELD_TYPE.DATE, FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP, FIELD_TYPE.NEWDATE}
+DECIMAL_TYPES = {FIELD_TYPE.DECIMAL, FIELD_TYPE.NEWDECIMAL}
+
+
+def date_converter(date_format):
+    def convert(value):
+        # MySQL zero dates arrive as strings and NULLs as None; both pass through
+        return value.strftime(date_format) if isinstance(value, date) else value
+    return convert
+
+
+def to_float(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+
+class RowSerializer:
+    """Converts DBAPI rows into JSON-ready dicts or tuples.
+
+    The converter for each column is chosen once from its MySQL type code
+    (dates to date_format strings, or left as dates for the JSON provider to
+    encode when date_format is None, DECIMAL to float, everything else passed
+    through), so serializing a batch is a zip plus one call per converted
+    cell, with no per-row type checks or column-name lookups.
+    """
+
+    def __init__(self, names, type_codes, keys, date_format=DISPLAY_DATE_FORMAT):
+        self.names = names
+        self.keys = keys
+        to_date_string = date_converter(date_format) if date_format else None
+        self._converters = []
+        for i, type_code in enumerate(type_codes):
+            if type_code in DATE_TYPES and to_date_string:
+                self._converters.append((i, to_date_string))
+            elif type_code in DECIMAL_TYPES:
+                self._converters.append((i, to_float))
+        self._positions = {name: i for i, name in enumerate(names)}
+
+    def index(self, name):
+        return self._positions[name]
+
+    def tuple(self, row):
+        if not self._converters:
+            return tuple(row)
+        values = list(row)
+        for i, convert in self._converters:
+            values[i] = convert(values[i])
+        return tuple(values)
+
+    def tuples(self, rows):
+        if not self._converters:
+            return [tuple(row) for row in rows]
+        return [self.tuple(row) for row in rows]
+
+    def dict(self, row):
+        return dict(zip(self.keys, self.tuple(row)))
+
+    def dicts(self, rows):
+        keys = self.keys
+        if not self._converters:
+            return [dict(zip(keys, row)) for row in rows]
+        return [dict(zip(keys, self.tuple(row))) for row in rows]
+
+
+@lru_cache(maxsize=128)
+def _compile(description, keys, date_format):
+    names = tuple(column[0] for column in description)
+    type_codes = tuple(column[1] for column in description)
+    return RowSerializer(names, type_codes, keys, date_format)
+
+
+def row_serializer(description, keys=None, key_map=None, date_format=DISPLAY_DATE_FORMAT):
+    """Return the (cached) serializer for a cursor.description.
+
+    Output keys are either given explicitly, in column order, or looked up in
+    key_map (column name -> key, defaulting to the lowercased column name).
+    """
+    description = tuple(tuple(column) for column in description)
+    if keys is None:
+        key_map = key_map or {}
+        keys = (key_map.get(column[0], column[0].lower()) for column in description)
+    return _compile(description, tuple(keys), date_format)
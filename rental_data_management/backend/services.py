@@ -0,0 +1,159 @@
+"""Per-process caches, indexes and counters shared by the blueprints.
+
+They hold data, not app state, so every app built in a process (one per
+worker) uses the same instances. Their sizes come from the environment.
+"""
+import logging
+import os
+import tempfile
+import time
+from flask import current_app
+import metrics
+from analytics import ANALYTICS_COLUMNS, PortfolioRollup
+from credentials import CredentialVerifier
+from extensions import db, db_connection, get_db_connection, pool_stats
+from revocation import RevocationList
+from search_index import SEARCH_COLUMNS, SearchIndex
+from site_cache import SiteCache
+from snapshot_refresh import SnapshotRefresher
+from static_assets import StaticAssets
+from versions import DataVersions
+from warmup import Warmup
+
+log = logging.getLogger('rental.api')
+
+# The HTML, JS, CSS and images one level above backend/
+FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Portfolio aggregates for GET /api/analytics, kept current by the write endpoints
+portfolio = PortfolioRollup(refresh_interval=int(os.getenv('ANALYTICS_REFRESH', '300')))
+
+# Inverted index behind GET /api/sites/search, maintained the same way
+search_index = SearchIndex(refresh_interval=int(os.getenv('SEARCH_REFRESH', '300')))
+
+# Serialized single-site payloads for GET /api/sites?site_id=
+site_cache = SiteCache(
+    maxsize=int(os.getenv('SITE_CACHE_SIZE', '1024')),
+    ttl=int(os.getenv('SITE_CACHE_TTL', '300'))
+)
+
+# bcrypt verification off the request threads, with a short-lived success cache
+verifier = CredentialVerifier(
+    max_workers=int(os.getenv('LOGIN_WORKERS', '2')),
+    max_pending=int(os.getenv('LOGIN_QUEUE_SIZE', '32')),
+    ttl=int(os.getenv('LOGIN_CACHE_TTL', '300'))
+)
+
+# Revoked token ids and refresh-token families; checked on every protected request.
+# Kept as files in a directory every worker process on the host shares.
+revoked_tokens = RevocationList(
+    directory=os.getenv('REVOCATION_DIR') or os.path.join(tempfile.gettempdir(), 'rental_revoked')
+)
+
+# Versions behind the ETags of site and report responses; bumped by every write
+versions = DataVersions(max_age=site_cache.ttl)
+static_assets = StaticAssets(FRONTEND_DIR)
+
+metrics.registry.add_gauges('db_pool', 'Connection pool statistics', lambda: pool_stats.snapshot(db.engine.pool))
+metrics.registry.add_gauges('site_cache', 'Single-site cache statistics', site_cache.stats)
+metrics.registry.add_gauges('login', 'Credential verification statistics', verifier.stats)
+metrics.registry.add_gauges('revoked_tokens', 'Token revocation list statistics', revoked_tokens.stats)
+metrics.registry.add_gauges('search_index', 'Site search index statistics', search_index.stats)
+
+def refresh_portfolio():
+    as_of = time.monotonic()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(ANALYTICS_COLUMNS)} FROM RENTDETAILS")
+        portfolio.load(cursor.fetchall(), as_of)
+        cursor.close()
+
+def sync_portfolio(cursor, *site_ids):
+    """Re-read sites after a committed write and update their rollup contribution."""
+    site_ids = [site_id for site_id in site_ids if site_id]
+    if not site_ids:
+        return
+    if portfolio.stale:
+        # A reload is due (or running, possibly from rows read before this write): make sure it sees it
+        portfolio.invalidate()
+        return
+    try:
+        placeholders = ', '.join(['%s'] * len(site_ids))
+        cursor.execute(f"SELECT {', '.join(ANALYTICS_COLUMNS)} FROM RENTDETAILS WHERE SITE IN ({placeholders})", site_ids)
+        for site_id in site_ids:
+            portfolio.remove(site_id)
+        for row in cursor.fetchall():
+            portfolio.apply(row)
+    except Exception as e:
+        log.warning("Analytics sync error: %s", e)
+        portfolio.invalidate()
+
+def refresh_search_index():
+    as_of = time.monotonic()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(SEARCH_COLUMNS)} FROM RENTDETAILS ORDER BY SITE")
+        search_index.load(cursor.fetchall(), as_of)
+        cursor.close()
+
+def sync_search_index(cursor, *site_ids):
+    """Re-index sites after a committed write."""
+    site_ids = [site_id for site_id in site_ids if site_id]
+    if not site_ids:
+        return
+    if search_index.stale:
+        search_index.invalidate()
+        return
+    try:
+        placeholders = ', '.join(['%s'] * len(site_ids))
+        cursor.execute(f"SELECT {', '.join(SEARCH_COLUMNS)} FROM RENTDETAILS WHERE SITE IN ({placeholders})", site_ids)
+        for site_id in site_ids:
+            search_index.remove(site_id)
+        for row in cursor.fetchall():
+            search_index.apply(row)
+    except Exception as e:
+        log.warning("Search index sync error: %s", e)
+        search_index.invalidate()
+
+# Single-flight reloads: readers get the last snapshot while a stale one is rebuilt
+portfolio_refresh = SnapshotRefresher('portfolio', portfolio, refresh_portfolio)
+search_refresh = SnapshotRefresher('search_index', search_index, refresh_search_index)
+metrics.registry.add_gauges('portfolio_refresh', 'Analytics rollup reload statistics', portfolio_refresh.stats)
+metrics.registry.add_gauges('search_refresh', 'Search index rebuild statistics', search_refresh.stats)
+
+def invalidate_all():
+    """Drop every cached view of RENTDETAILS after a write we do not enumerate."""
+    site_cache.clear()
+    versions.bump_all()
+    portfolio.invalidate()
+    search_index.invalidate()
+
+def prime_pool():
+    """Open the pool's steady-state connections before the first request needs them."""
+    connections = []
+    try:
+        for _ in range(current_app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_size']):
+            conn = get_db_connection()
+            connections.append(conn)
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+    finally:
+        for conn in connections:
+            conn.close()
+
+def warm_static_assets():
+    for name in os.listdir(FRONTEND_DIR):
+        if name.endswith('.html'):
+            with open(os.path.join(FRONTEND_DIR, name), encoding='utf-8') as f:
+                static_assets.rewrite(f.read())
+
+def create_warmup(app):
+    """Per-worker warm-up behind GET /api/health/ready; started by the launchers (run.py, gunicorn.conf.py, asgi.py)."""
+    warmup = Warmup(app.app_context, retry_interval=app.config['WARMUP_RETRY_INTERVAL'])
+    warmup.add('db_pool', prime_pool)
+    warmup.add('portfolio', portfolio_refresh.refresh)
+    warmup.add('search_index', search_refresh.refresh)
+    warmup.add('static_assets', warm_static_assets)
+    return warmup
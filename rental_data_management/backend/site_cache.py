@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(site_id):
+    # MySQL compares SITE case-insensitively and ignores trailing spaces
+    return str(site_id).strip().casefold()
+
+
+class SiteCache:
+    """Thread-safe LRU cache with a TTL for serialized single-site payloads.
+
+    Each entry is stored with the site version (DataVersions.site_version)
+    read before the row was queried, and get() only returns it for that same
+    version. A row read just before a write commits is cached under the old
+    version, so it reads as a miss once the write bumps it, however the
+    set and the write's invalidation interleave.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, site_id, version):
+        key = cache_key(site_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, entry_version, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            if entry_version != version:
+                del self._entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, site_id, version, value):
+        """Cache value as of version, the site version taken before it was read."""
+        if self.maxsize <= 0:
+            return
+        key = cache_key(site_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *site_ids):
+        with self._lock:
+            for site_id in site_ids:
+                if site_id is not None and self._entries.pop(cache_key(site_id), None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,644 @@
+import logging
+from datetime import datetime, date
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
+from excel_import import EXPORT_COLUMNS, EXPORT_FORMATS, build_export_query, fetch_existing_sites
+from extensions import get_db_connection
+from metrics import timed
+from pagination import FILTER_COLUMNS, build_site_listing_query, encode_cursor
+from responses import not_modified, stream_query, tagged
+from serializers import row_serializer
+from services import (site_cache, versions, search_index, invalidate_all, search_refresh,
+                      sync_portfolio, sync_search_index)
+from site_cache import cache_key
+from site_updates import normalize_fields, set_clause, build_update_query, build_expression_query
+
+log = logging.getLogger('rental.api')
+
+bp = Blueprint('sites', __name__)
+
+# Column mapping for database to frontend field conversion
+column_mapping = {
+    'SITE': 'site',
+    'STORE NAME': 'store_name',
+    'REGION': 'region',
+    'DIV': 'div',
+    'MANAGER': 'manager',
+    'ASST.MANAGER': 'asst_manager',
+    'EXECUTIVE': 'executive',
+    'D.O.O': 'doo',
+    'SQ.FT': 'sqft',
+    'AGREEMENT DATE': 'agreement_date',
+    'RENT POSITION DATE': 'rent_position_date',
+    'RENT EFFECTIVE DATE': 'rent_effective_date',
+    'AGREEMENT VALID UPTO': 'agreement_valid_upto',
+    'CURRENT DATE': 'current_date',
+    'LEASE PERIOD': 'lease_period',
+    'RENT_FREE_PERIOD_DAYS': 'rent_free_period_days',
+    'RENT EFFECTIVE AMOUNT': 'rent_effective_amount',
+    'PRESENT RENT': 'present_rent',
+    'HIKE %': 'hike_percentage',
+    'HIKE YEAR': 'hike_year',
+    'RENT DEPOSIT': 'rent_deposit',
+    'OWNER NAME-1': 'owner_name1',
+    'OWNER NAME-2': 'owner_name2',
+    'OWNER NAME-3': 'owner_name3',
+    'OWNER NAME-4': 'owner_name4',
+    'OWNER NAME-5': 'owner_name5',
+    'OWNER NAME-6': 'owner_name6',
+    'OWNER MOBILE NUMBER': 'owner_mobile',
+    'CURRENT DATE 1': 'current_date1',
+    'VALIDITY DATE': 'validity_date',
+    'GST_NUMBER': 'gst_number',
+    'PAN_NUMBER': 'pan_number',
+    'TDS_PERCENTAGE': 'tds_percentage',
+    'MATURE': 'mature',
+    'STATUS': 'status',
+    'REMARKS': 'remarks'
+}
+
+# Reverse mapping for frontend to database field conversion
+field_mapping = {
+    'site_id': 'SITE',
+    'store_name': '`STORE NAME`',
+    'region': 'REGION',
+    'div': 'DIV',
+    'manager': 'MANAGER',
+    'asst_manager': '`ASST.MANAGER`',
+    'executive': 'EXECUTIVE',
+    'doo': '`D.O.O`',
+    'sqft': '`SQ.FT`',
+    'agreement_date': '`AGREEMENT DATE`',
+    'rent_position_date': '`RENT POSITION DATE`',
+    'rent_effective_date': '`RENT EFFECTIVE DATE`',
+    'agreement_valid_upto': '`AGREEMENT VALID UPTO`',
+    'current_date': '`CURRENT DATE`',
+    'lease_period': '`LEASE PERIOD`',
+    'rent_free_period_days': 'RENT_FREE_PERIOD_DAYS',
+    'rent_effective_amount': '`RENT EFFECTIVE AMOUNT`',
+    'present_rent': '`PRESENT RENT`',
+    'hike_percentage': '`HIKE %`',
+    'hike_year': '`HIKE YEAR`',
+    'rent_deposit': '`RENT DEPOSIT`',
+    'owner_name1': '`OWNER NAME-1`',
+    'owner_name2': '`OWNER NAME-2`',
+    'owner_name3': '`OWNER NAME-3`',
+    'owner_name4': '`OWNER NAME-4`',
+    'owner_name5': '`OWNER NAME-5`',
+    'owner_name6': '`OWNER NAME-6`',
+    'owner_mobile': '`OWNER MOBILE NUMBER`',
+    'gst_number': 'GST_NUMBER',
+    'pan_number': 'PAN_NUMBER',
+    'tds_percentage': 'TDS_PERCENTAGE',
+    'mature': 'MATURE',
+    'status': 'STATUS',
+    'remarks': 'REMARKS'
+}
+
+# Columns returned by the site listing and their frontend keys (ENTRY_NO first)
+# (the query is parameterized, so the literal % in `HIKE %` is doubled)
+listing_columns = ['ENTRY_NO', 'SITE', '`STORE NAME`', 'REGION', '`DIV`', '`PRESENT RENT`',
+                   '`LEASE PERIOD`', '`HIKE %%`', 'STATUS', '`AGREEMENT DATE`']
+listing_keys = ['entry_no', 'site_id', 'store_name', 'region', 'div', 'present_rent',
+                'lease_period', 'hike_percentage', 'status', 'agreement_date']
+listing_sort_keys = {
+    'entry_no': 'entry_no',
+    'site': 'site_id',
+    'agreement_date': 'agreement_date',
+    'present_rent': 'present_rent',
+    'lease_period': 'lease_period'
+}
+
+def format_date_difference(start, end):
+    from dateutil.relativedelta import relativedelta  # Loaded on first use, not at app startup
+    diff = relativedelta(end, start)
+    return f"{abs(diff.years)} Years, {abs(diff.months)} Months, {abs(diff.days)} Days"
+
+def with_derived_dates(site_data, rent_position_date, agreement_valid_upto):
+    """Return a copy of a site payload with the fields that depend on today's date."""
+    site_data = dict(site_data)
+    today_date = datetime.today().date()
+    
+    # CURRENT DATE 1: difference between current date and rent position date
+    site_data['current_date1'] = ""
+    if rent_position_date:
+        try:
+            site_data['current_date1'] = format_date_difference(rent_position_date, today_date)
+        except Exception as e:
+            log.warning("Error calculating CURRENT DATE 1: %s", e)
+    
+    # VALIDITY DATE: difference between agreement valid upto and current date
+    site_data['validity_date'] = ""
+    if agreement_valid_upto:
+        try:
+            site_data['validity_date'] = format_date_difference(today_date, agreement_valid_upto)
+        except Exception as e:
+            log.warning("Error calculating VALIDITY DATE: %s", e)
+    
+    site_data['current_date'] = today_date  # Encoded as dd-mm-yyyy by the JSON provider
+    return site_data
+
+def serialize_site(serializer, row):
+    """Return (site_data, rent_position_date, agreement_valid_upto) for a SELECT * row."""
+    site_data = serializer.dict(row)
+    site_data['site_id'] = site_data['site']
+    
+    # Raw dates feed the fields derived from today's date
+    rent_position_date = row[serializer.index('RENT POSITION DATE')]
+    agreement_valid_upto = row[serializer.index('AGREEMENT VALID UPTO')]
+    if not isinstance(rent_position_date, date):
+        rent_position_date = None
+    if not isinstance(agreement_valid_upto, date):
+        agreement_valid_upto = None
+    
+    # Special handling for HIKE %
+    if site_data.get('hike_percentage') is not None:
+        try:
+            hike_val = float(site_data['hike_percentage'])
+            if hike_val < 1:  # If value is in decimal form (e.g., 0.15)
+                hike_val *= 100
+            site_data['hike_percentage'] = hike_val
+        except (ValueError, TypeError):
+            site_data['hike_percentage'] = 0
+    
+    return site_data, rent_position_date, agreement_valid_upto
+
+def cache_site_rows(description, rows, read_versions):
+    """Serialize and cache SELECT * rows; return {cache_key: (site_data, rent_position_date, agreement_valid_upto)}.
+
+    read_versions maps cache_key to the site version taken before the SELECT.
+    """
+    serializer = row_serializer(description, key_map=column_mapping, date_format=None)
+    entries = {}
+    for row in rows:
+        entry = serialize_site(serializer, row)
+        key = cache_key(entry[0]['site'])
+        if key in read_versions:
+            site_cache.set(key, read_versions[key], entry)
+        entries[key] = entry
+    return entries
+
+def listing_page(description, rows, sort, order, limit):
+    """The GET /api/sites listing payload for a page fetched with one extra row."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    sites_data = row_serializer(description, listing_keys, date_format=None).dicts(rows)
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, order, last[listing_keys.index(listing_sort_keys[sort])], last[0])
+    return {'sites': sites_data, 'next_cursor': next_cursor, 'has_more': has_more}
+
+def site_lookup(args):
+    """The part of GET /api/sites answered without a query.
+
+    Returns (site_id, etag, read_versions, listing, response): response is
+    set when the request is already answered (304, a cached site, a bad
+    listing query); read_versions is the cache_site_rows argument for the
+    site's row; listing is the build_site_listing_query result when site_id
+    is not given.
+    """
+    site_id = args.get('site_id')
+    
+    # Taken before any read, so a concurrent write can only make the tag stale, never wrong
+    version = versions.site_version(site_id) if site_id else None
+    read_versions = {cache_key(site_id): version} if site_id else {}
+    etag = versions.site_etag(site_id, version) if site_id else versions.table_etag()
+    unchanged = not_modified(etag)
+    if unchanged is not None:
+        return site_id, etag, read_versions, None, unchanged
+    
+    if site_id:
+        cached = site_cache.get(site_id, version)
+        if cached is not None:
+            return site_id, etag, read_versions, None, (tagged(jsonify({'site': with_derived_dates(*cached)}), etag), 200)
+        return site_id, etag, read_versions, None, None
+    try:
+        return site_id, etag, read_versions, build_site_listing_query(args, listing_columns), None
+    except ValueError as e:
+        return site_id, etag, read_versions, None, (jsonify({'message': str(e)}), 400)
+
+def site_response(description, row, etag, read_versions):
+    """The GET /api/sites?site_id= response for a SELECT * row, or a 404 when row is None."""
+    if not row:
+        return jsonify({'message': 'Site not found'}), 404
+    with timed('transform'):
+        # Cache the serialized row; date-relative fields are added per response
+        entry, = cache_site_rows(description, [row], read_versions).values()
+        site_data = with_derived_dates(*entry)
+    
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Sending site data", extra={'fields': {'site': site_data}})
+    
+    return tagged(jsonify({'site': site_data}), etag), 200
+
+def batch_lookup(data):
+    """Parse a POST /api/sites/batch body and look its sites up in the cache.
+
+    Returns (requested, found, pending, read_versions): requested maps
+    cache_key to the site id as given, one entry per distinct SITE (MySQL
+    compares them case-insensitively) in request order; found holds the
+    cached entries, pending the site ids still to be queried and
+    read_versions their versions for cache_site_rows. Raises ValueError with
+    a client-facing message on bad input.
+    """
+    site_ids = data.get('site_ids')
+    if not isinstance(site_ids, list) or not site_ids:
+        raise ValueError('site_ids must be a non-empty list')
+    batch_limit = current_app.config['SITE_BATCH_LIMIT']
+    if len(site_ids) > batch_limit:
+        raise ValueError(f'At most {batch_limit} site_ids per request')
+    
+    requested = {}
+    for site_id in site_ids:
+        site_id = str(site_id).strip()
+        if site_id:
+            requested.setdefault(cache_key(site_id), site_id)
+    
+    found = {}
+    pending = []
+    read_versions = {}
+    for key, site_id in requested.items():
+        # Taken before the SELECT, like the ETag in site_lookup
+        version = versions.site_version(site_id)
+        cached = site_cache.get(site_id, version)
+        if cached is not None:
+            found[key] = cached
+        else:
+            pending.append(site_id)
+            read_versions[key] = version
+    return requested, found, pending, read_versions
+
+def batch_response(requested, found):
+    with timed('transform'):
+        sites = {site_id: with_derived_dates(*found[key]) for key, site_id in requested.items() if key in found}
+    missing = [site_id for key, site_id in requested.items() if key not in found]
+    return jsonify({'sites': sites, 'missing': missing}), 200
+
+def parse_search_args(args):
+    """Return (query, limit) for GET /api/sites/search; raises ValueError with a client-facing message."""
+    query = args.get('q', '').strip()
+    if not query:
+        raise ValueError('q is required')
+    try:
+        limit = min(max(int(args.get('limit', 20)), 1), current_app.config['SEARCH_RESULT_LIMIT'])
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    return query, limit
+
+def search_response(query, limit):
+    """Answer a search from the in-memory index; call search_refresh.ensure() first."""
+    with timed('search'):
+        hits, total = search_index.search(query, limit)
+    return jsonify({'query': query, 'total': total, 'results': hits}), 200
+
+# Modified site search to use direct SQL connection if ORM fails
+@bp.route('/api/sites', methods=['GET'])
+@jwt_required()
+def get_sites():
+    site_id, etag, read_versions, listing, response = site_lookup(request.args)
+    if response is not None:
+        return response
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        if site_id:
+            # Query a specific site
+            cursor.execute("SELECT * FROM RENTDETAILS WHERE SITE = %s", (site_id,))
+            return site_response(cursor.description, cursor.fetchone(), etag, read_versions)
+        else:
+            # Keyset-paginated listing: deep pages cost the same as the first
+            query, params, sort, order, limit = listing
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            with timed('transform'):
+                page = listing_page(cursor.description, rows, sort, order, limit)
+            return tagged(jsonify(page), etag), 200
+    
+    except Exception as e:
+        log.exception("SQL error")
+        return jsonify({'message': f'Database error: {str(e)}'}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+@bp.route('/api/sites', methods=['POST'])
+@jwt_required()
+def create_site():
+    data = request.get_json()
+    
+    # Validate required fields
+    required_fields = ['site_id', 'store_name', 'region', 'div', 'manager', 'asst_manager', 
+                      'executive', 'doo', 'sqft', 'agreement_date', 'rent_position_date',
+                      'rent_effective_date', 'lease_period', 'rent_free_period_days',
+                      'rent_effective_amount', 'present_rent', 'hike_percentage', 'hike_year',
+                      'rent_deposit', 'owner_name1', 'gst_number', 'pan_number',
+                      'tds_percentage', 'mature', 'status']
+    
+    for field in required_fields:
+        if field not in data:
+            return jsonify({'message': f'Missing required field: {field}'}), 400
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Check if site ID already exists
+        cursor.execute("SELECT COUNT(*) FROM RENTDETAILS WHERE SITE = %s", (data['site_id'],))
+        count = cursor.fetchone()[0]
+        if count > 0:
+            return jsonify({'message': f"Site ID {data['site_id']} already exists"}), 400
+        
+        # Prepare the SQL query
+        columns = [
+            "SITE", "`STORE NAME`", "REGION", "DIV", "MANAGER", "`ASST.MANAGER`", "EXECUTIVE", 
+            "`D.O.O`", "`SQ.FT`", "`AGREEMENT DATE`", "`RENT POSITION DATE`", "`RENT EFFECTIVE DATE`", 
+            "`LEASE PERIOD`", "RENT_FREE_PERIOD_DAYS", "`RENT EFFECTIVE AMOUNT`", "`PRESENT RENT`", 
+            "`HIKE %`", "`HIKE YEAR`", "`RENT DEPOSIT`", "`OWNER NAME-1`", "`OWNER NAME-2`", 
+            "`OWNER NAME-3`", "`OWNER NAME-4`", "`OWNER NAME-5`", "`OWNER NAME-6`", 
+            "`OWNER MOBILE NUMBER`", "GST_NUMBER", "PAN_NUMBER", "TDS_PERCENTAGE", "MATURE", 
+            "STATUS", "REMARKS"
+        ]
+        
+        # Optional fields
+        if 'agreement_valid_upto' in data and data['agreement_valid_upto']:
+            columns.append("`AGREEMENT VALID UPTO`")
+        
+        if 'current_date' in data and data['current_date']:
+            columns.append("`CURRENT DATE`")
+            
+        if 'current_date1' in data and data['current_date1']:
+            columns.append("[CURRENT DATE 1]")
+            
+        if 'validity_date' in data and data['validity_date']:
+            columns.append("[VALIDITY DATE]")
+        
+        # Create placeholders for values
+        placeholders = ['%s'] * len(columns)
+        
+        # Prepare values
+        values = [
+            data['site_id'], data['store_name'], data['region'], data['div'], 
+            data['manager'], data['asst_manager'], data['executive'], 
+            data['doo'], data['sqft'], data['agreement_date'], data['rent_position_date'], 
+            data['rent_effective_date'], data['lease_period'], data['rent_free_period_days'], 
+            data['rent_effective_amount'], data['present_rent'], data['hike_percentage'], 
+            data['hike_year'], data['rent_deposit'], data['owner_name1'],
+            data.get('owner_name2'), data.get('owner_name3'), data.get('owner_name4'),
+            data.get('owner_name5'), data.get('owner_name6'), data.get('owner_mobile'),
+            data['gst_number'], data['pan_number'], data['tds_percentage'], 
+            data['mature'], data['status'], data.get('remarks')
+        ]
+        
+        # Add optional values
+        if 'agreement_valid_upto' in data and data['agreement_valid_upto']:
+            values.append(data['agreement_valid_upto'])
+        
+        if 'current_date' in data and data['current_date']:
+            values.append(data['current_date'])
+            
+        if 'current_date1' in data and data['current_date1']:
+            values.append(data['current_date1'])
+            
+        if 'validity_date' in data and data['validity_date']:
+            values.append(data['validity_date'])
+        
+        # Execute the SQL query
+        query = f"INSERT INTO RENTDETAILS ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
+        cursor.execute(query, values)
+        conn.commit()
+        site_cache.invalidate(data['site_id'])
+        versions.bump(data['site_id'])
+        sync_portfolio(cursor, data['site_id'])
+        sync_search_index(cursor, data['site_id'])
+        
+        return jsonify({'message': 'Site created successfully'}), 201
+    except Exception as e:
+        log.exception("Error creating site")
+        return jsonify({'message': f"Error creating site: {str(e)}"}), 400
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+@bp.route('/api/sites/<site_id>', methods=['PUT'])
+@jwt_required()
+def update_site(site_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        data = request.get_json()
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Received update data", extra={'fields': {'site_id': site_id, 'data': data}})
+
+        # Strip currency/percent formatting from numbers and convert dates to YYYY-MM-DD
+        normalize_fields(data)
+
+        # Build the SET clause and values for the update query
+        columns, values = set_clause(data, field_mapping)
+        
+        if not columns:
+            return jsonify({'message': 'No fields to update'}), 400
+        
+        values.append(site_id)
+        
+        query = build_update_query(columns)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Executing update", extra={'fields': {'query': query, 'values': values}})
+        
+        cursor.execute(query, values)
+        
+        if cursor.rowcount == 0:
+            return jsonify({'message': 'No records were updated'}), 404
+        
+        conn.commit()
+        site_cache.invalidate(site_id, data.get('site_id'))
+        versions.bump(site_id, data.get('site_id'))
+        sync_portfolio(cursor, site_id, data.get('site_id'))
+        sync_search_index(cursor, site_id, data.get('site_id'))
+        return jsonify({'message': 'Site updated successfully'}), 200
+        
+    except Exception as e:
+        log.exception("Error updating site")
+        return jsonify({'message': f"Error updating site: {str(e)}"}), 400
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+@bp.route('/api/sites/batch', methods=['POST'])
+@jwt_required()
+def get_sites_batch():
+    try:
+        requested, found, pending, read_versions = batch_lookup(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    if pending:
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            placeholders = ', '.join(['%s'] * len(pending))
+            cursor.execute(f"SELECT * FROM RENTDETAILS WHERE SITE IN ({placeholders})", pending)
+            rows = cursor.fetchall()
+            with timed('transform'):
+                found.update(cache_site_rows(cursor.description, rows, read_versions))
+        except Exception as e:
+            log.exception("SQL error")
+            return jsonify({'message': f'Database error: {str(e)}'}), 500
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+            if 'conn' in locals():
+                conn.close()
+    
+    return batch_response(requested, found)
+
+@bp.route('/api/sites/search', methods=['GET'])
+@jwt_required()
+def search_sites():
+    try:
+        query, limit = parse_search_args(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    try:
+        search_refresh.ensure()
+        return search_response(query, limit)
+    except Exception as e:
+        log.exception("Site search error")
+        return jsonify({'message': f'Error searching sites: {str(e)}'}), 500
+
+@bp.route('/api/sites', methods=['PATCH'])
+@jwt_required()
+def bulk_update_sites():
+    data = request.get_json(silent=True)
+    if isinstance(data, list):
+        data = {'updates': data}
+    if not isinstance(data, dict):
+        return jsonify({'message': 'Expected a JSON object with updates and/or expressions'}), 400
+    updates = data.get('updates') or []
+    expressions = data.get('expressions') or []
+    if not isinstance(updates, list) or not isinstance(expressions, list):
+        return jsonify({'message': 'updates and expressions must be lists'}), 400
+    if not updates and not expressions:
+        return jsonify({'message': 'No updates given'}), 400
+    update_limit = current_app.config['BULK_UPDATE_LIMIT']
+    if len(updates) > update_limit:
+        return jsonify({'message': f'At most {update_limit} updates per request'}), 400
+    
+    try:
+        expression_queries = [build_expression_query(spec) for spec in expressions]
+    except (ValueError, AttributeError) as e:
+        return jsonify({'message': str(e)}), 400
+    
+    # Normalize every payload in one pass and group rows by the columns they set
+    results = []
+    groups = {}
+    seen = set()
+    with timed('transform'):
+        for item in updates:
+            item = item if isinstance(item, dict) else {}
+            site_id = item.get('site_id')
+            fields = item.get('fields')
+            result = {'site_id': site_id}
+            results.append(result)
+            if not site_id or not isinstance(fields, dict):
+                result.update(status='invalid', message='Each update needs a site_id and a fields object')
+                continue
+            if cache_key(site_id) in seen:
+                result.update(status='invalid', message='Duplicate site_id in request')
+                continue
+            seen.add(cache_key(site_id))
+            columns, values = set_clause(normalize_fields(dict(fields)), field_mapping)
+            if not columns:
+                result.update(status='invalid', message='No fields to update')
+                continue
+            groups.setdefault(columns, []).append((result, site_id, values, fields.get('site_id')))
+    
+    expression_results = []
+    changed = []
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # All row updates and expressions commit or roll back together
+        existing = fetch_existing_sites(cursor, [entry[1] for group in groups.values() for entry in group])
+        for columns, entries in groups.items():
+            rows = []
+            for result, site_id, values, new_site_id in entries:
+                if cache_key(site_id) not in existing:
+                    result['status'] = 'not_found'
+                    continue
+                rows.append(values + [site_id])
+                result['status'] = 'updated'
+                changed.extend([site_id, new_site_id])
+            if rows:
+                cursor.executemany(build_update_query(columns), rows)
+        
+        # Set-based updates run after the row updates, in request order
+        for spec, (query, params) in zip(expressions, expression_queries):
+            cursor.execute(query, params)
+            expression_results.append({'op': spec['op'], 'filters': spec.get('filters'), 'rows': cursor.rowcount})
+        
+        conn.commit()
+        
+        if expression_results:
+            # Expressions touch sites we do not enumerate
+            invalidate_all()
+        elif changed:
+            site_cache.invalidate(*changed)
+            versions.bump(*changed)
+            sync_portfolio(cursor, *changed)
+            sync_search_index(cursor, *changed)
+    except Exception as e:
+        if 'conn' in locals():
+            conn.rollback()
+        log.exception("Error in bulk site update")
+        return jsonify({'message': f"Error updating sites: {str(e)}"}), 400
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+    
+    counts = {'updated': 0, 'not_found': 0, 'invalid': 0}
+    for result in results:
+        counts[result['status']] += 1
+    return jsonify(dict(counts, results=results, expressions=expression_results)), 200
+
+
+@bp.route('/api/sites/export', methods=['GET'])
+@jwt_required()
+def export_sites():
+    output = request.args.get('format', 'xlsx')
+    if output not in EXPORT_FORMATS:
+        return jsonify({'message': f'Invalid format: {output}'}), 400
+    
+    etag = versions.table_etag()
+    unchanged = not_modified(etag)
+    if unchanged is not None:
+        return unchanged
+    
+    # Same equality filters as the site listing
+    where = []
+    params = []
+    for arg, column in FILTER_COLUMNS.items():
+        value = request.args.get(arg)
+        if value:
+            where.append(f"{column} = %s")
+            params.append(value)
+    
+    try:
+        query = build_export_query(' AND '.join(where))
+        return tagged(stream_query(query, params, EXPORT_COLUMNS, output, 'sites'), etag)
+    except Exception as e:
+        log.exception("Site export error")
+        return jsonify({'message': f'Error exporting sites: {str(e)}'}), 500
@@ -0,0 +1,149 @@
+import logging
+from datetime import datetime
+from pagination import FILTER_COLUMNS
+
+log = logging.getLogger('rental.api')
+
+# Frontend fields cleaned into numbers, and the type each becomes
+NUMERIC_FIELDS = {
+    'sqft': int,
+    'lease_period': int,
+    'rent_free_period_days': int,
+    'hike_year': int,
+    'rent_effective_amount': float,
+    'present_rent': float,
+    'hike_percentage': float,
+    'rent_deposit': float,
+    'tds_percentage': float
+}
+
+DATE_FIELDS = ('agreement_date', 'rent_position_date', 'rent_effective_date',
+               'agreement_valid_upto', 'current_date', 'doo')
+
+# Formats tried after the YYYY-MM-DD / DD-MM-YYYY fast path
+FALLBACK_DATE_FORMATS = ('%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d')
+
+# Set-based updates PATCH /api/sites can run: name -> (SET clause, parameter names)
+EXPRESSIONS = {
+    # Apply each site's own HIKE % to its PRESENT RENT
+    'apply_hike': ("`PRESENT RENT` = ROUND(`PRESENT RENT` * (1 + `HIKE %%` / 100), 2)", ()),
+    # Change PRESENT RENT by a given percentage
+    'adjust_rent': ("`PRESENT RENT` = ROUND(`PRESENT RENT` * (1 + %s / 100), 2)", ('percent',)),
+    'set_status': ("STATUS = %s", ('status',)),
+    'set_hike_percentage': ("`HIKE %%` = %s", ('percent',))
+}
+
+
+def sql_column(db_field):
+    """Backtick-quote a field_mapping column and escape % for pymysql parameters."""
+    return f"`{db_field.strip('`')}`".replace('%', '%%')
+
+
+def clean_number(value, kind):
+    cleaned = str(value).replace('₹', '').replace(',', '').replace('%', '').strip()
+    if not cleaned:
+        return value
+    return int(float(cleaned)) if kind is int else float(cleaned)
+
+
+def normalize_date(value):
+    """Return a YYYY-MM-DD string for the date formats the frontend sends, else None."""
+    date_str = str(value).strip()
+    parts = date_str.split('-')
+    if len(parts) == 3:
+        if len(parts[0]) == 4:
+            candidate = date_str
+        else:
+            day, month, year = parts
+            candidate = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+        try:
+            return datetime.strptime(candidate, '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            pass
+    for fmt in FALLBACK_DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_fields(data):
+    """Clean numeric and date fields of an update payload in place.
+
+    Numbers lose currency symbols, thousands separators and % signs; values
+    that still do not parse are left for the database to reject. Dates are
+    converted to YYYY-MM-DD and dropped from the update when unparseable.
+    """
+    for field, kind in NUMERIC_FIELDS.items():
+        if data.get(field):
+            try:
+                data[field] = clean_number(data[field], kind)
+            except (TypeError, ValueError) as e:
+                log.warning("Error cleaning numeric field %s: %s", field, e)
+    for field in DATE_FIELDS:
+        if field in data and data[field]:
+            formatted = normalize_date(data[field])
+            if formatted:
+                data[field] = formatted
+            else:
+                log.warning("Could not parse date for %s: '%s', removing from update", field, data[field])
+                data.pop(field)
+    return data
+
+
+def set_clause(data, field_mapping):
+    """Return (columns, values) for the mapped, non-null fields of a payload.
+
+    Columns come back sorted, so payloads setting the same fields in any
+    order share one UPDATE statement.
+    """
+    pairs = sorted(
+        (sql_column(field_mapping[key]), value)
+        for key, value in data.items()
+        if field_mapping.get(key) and value is not None
+    )
+    return tuple(column for column, _ in pairs), [value for _, value in pairs]
+
+
+def build_update_query(columns):
+    return f"UPDATE RENTDETAILS SET {', '.join(f'{column} = %s' for column in columns)} WHERE SITE = %s"
+
+
+def build_expression_query(spec):
+    """Translate {'op', 'filters', ...params} into (query, params) for a set-based UPDATE.
+
+    Filters use the listing's region/div/status/mature columns and/or an
+    explicit site_ids list; an update of every site must say filters: 'all'.
+    """
+    op = spec.get('op')
+    if op not in EXPRESSIONS:
+        raise ValueError(f"Unknown expression: {op}. Expected one of: {', '.join(EXPRESSIONS)}")
+    assignment, param_names = EXPRESSIONS[op]
+    params = []
+    for name in param_names:
+        if spec.get(name) in (None, ''):
+            raise ValueError(f"Expression {op} requires {name}")
+        params.append(spec[name])
+
+    filters = spec.get('filters')
+    where = []
+    if filters != 'all':
+        if not isinstance(filters, dict) or not filters:
+            raise ValueError("Expression updates need filters (or filters: 'all')")
+        for name, value in filters.items():
+            if name == 'site_ids':
+                if not isinstance(value, list) or not value:
+                    raise ValueError('site_ids must be a non-empty list')
+                where.append(f"SITE IN ({', '.join(['%s'] * len(value))})")
+                params.extend(value)
+            elif name in FILTER_COLUMNS:
+                where.append(f"{FILTER_COLUMNS[name]} = %s")
+                params.append(value)
+            else:
+                raise ValueError(f"Unknown filter: {name}")
+
+    query = f"UPDATE RENTDETAILS SET {assignment}"
+    if where:
+        query += f" WHERE {' AND '.join(where)}"
+    return query, params
@@ -0,0 +1,60 @@
+import logging
+import threading
+from flask import current_app
+
+log = logging.getLogger('rental.api')
+
+
+class SnapshotRefresher:
+    """Reloads an in-memory snapshot (the portfolio rollup, the search index) single-flight.
+
+    reload() reads the table and calls snapshot.load(); only one runs at a
+    time. Until the first load completes, readers wait for it, and only one
+    of them reads the table. After that a stale snapshot keeps being served
+    while one background thread rebuilds it, so a burst of reads after a
+    write costs a single table scan, off the request path.
+    """
+
+    def __init__(self, name, snapshot, reload):
+        self.name = name
+        self.snapshot = snapshot
+        self.reload = reload
+        self._lock = threading.Lock()  # held for the duration of a reload
+        self._state_lock = threading.Lock()
+        self._scheduled = False
+        self.reloads = 0
+
+    def refresh(self):
+        """Reload now if still stale, waiting for a reload that is already running."""
+        with self._lock:
+            if self.snapshot.stale:
+                self.reload()
+                self.reloads += 1
+
+    def ensure(self):
+        """Called before a read: loads a missing snapshot, schedules a rebuild of a stale one."""
+        if not self.snapshot.stale:
+            return
+        if not self.snapshot.loaded:
+            return self.refresh()
+        with self._state_lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        app = current_app._get_current_object()
+        threading.Thread(target=self._refresh_in_background, args=(app,),
+                         name=f'refresh-{self.name}', daemon=True).start()
+
+    def _refresh_in_background(self, app):
+        try:
+            with app.app_context():
+                self.refresh()
+        except Exception as e:
+            log.warning("Background %s refresh failed: %s", self.name, e)
+        finally:
+            with self._state_lock:
+                self._scheduled = False
+
+    def stats(self):
+        return {'loaded': self.snapshot.loaded, 'stale': self.snapshot.stale,
+                'refreshing': self._scheduled, 'reloads': self.reloads}
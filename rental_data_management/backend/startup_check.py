@@ -0,0 +1,101 @@
+"""Import-time budget for the API.
+
+    python startup_check.py
+    python startup_check.py --budget-ms 400 --runs 5
+
+Imports app (which builds the app through create_app()) in fresh
+interpreters under `python -X importtime` and takes the fastest run. It prints
+the slowest top-level imports and exits non-zero if that run takes longer
+than the budget, or if it loads a dependency that only some endpoints need.
+Those are imported inside the functions that use them, so a worker, a test
+or a CLI script such as init_db.py does not pay for them at startup.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Only uploads, exports, projections and date differences need these.
+# (bcrypt is not listed: PyJWT's cryptography backend imports it anyway.)
+LAZY_MODULES = ('pandas', 'pyarrow', 'openpyxl', 'numpy', 'dateutil')
+
+DEFAULT_BUDGET_MS = int(os.getenv('STARTUP_BUDGET_MS', '500'))
+
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def measure(module):
+    """Import module in a new interpreter; return its importtime entries in output order.
+
+    Each entry is (name, self_us, cumulative_us, depth). A module's imports
+    are listed before it, one level deeper.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+        env=dict(os.environ, LOG_LEVEL='WARNING')
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'import {module} failed:\n{result.stderr[-2000:]}')
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def importer(entries, index):
+    """The module whose import pulled in entries[index]."""
+    depth = entries[index][3]
+    for name, _, _, parent_depth in entries[index + 1:]:
+        if parent_depth < depth:
+            return name
+    return None
+
+
+def total_us(entries, module):
+    return next(cumulative for name, _, cumulative, depth in entries if name == module and depth == 0)
+
+
+def check(module, budget_ms, runs, top):
+    entries = min((measure(module) for _ in range(runs)), key=lambda run: total_us(run, module))
+    total_ms = total_us(entries, module) / 1000
+
+    print(f"import {module}: {total_ms:.1f} ms (budget {budget_ms} ms, best of {runs})")
+    direct = sorted((entry for entry in entries if entry[3] == 1), key=lambda entry: entry[2], reverse=True)
+    for name, _, cumulative, _ in direct[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if total_ms > budget_ms:
+        failures.append(f"import {module} took {total_ms:.1f} ms, over the {budget_ms} ms budget")
+    for index, (name, _, cumulative, _) in enumerate(entries):
+        package = name.partition('.')[0]
+        parent = importer(entries, index)
+        # Report where each lazy package is first pulled in, not its own submodules
+        if package in LAZY_MODULES and (parent or '').partition('.')[0] != package:
+            failures.append(f"{name} ({cumulative / 1000:.1f} ms) is imported at startup by {parent}")
+
+    if failures:
+        print(f"\n{len(failures)} startup problems:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return False
+    print("\nStartup is within budget.")
+    return True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check the API cold-start import time')
+    parser.add_argument('--module', default='app', help='module to import (default: app)')
+    parser.add_argument('--budget-ms', type=int, default=DEFAULT_BUDGET_MS,
+                        help='maximum import time in milliseconds (default: STARTUP_BUDGET_MS or 500)')
+    parser.add_argument('--runs', type=int, default=3, help='imports to measure; the fastest counts')
+    parser.add_argument('--top', type=int, default=10, help='slowest top-level imports to list')
+    args = parser.parse_args()
+    sys.exit(0 if check(args.module, args.budget_ms, args.runs, args.top) else 1)
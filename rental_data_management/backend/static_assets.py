@@ -0,0 +1,76 @@
+import hashlib
+import os
+import re
+import threading
+from flask import abort, send_from_directory
+from werkzeug.utils import safe_join
+from compression import encoded_etags
+
+# Fingerprinted assets never change under the same URL
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Local css/js/img references in the HTML pages
+ASSET_REFERENCE = re.compile(r'((?:src|href)=")((?:css|js|img)/[^"?#]+)(")')
+
+
+class StaticAssets:
+    """Serves the frontend with content-hashed asset URLs.
+
+    HTML pages are rewritten so every local css/js/img reference carries
+    ?v=<content hash>. A request whose v matches the file's current hash is
+    cached for a year as immutable; pages themselves and unversioned requests
+    are revalidated on every use via their ETag.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._digests = {}
+
+    def digest(self, path):
+        full_path = safe_join(self.root, path)
+        if full_path is None or not os.path.isfile(full_path):
+            return None
+        stat = os.stat(full_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._digests.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        with open(full_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        with self._lock:
+            self._digests[path] = (signature, digest)
+        return digest
+
+    def rewrite(self, html):
+        def versioned(match):
+            digest = self.digest(match.group(2))
+            if digest is None:
+                return match.group(0)
+            return f"{match.group(1)}{match.group(2)}?v={digest}{match.group(3)}"
+        return ASSET_REFERENCE.sub(versioned, html)
+
+    def send(self, path, request, response_class):
+        if path.endswith('.html'):
+            full_path = safe_join(self.root, path)
+            if full_path is None or not os.path.isfile(full_path):
+                abort(404)
+            with open(full_path, encoding='utf-8') as f:
+                body = self.rewrite(f.read())
+            etag = hashlib.sha256(body.encode('utf-8')).hexdigest()[:16]
+            if any(request.if_none_match.contains(candidate) for candidate in encoded_etags(etag)):
+                response = response_class(status=304)
+            else:
+                response = response_class(body, mimetype='text/html')
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        response = send_from_directory(self.root, path)
+        version = request.args.get('v')
+        if version and version == self.digest(path):
+            response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
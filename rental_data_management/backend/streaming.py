@@ -0,0 +1,92 @@
+import csv
+import io
+import os
+import tempfile
+from json_provider import dumps
+from serializers import row_serializer
+
+# Rows pulled from the server-side cursor per chunk
+STREAM_BATCH_SIZE = 500
+
+# Bytes per chunk when sending a finished workbook
+FILE_CHUNK_SIZE = 64 * 1024
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Rows an .xlsx sheet can hold below its header row
+XLSX_MAX_ROWS = 1048575
+
+
+def iter_batches(cursor, batch_size=STREAM_BATCH_SIZE):
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield rows
+
+
+def ndjson_chunks(cursor, keys, batch_size=STREAM_BATCH_SIZE):
+    """Yield one newline-delimited JSON object per row, a batch at a time."""
+    serializer = row_serializer(cursor.description, keys)
+    for rows in iter_batches(cursor, batch_size):
+        yield ''.join(dumps(row) + '\n' for row in serializer.dicts(rows))
+
+
+def csv_chunks(cursor, keys, batch_size=STREAM_BATCH_SIZE):
+    """Yield a CSV header followed by the rows, a batch at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(keys)
+    serializer = row_serializer(cursor.description, keys)
+    for rows in iter_batches(cursor, batch_size):
+        writer.writerows(serializer.tuples(rows))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def xlsx_chunks(cursor, keys, batch_size=STREAM_BATCH_SIZE, max_rows=XLSX_MAX_ROWS):
+    """Yield an .xlsx workbook with a header row followed by the rows.
+
+    openpyxl's write-only mode spools rows to disk as they are appended, and
+    the finished workbook is sent from a temporary file, so memory stays flat
+    but disk use grows with the export. A zip archive cannot be sent before
+    it is complete: the first chunk leaves once every row has been written,
+    so the request holds its connection for the whole query first. More than
+    max_rows rows raise ValueError, before anything has been sent.
+    """
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('RENTDETAILS')
+    sheet.append(keys)
+    # Dates stay native so they become Excel date cells
+    serializer = row_serializer(cursor.description, keys, date_format=None)
+    written = 0
+    try:
+        for rows in iter_batches(cursor, batch_size):
+            written += len(rows)
+            if written > max_rows:
+                raise ValueError(f'More than {max_rows} rows to export; use format=csv')
+            for row in serializer.tuples(rows):
+                sheet.append(row)
+    except Exception:
+        # Saving is how openpyxl finishes the sheet and removes its spool file
+        workbook.save(os.devnull)
+        raise
+    with tempfile.TemporaryFile() as f:
+        workbook.save(f)
+        f.seek(0)
+        while True:
+            chunk = f.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+STREAM_FORMATS = {
+    'ndjson': ('application/x-ndjson', ndjson_chunks),
+    'csv': ('text/csv', csv_chunks),
+    'xlsx': (XLSX_MIMETYPE, xlsx_chunks)
+}
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+import pytest
+from flask import Flask
+import asgi
+from asgi import ThreadedWsgiToAsgi
+
+
+def slow_app():
+    app = Flask(__name__)
+    threads = set()
+
+    @app.route('/slow')
+    def slow():
+        threads.add(threading.get_ident())
+        time.sleep(0.2)
+        return 'ok'
+
+    return app, threads
+
+
+async def get(asgi_app, path, method='GET', query_string=b''):
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query_string,
+             'headers': [], 'http_version': '1.1', 'scheme': 'http', 'root_path': ''}
+    await asgi_app(scope, receive, send)
+    return sent[0]['status'], b''.join(message.get('body', b'') for message in sent[1:])
+
+
+def test_fallback_requests_run_concurrently():
+    app, threads = slow_app()
+    fallback = ThreadedWsgiToAsgi(app)
+
+    async def burst():
+        return await asyncio.gather(*(get(fallback, '/slow') for _ in range(4)))
+
+    started = time.monotonic()
+    responses = asyncio.run(burst())
+    elapsed = time.monotonic() - started
+
+    assert responses == [(200, b'ok')] * 4
+    assert len(threads) == 4
+    assert elapsed < 0.6  # one shared thread would take 0.8s
+
+
+ASYNC_ROUTES = [
+    ('/api/sites', b'site_id=S001'),
+    ('/api/sites', b''),
+    ('/api/sites/batch', b''),
+    ('/api/reports', b'type=Hike+Report&from_date=2024-01-01&to_date=2024-12-31'),
+    ('/api/analytics', b''),
+    ('/api/projections', b''),
+    ('/api/sites/search', b'q=main')
+]
+
+
+@pytest.mark.parametrize('method', ['OPTIONS', 'HEAD'])
+@pytest.mark.parametrize('path, query_string', ASYNC_ROUTES)
+def test_unauthenticated_options_and_head_never_reach_async_views(monkeypatch, method, path, query_string):
+    dispatched = []
+
+    async def dispatch(view, scope, receive, send):
+        dispatched.append(view)
+        await view()
+
+    monkeypatch.setattr(asgi.database, 'pool', object())
+    monkeypatch.setattr(asgi.application, 'dispatch', dispatch)
+    status, body = asyncio.run(get(asgi.application, path, method, query_string))
+
+    assert dispatched == []
+    assert body == b''
+    assert status in (200, 401, 404, 405)
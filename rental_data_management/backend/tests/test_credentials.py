@@ -0,0 +1,15 @@
+import threading
+import pytest
+from credentials import CredentialVerifier, VerifierBusy
+
+
+def test_timed_out_check_is_busy_not_a_wrong_password(monkeypatch):
+    verifier = CredentialVerifier(max_workers=1, timeout=0.05)
+    release = threading.Event()
+    monkeypatch.setattr(verifier, '_check', lambda password, stored_hash: release.wait(5) and (True, None))
+    try:
+        with pytest.raises(VerifierBusy, match='timed out'):
+            verifier.verify('admin', 'admin123', '$2b$12$hash')
+    finally:
+        release.set()
+    assert verifier.stats()['timeouts'] == 1
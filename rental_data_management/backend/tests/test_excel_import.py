@@ -0,0 +1,44 @@
+import pymysql
+import pytest
+from excel_import import build_insert_query
+
+COLUMNS = ['SITE', 'STORE NAME', 'HIKE %', 'PRESENT RENT']
+ROWS = [('S001', 'Main St', 5.0, 1000.0), ('S002', "O'Brien", 7.5, 2000.0)]
+
+
+class CapturingCursor(pymysql.cursors.Cursor):
+    """A real pymysql cursor that records the SQL it would send instead of sending it."""
+
+    def __init__(self):
+        connection = pymysql.connections.Connection(defer_connect=True)
+        connection.server_status = 0
+        super().__init__(connection)
+        self.sent = []
+
+    def execute(self, query, args=None):
+        assert args is None  # executemany sends fully rendered statements
+        self.sent.append(query.decode() if isinstance(query, (bytes, bytearray)) else query)
+        return 1
+
+
+@pytest.mark.parametrize('upsert', [False, True])
+def test_executemany_sends_literal_hike_column(upsert):
+    cursor = CapturingCursor()
+    cursor.executemany(build_insert_query(COLUMNS, upsert=upsert), ROWS)
+
+    sql, = cursor.sent
+    assert sql.startswith("INSERT INTO RENTDETAILS (`SITE`, `STORE NAME`, `HIKE %`, `PRESENT RENT`) VALUES ")
+    assert "VALUES ('S001', 'Main St', 5.0e0, 1000.0e0),('S002', 'O\\'Brien', 7.5e0, 2000.0e0)" in sql
+    assert '%%' not in sql
+    if upsert:
+        assert sql.endswith(" ON DUPLICATE KEY UPDATE `STORE NAME` = VALUES(`STORE NAME`), "
+                            "`HIKE %` = VALUES(`HIKE %`), `PRESENT RENT` = VALUES(`PRESENT RENT`)")
+    else:
+        assert 'ON DUPLICATE KEY' not in sql
+
+
+def test_upsert_is_one_statement_per_batch():
+    cursor = CapturingCursor()
+    cursor.executemany(build_insert_query(COLUMNS, upsert=True), ROWS * 50)
+    assert len(cursor.sent) == 1
+    assert cursor.sent[0].count('ON DUPLICATE KEY UPDATE') == 1
@@ -0,0 +1,68 @@
+import json
+import threading
+import pytest
+from import_jobs import ImportJobManager
+
+
+class Upload:
+    filename = 'sites.csv'
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            f.write('SITE\n')
+
+
+def slow_runner(started, release):
+    def run(job):
+        started.set()
+        while True:
+            job.record_batch({'rows_parsed': job.rows_parsed + 1, 'inserted': 0, 'updated': 0,
+                              'skipped': 0, 'errored': 0})
+            release.wait(0.01)
+    return run
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Two managers sharing one spool directory, as two worker processes would."""
+    started, release = threading.Event(), threading.Event()
+    first = ImportJobManager(slow_runner(started, release), spool_dir=str(tmp_path))
+    second = ImportJobManager(slow_runner(started, release), spool_dir=str(tmp_path))
+    return first, second, started
+
+
+def test_another_worker_sees_and_cancels_a_running_job(workers):
+    first, second, started = workers
+    job = first.submit(Upload(), submitted_by='alice')
+    assert started.wait(5)
+
+    seen = second.get(job.id)
+    assert seen.status == 'running' and seen.submitted_by == 'alice'
+
+    second.cancel(job.id)
+    job.future.result(timeout=5)
+    assert job.status == 'cancelled'
+    assert second.get(job.id).status == 'cancelled'
+
+
+def test_job_of_an_exited_worker_reads_as_failed(workers, tmp_path):
+    first, second, started = workers
+    job = first.submit(Upload(), submitted_by='alice')
+    assert started.wait(5)
+    first.cancel(job.id)
+    job.future.result(timeout=5)
+
+    # The state a worker leaves behind if it is killed mid-import
+    state_path = tmp_path / f'{job.id}.json'
+    state = json.loads(state_path.read_text())
+    state.update(status='running', finished_at=None, owner_pid=2 ** 22 + 1)
+    state_path.write_text(json.dumps(state))
+
+    seen = second.get(job.id)
+    assert seen.status == 'failed'
+    assert 'interrupted' in seen.error
+
+
+@pytest.mark.parametrize('job_id', ['../secret', 'abc', 'G' * 32])
+def test_malformed_job_ids_are_not_looked_up(workers, job_id):
+    assert workers[0].get(job_id) is None
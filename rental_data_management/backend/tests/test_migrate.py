@@ -0,0 +1,47 @@
+import pymysql
+import pytest
+from migrate import FILESORT, FULL_SCAN, INDEX_SCAN, explain_queries, plan_issues
+from pagination import FILTER_COLUMNS
+from site_updates import EXPRESSIONS
+
+
+@pytest.fixture(scope='module')
+def queries():
+    return explain_queries()
+
+
+def test_every_expression_and_filter_is_explained(queries):
+    names = {name for name, _, _, _ in queries}
+    for op in EXPRESSIONS:
+        assert f"expression {op} on all sites" in names
+        for name in list(FILTER_COLUMNS) + ['site_ids']:
+            assert f"expression {op} by {name}" in names
+    for name in FILTER_COLUMNS:
+        assert any(listing.startswith(f"site listing {{'{name}'") for listing in names)
+    assert any('min_rent' in name for name in names) and any('max_rent' in name for name in names)
+    assert 'search index reload' in names
+    assert 'report export' in names
+
+
+def test_every_query_renders_with_its_params(queries):
+    connection = pymysql.connections.Connection(defer_connect=True)
+    connection.server_status = 0
+    cursor = pymysql.cursors.Cursor(connection)
+    for name, query, params, _ in queries:
+        assert cursor.mogrify(query, params).startswith(('SELECT', 'UPDATE')), name
+
+
+def test_listing_pages_may_not_sort(queries):
+    for name, _, _, allowed in queries:
+        if name.startswith('site listing') and 'expires_within' not in name:
+            assert FILESORT not in allowed and FULL_SCAN not in allowed, name
+
+
+@pytest.mark.parametrize('plan, issues', [
+    ({'type': 'ref', 'Extra': 'Using where'}, set()),
+    ({'type': 'ALL', 'Extra': None}, {FULL_SCAN}),
+    ({'type': 'index', 'Extra': 'Using index'}, {INDEX_SCAN}),
+    ({'type': 'range', 'Extra': 'Using index condition; Using filesort'}, {FILESORT})
+])
+def test_plan_issues(plan, issues):
+    assert plan_issues(plan) == issues
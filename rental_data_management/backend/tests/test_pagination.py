@@ -0,0 +1,84 @@
+import base64
+import json
+import struct
+from decimal import Decimal
+import pytest
+from pagination import build_site_listing_query, decimal_key, decode_cursor, encode_cursor
+
+COLUMNS = ['ENTRY_NO', 'SITE', '`PRESENT RENT`']
+
+
+def as_float(value):
+    """A value as MySQL stores it in a FLOAT column, read back the way pymysql returns it."""
+    stored, = struct.unpack('f', struct.pack('f', value))
+    for digits in range(1, 10):
+        text = f'{stored:.{digits}g}'
+        if struct.unpack('f', struct.pack('f', float(text)))[0] == stored:
+            return stored, float(text)
+
+
+# Ties, and rents with no exact binary representation (as FLOAT or double)
+RENTS = [12500.5, 12500.5, 0.1, 1234.56, 1234.56, 1234.56, 99999.99, 0.3, 0.1 + 0.2, 7.005, 12500.5, 50000.0]
+ROWS = [(entry_no, f'S{entry_no:03}') + as_float(rent) for entry_no, rent in enumerate(RENTS, start=1)]
+
+
+def db_key(row):
+    """CAST(`PRESENT RENT` AS DECIMAL(12,2)) of the stored FLOAT."""
+    return Decimal(row[2]).quantize(Decimal('0.01'), rounding='ROUND_HALF_UP')
+
+
+def fetch_page(order, limit, cursor=None):
+    """Run the keyset predicate of build_site_listing_query over ROWS, the way MySQL would."""
+    args = {'sort': 'present_rent', 'order': order, 'limit': str(limit)}
+    if cursor:
+        args['cursor'] = cursor
+    query, params, sort, order, limit = build_site_listing_query(args, COLUMNS)
+    rows = sorted(ROWS, key=lambda row: (db_key(row), row[0]), reverse=order == 'desc')
+    if cursor:
+        value, _, entry_no, _ = params
+        after = (lambda a, b: a > b) if order == 'asc' else (lambda a, b: a < b)
+        rows = [row for row in rows
+                if after(db_key(row), value) or (db_key(row) == value and after(row[0], entry_no))]
+    page = rows[:limit + 1]
+    next_cursor = None
+    if len(page) > limit:
+        last = page[limit - 1]
+        # The cursor is built from the value the client saw, after a JSON round trip
+        next_cursor = encode_cursor(sort, order, json.loads(json.dumps(last[3])), last[0])
+    return page[:limit], next_cursor
+
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+@pytest.mark.parametrize('limit', [1, 2, 3, 5])
+def test_present_rent_pages_cover_every_site_once(order, limit):
+    seen = []
+    page, cursor = fetch_page(order, limit)
+    seen.extend(row[0] for row in page)
+    while cursor:
+        page, cursor = fetch_page(order, limit, cursor)
+        seen.extend(row[0] for row in page)
+    assert sorted(seen) == [row[0] for row in ROWS]
+
+
+def test_cursor_key_matches_the_database_rounding():
+    for row in ROWS:
+        value, entry_no = decode_cursor(encode_cursor('present_rent', 'asc', row[3], row[0]), 'present_rent', 'asc')
+        assert value == db_key(row) == decimal_key(row[3])
+        assert entry_no == row[0]
+
+
+def test_present_rent_query_compares_decimals_on_both_sides():
+    cursor = encode_cursor('present_rent', 'desc', 1234.56, 7)
+    query, params = build_site_listing_query({'sort': 'present_rent', 'order': 'desc', 'cursor': cursor}, COLUMNS)[:2]
+    assert ("(CAST(`PRESENT RENT` AS DECIMAL(12,2)) < CAST(%s AS DECIMAL(12,2)) OR "
+            "(CAST(`PRESENT RENT` AS DECIMAL(12,2)) = CAST(%s AS DECIMAL(12,2)) AND ENTRY_NO < %s))") in query
+    assert query.endswith("ORDER BY CAST(`PRESENT RENT` AS DECIMAL(12,2)) DESC, ENTRY_NO DESC LIMIT %s")
+    assert params == [Decimal('1234.56'), Decimal('1234.56'), 7, 101]
+
+
+@pytest.mark.parametrize('value', ['abc', 'Infinity', None])
+def test_bad_present_rent_cursor_is_rejected(value):
+    payload = json.dumps({'s': 'present_rent', 'o': 'asc', 'v': value, 'id': 1})
+    cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor, 'present_rent', 'asc')
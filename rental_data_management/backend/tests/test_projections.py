@@ -0,0 +1,42 @@
+from datetime import date
+import pytest
+import projections
+from projections import ProjectionTooLarge, summarize_projection
+
+# SITE, REGION, DIV, RENT EFFECTIVE AMOUNT, RENT EFFECTIVE DATE, HIKE %, HIKE YEAR,
+# RENT_FREE_PERIOD_DAYS, LEASE PERIOD, TDS_PERCENTAGE
+ROWS = [
+    (f'S{n:03}', 'NORTH', 'D1', 1000.0 + n, date(2020, 1 + n % 12, 1), 5.0, 3, 30, 9, 10.0)
+    for n in range(25)
+]
+
+
+def test_chunked_totals_match_a_single_pass(monkeypatch):
+    whole = summarize_projection(ROWS, '2024-01', 24)
+    monkeypatch.setattr(projections, 'CHUNK_CELLS', 24 * 4)
+    chunked = summarize_projection(ROWS, '2024-01', 24, detail=True)
+
+    assert chunked['totals'] == whole['totals']
+    assert chunked['site_count'] == len(chunked['sites']) == 25
+    assert chunked['months'] == whole['months']
+
+
+@pytest.mark.parametrize('effective', [None, '0000-00-00'])
+def test_missing_or_zero_effective_date_projects_no_rent(effective):
+    rows = ROWS[:1] + [('S999', 'NORTH', 'D1', 5000.0, effective, 5.0, 3, 0, 9, 10.0)]
+    result = summarize_projection(rows, '2024-01', 12, detail=True)
+
+    assert result['sites'][1]['gross'] == [0.0] * 12
+    assert result['totals']['gross'] == result['sites'][0]['gross']
+
+
+def test_detail_is_capped():
+    with pytest.raises(ProjectionTooLarge, match='25 sites x 12 months'):
+        summarize_projection(ROWS, '2024-01', 12, detail=True, max_detail_cells=299)
+    assert summarize_projection(ROWS, '2024-01', 12, max_detail_cells=299)['site_count'] == 25
+
+
+def test_empty_portfolio_still_lists_months():
+    result = summarize_projection([], '2024-11', 3)
+    assert result['months'] == ['2024-11', '2024-12', '2025-01']
+    assert result['totals']['net'] == [0.0, 0.0, 0.0]
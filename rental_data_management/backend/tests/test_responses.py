@@ -0,0 +1,108 @@
+import json
+import pytest
+from flask import Flask
+import responses
+from streaming import STREAM_BATCH_SIZE
+
+KEYS = ['site_id', 'present_rent']
+
+
+class FailingCursor:
+    """Returns one full batch of rows, then loses the connection."""
+
+    description = [('site_id', 253), ('present_rent', 4)]
+
+    def __init__(self):
+        self.batches = 0
+        self.closed = False
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchmany(self, size=None):
+        self.batches += 1
+        if self.batches > 1:
+            raise ConnectionError('Lost connection to MySQL server during query')
+        return [(f'S{n:03}', 1000.0) for n in range(STREAM_BATCH_SIZE)]
+
+    def close(self):
+        self.closed = True
+
+
+class ShortCursor(FailingCursor):
+    """Returns two rows, then the end of the result."""
+
+    def fetchmany(self, size=None):
+        self.batches += 1
+        return [('S001', 1000.0), ('S002', 2000.0)] if self.batches == 1 else []
+
+
+class FakeConnection:
+    def __init__(self, cursor_class=FailingCursor):
+        self.cursor_class = cursor_class
+        self.cursors = []
+        self.closed = False
+
+    def cursor(self, cursorclass=None):
+        self.cursors.append(self.cursor_class())
+        return self.cursors[-1]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(responses, 'get_db_connection', lambda: conn)
+    return conn
+
+
+def test_failed_ndjson_stream_ends_with_error_record(conn):
+    response = responses.stream_query('SELECT 1', [], KEYS, 'ndjson', 'report')
+    lines = response.get_data(as_text=True).splitlines()
+
+    assert len(lines) == STREAM_BATCH_SIZE + 1
+    assert json.loads(lines[0]) == {'site_id': 'S000', 'present_rent': 1000.0}
+    assert json.loads(lines[-1]) == {'error': 'Error streaming rows: Lost connection to MySQL server during query'}
+    assert conn.closed and conn.cursors[0].closed
+
+
+def test_failed_csv_download_is_aborted(conn):
+    response = responses.stream_query('SELECT 1', [], KEYS, 'csv', 'sites')
+    chunks = response.response
+    assert next(chunks).startswith('site_id,present_rent\r\nS000,1000.0\r\n')
+    with pytest.raises(ConnectionError):
+        next(chunks)
+    assert conn.closed
+
+
+def test_oversized_xlsx_export_fails_before_the_first_byte(conn):
+    app = Flask(__name__)
+    app.config['XLSX_MAX_ROWS'] = STREAM_BATCH_SIZE - 1
+    with app.app_context():
+        response = responses.stream_query('SELECT 1', [], KEYS, 'xlsx', 'sites')
+    with pytest.raises(ValueError, match='use format=csv'):
+        next(response.response)
+    assert conn.closed
+
+
+def summary(cursor):
+    return {'summary': {'totals': {'count': 2, 'present_rent': 3000.0}, 'subtotals': []}}
+
+
+def test_ndjson_stream_ends_with_the_trailer_record(monkeypatch):
+    conn = FakeConnection(ShortCursor)
+    monkeypatch.setattr(responses, 'get_db_connection', lambda: conn)
+    response = responses.stream_query('SELECT 1', [], KEYS, 'ndjson', 'report', summary)
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert lines == [{'site_id': 'S001', 'present_rent': 1000.0}, {'site_id': 'S002', 'present_rent': 2000.0},
+                     summary(None)]
+    assert conn.closed and all(cursor.closed for cursor in conn.cursors)
+
+
+def test_failed_ndjson_stream_has_no_trailer(conn):
+    response = responses.stream_query('SELECT 1', [], KEYS, 'ndjson', 'report', summary)
+    last = json.loads(response.get_data(as_text=True).splitlines()[-1])
+    assert list(last) == ['error']
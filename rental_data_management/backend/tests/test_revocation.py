@@ -0,0 +1,65 @@
+import threading
+import time
+import pytest
+from revocation import RevocationList
+
+
+@pytest.fixture(params=['memory', 'shared'])
+def make_list(request, tmp_path):
+    if request.param == 'memory':
+        shared = RevocationList()
+        return lambda: shared
+    return lambda: RevocationList(directory=str(tmp_path))
+
+
+def test_concurrent_rotations_of_one_token_all_succeed(make_list):
+    revoked = make_list()
+    expires_at = time.time() + 60
+    barrier = threading.Barrier(8)
+    results = []
+
+    def rotate():
+        barrier.wait()
+        results.append(revoked.rotate('jti-1', expires_at, grace=10))
+
+    threads = [threading.Thread(target=rotate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [True] * 8
+    assert revoked.stats()['rotations'] == 1
+    assert not revoked.is_revoked('jti-1', grace=10)
+    assert revoked.is_revoked('jti-1')
+
+
+def test_replay_after_the_grace_window_is_reuse(make_list):
+    revoked = make_list()
+    assert revoked.rotate('jti-1', time.time() + 60, grace=0)
+    time.sleep(0.01)
+    assert not revoked.rotate('jti-1', time.time() + 60, grace=0)
+    assert revoked.stats()['reuses'] == 1
+
+
+def test_hard_revocation_ignores_the_grace_window(make_list):
+    revoked = make_list()
+    revoked.rotate('jti-1', time.time() + 60, grace=10)
+    revoked.revoke('jti-1', time.time() + 60)
+    assert revoked.is_revoked('jti-1', grace=10)
+    assert not revoked.rotate('jti-1', time.time() + 60, grace=10)
+
+
+def test_workers_sharing_a_directory_see_each_others_revocations(tmp_path):
+    first, second = RevocationList(directory=str(tmp_path)), RevocationList(directory=str(tmp_path))
+    first.revoke('family:abc', time.time() + 60)
+    assert second.is_revoked('family:abc')
+    assert first.rotate('jti-1', time.time() + 60)
+    assert not second.rotate('jti-1', time.time() + 60)
+
+
+def test_expired_entries_are_dropped(make_list):
+    revoked = make_list()
+    revoked.revoke('jti-1', time.time() - 1)
+    assert not revoked.is_revoked('jti-1')
+    assert revoked.stats()['size'] == 0
@@ -0,0 +1,30 @@
+from site_cache import SiteCache
+from versions import DataVersions
+
+
+def test_row_read_before_a_write_is_never_served_after_it():
+    cache, versions = SiteCache(), DataVersions()
+    read_version = versions.site_version('S001')
+    # SELECT reads the old row, then the write commits and invalidates before the reader caches it
+    cache.invalidate('S001')
+    versions.bump('S001')
+    cache.set('S001', read_version, {'present_rent': 1000})
+
+    assert cache.get('S001', versions.site_version('S001')) is None
+    assert cache.stats()['size'] == 0
+
+
+def test_entries_hit_while_the_site_is_unchanged():
+    cache, versions = SiteCache(), DataVersions()
+    cache.set('S001', versions.site_version('S001'), {'present_rent': 1000})
+    versions.bump('S002')
+
+    assert cache.get(' s001', versions.site_version('S001')) == {'present_rent': 1000}
+
+
+def test_bulk_import_misses_every_entry():
+    cache, versions = SiteCache(), DataVersions()
+    cache.set('S001', versions.site_version('S001'), {'present_rent': 1000})
+    versions.bump_all()
+
+    assert cache.get('S001', versions.site_version('S001')) is None
@@ -0,0 +1,90 @@
+import threading
+import time
+from flask import Flask
+from search_index import SearchIndex
+from snapshot_refresh import SnapshotRefresher
+
+ROW = ('S001', 'Main St', 'Ravi Kumar', 'Anil', 'Sunita', 'GST1', 'PAN1')
+
+
+class SlowTable:
+    """Stands in for RENTDETAILS: each reload takes a while and is counted."""
+
+    def __init__(self, index, delay=0.05):
+        self.index = index
+        self.delay = delay
+        self.reads = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def reload(self):
+        as_of = time.monotonic()
+        self.reads += 1
+        self.release.wait(5)
+        time.sleep(self.delay)
+        self.index.load([ROW], as_of)
+
+
+def burst(app, refresher, count=20):
+    def read():
+        with app.app_context():
+            refresher.ensure()
+    threads = [threading.Thread(target=read) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def wait_idle(refresher):
+    deadline = time.monotonic() + 5
+    while refresher.stats()['refreshing'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_first_load_is_single_flight():
+    index = SearchIndex()
+    table = SlowTable(index)
+    burst(Flask(__name__), SnapshotRefresher('search_index', index, table.reload))
+
+    assert table.reads == 1
+    assert index.loaded and not index.stale
+
+
+def test_stale_snapshot_is_served_while_one_rebuild_runs():
+    app = Flask(__name__)
+    index = SearchIndex()
+    table = SlowTable(index)
+    refresher = SnapshotRefresher('search_index', index, table.reload)
+    refresher.refresh()
+
+    table.release.clear()
+    index.invalidate()
+    burst(app, refresher)
+
+    # Every reader returned without waiting for the rebuild, on the old index
+    assert index.stale
+    assert index.search('main', 10)[1] == 1
+    table.release.set()
+    wait_idle(refresher)
+    assert table.reads == 2
+    assert not index.stale
+
+
+def test_write_during_rebuild_keeps_snapshot_stale():
+    index = SearchIndex()
+    table = SlowTable(index)
+    refresher = SnapshotRefresher('search_index', index, table.reload)
+    refresher.refresh()
+
+    table.release.clear()
+    index.invalidate()
+    rebuild = threading.Thread(target=refresher.refresh)
+    rebuild.start()
+    while table.reads < 2:
+        time.sleep(0.01)
+    index.invalidate()  # committed after the rebuild read the table
+    table.release.set()
+    rebuild.join()
+
+    assert index.stale
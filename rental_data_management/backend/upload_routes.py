@@ -0,0 +1,103 @@
+import functools
+import logging
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from excel_import import SUPPORTED_EXTENSIONS, SheetReader, import_batches
+from extensions import get_db_connection
+from import_jobs import ImportJobManager, QueueFull
+from services import invalidate_all
+
+log = logging.getLogger('rental.api')
+
+bp = Blueprint('upload', __name__)
+
+def run_import_job(app, job):
+    """Parse, validate and insert a spooled upload on an import worker thread."""
+    # Streams the file in typed batches; raises on a missing required column
+    reader = SheetReader(job.path, job.options['chunk_size'])
+    job.ignored_columns = reader.ignored_columns
+    
+    with app.app_context():
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            # One lookup for existing SITEs and one multi-row insert per batch, in a single transaction
+            result = import_batches(cursor, reader, upsert=job.options['upsert'], progress=job.record_batch)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            job.errors = reader.errors
+            if 'cursor' in locals():
+                cursor.close()
+            conn.close()
+    
+    invalidate_all()
+    for key in ('rows_parsed', 'inserted', 'updated', 'skipped', 'errored'):
+        setattr(job, key, result[key])
+    job.message = f"Data uploaded successfully. {result['inserted']} new records inserted."
+    if job.options['upsert']:
+        job.message += f" {result['updated']} existing records updated."
+
+@bp.record_once
+def create_import_jobs(state):
+    # One job queue per app; jobs run in that app's context on its import workers
+    app = state.app
+    app.extensions['import_jobs'] = ImportJobManager(
+        functools.partial(run_import_job, app),
+        max_workers=app.config['IMPORT_WORKERS'],
+        max_pending=app.config['IMPORT_QUEUE_SIZE'],
+        spool_dir=app.config['UPLOAD_SPOOL_DIR']
+    )
+
+@bp.route('/api/upload', methods=['POST'])
+@jwt_required()
+def upload_excel():
+    if 'file' not in request.files:
+        return jsonify({'message': 'No file uploaded'}), 400
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'message': 'No file selected'}), 400
+    
+    if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        return jsonify({'message': 'Invalid file format'}), 400
+    
+    options = {'upsert': request.form.get('mode', 'insert') == 'upsert'}
+    try:
+        options['chunk_size'] = max(1, int(request.form.get('chunk_size', current_app.config['UPLOAD_CHUNK_SIZE'])))
+    except ValueError:
+        return jsonify({'message': 'chunk_size must be an integer'}), 400
+    
+    # Spool to disk and import in the background; poll GET /api/upload/<job_id>
+    try:
+        job = current_app.extensions['import_jobs'].submit(file, options, submitted_by=get_jwt_identity())
+    except QueueFull as e:
+        return jsonify({'message': str(e)}), 503
+    except Exception as e:
+        log.exception("Upload error")
+        return jsonify({'message': f'Error uploading data: {str(e)}'}), 400
+    
+    return jsonify(dict(job.to_dict(), message='Upload accepted')), 202
+
+@bp.route('/api/upload/<job_id>', methods=['GET'])
+@jwt_required()
+def get_upload_status(job_id):
+    job = current_app.extensions['import_jobs'].get(job_id)
+    if job is None:
+        return jsonify({'message': 'Upload job not found'}), 404
+    return jsonify(job.to_dict()), 200
+
+@bp.route('/api/upload/<job_id>', methods=['DELETE'])
+@jwt_required()
+def cancel_upload(job_id):
+    jobs = current_app.extensions['import_jobs']
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'message': 'Upload job not found'}), 404
+    # Only the user who uploaded the file, or an admin, may stop its import
+    if job.submitted_by != get_jwt_identity() and get_jwt().get('role') != 'admin':
+        return jsonify({'message': 'Only the uploader can cancel this import'}), 403
+    job = jobs.cancel(job_id)
+    return jsonify(job.to_dict()), 200
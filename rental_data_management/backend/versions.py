@@ -0,0 +1,56 @@
+import secrets
+import threading
+import time
+from datetime import date
+from site_cache import cache_key
+
+
+class DataVersions:
+    """Version counters for RENTDETAILS, used to build ETags for API responses.
+
+    Every write bumps the table version and the versions of the sites it
+    touched; bulk imports start a new generation instead of listing sites.
+    ETags also carry today's date (site payloads include date-relative fields)
+    and a max_age time window, because counters are per process: with several
+    workers a write seen by one of them reaches the others' ETags within
+    max_age seconds, the same bound as the site cache TTL.
+    """
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._boot = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._table = 0
+        self._generation = 0
+        self._sites = {}
+
+    def bump(self, *site_ids):
+        with self._lock:
+            self._table += 1
+            for site_id in site_ids:
+                if site_id:
+                    self._sites[cache_key(site_id)] = self._table
+
+    def bump_all(self):
+        with self._lock:
+            self._table += 1
+            self._generation += 1
+            self._sites.clear()
+
+    def _suffix(self):
+        window = int(time.time() // self.max_age) if self.max_age else 0
+        return f"{window}.{date.today().isoformat()}"
+
+    def table_etag(self):
+        """ETag for responses built from the whole table (listings, reports)."""
+        with self._lock:
+            version = self._table
+        return f"{self._boot}.t{version}.{self._suffix()}"
+
+    def site_version(self, site_id):
+        """The current version of one site; any write to it, or a bulk import, changes it."""
+        with self._lock:
+            return f"g{self._generation}.s{self._sites.get(cache_key(site_id), 0)}"
+
+    def site_etag(self, site_id, version=None):
+        return f"{self._boot}.{version or self.site_version(site_id)}.{self._suffix()}"
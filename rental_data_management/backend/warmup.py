@@ -0,0 +1,75 @@
+import logging
+import threading
+import time
+
+log = logging.getLogger('rental.api')
+
+
+class Warmup:
+    """Runs a worker's warm-up steps once, in order, retrying until each succeeds.
+
+    Steps are (name, fn) pairs such as priming the DB pool and loading the
+    in-memory indexes, run inside context() (e.g. an app context) if given.
+    The readiness endpoint reports ready only after every step has completed,
+    so a load balancer keeps traffic away from a worker that would answer its
+    first requests cold (or not at all, if MySQL is down).
+    """
+
+    def __init__(self, context=None, retry_interval=5):
+        self.context = context
+        self.retry_interval = retry_interval
+        self.steps = []
+        self.results = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+
+    def add(self, name, fn):
+        self.steps.append((name, fn))
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def start(self):
+        """Start warming up on a background thread (idempotent)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+                self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _run(self):
+        if self.context is not None:
+            with self.context():
+                return self._run_steps()
+        return self._run_steps()
+
+    def _run_steps(self):
+        for name, fn in self.steps:
+            attempts = 0
+            while True:
+                attempts += 1
+                start = time.perf_counter()
+                try:
+                    fn()
+                except Exception as e:
+                    log.warning("Warm-up step %s failed (attempt %d): %s", name, attempts, e)
+                    with self._lock:
+                        self.results[name] = {'done': False, 'attempts': attempts, 'error': str(e)}
+                    time.sleep(self.retry_interval)
+                    continue
+                with self._lock:
+                    self.results[name] = {'done': True, 'attempts': attempts,
+                                          'ms': round((time.perf_counter() - start) * 1000, 3)}
+                break
+        self._done.set()
+        log.info("Warm-up complete", extra={'fields': {'steps': self.status()['steps']}})
+
+    def status(self):
+        with self._lock:
+            steps = {name: dict(self.results.get(name, {'done': False, 'attempts': 0})) for name, _ in self.steps}
+        return {'ready': self.ready, 'started': self._thread is not None, 'steps': steps}
@@ -0,0 +1,79 @@
+// Shared authentication helpers for the logged-in pages
+
+const API_BASE = 'http://localhost:5000';
+
+let refreshInFlight = null;
+
+function clearSession() {
+    localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
+    localStorage.removeItem('user');
+}
+
+// Exchange the refresh token for a new token pair; concurrent callers share one request
+function refreshSession() {
+    if(!refreshInFlight) {
+        refreshInFlight = (async () => {
+            const refreshToken = localStorage.getItem('refresh_token');
+            if(!refreshToken) {
+                return false;
+            }
+            const response = await fetch(`${API_BASE}/api/auth/refresh`, {
+                method: 'POST',
+                headers: {
+                    'Authorization': `Bearer ${refreshToken}`
+                }
+            });
+            if(!response.ok) {
+                return false;
+            }
+            const data = await response.json();
+            localStorage.setItem('token', data.access_token);
+            localStorage.setItem('refresh_token', data.refresh_token);
+            return true;
+        })().finally(() => {
+            refreshInFlight = null;
+        });
+    }
+    return refreshInFlight;
+}
+
+// fetch() with the access token attached, refreshing it once if it has expired
+async function authFetch(url, options = {}) {
+    const send = () => fetch(url, {
+        ...options,
+        headers: {
+            ...options.headers,
+            'Authorization': `Bearer ${localStorage.getItem('token')}`
+        }
+    });
+
+    let response = await send();
+    if(response.status === 401 && await refreshSession()) {
+        response = await send();
+    }
+    if(response.status === 401) {
+        alert('Your session has expired. Please log in again.');
+        clearSession();
+        window.location.href = 'index.html';
+    }
+    return response;
+}
+
+async function logout() {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if(refreshToken) {
+        try {
+            await fetch(`${API_BASE}/api/auth/logout`, {
+                method: 'POST',
+                headers: {
+                    'Authorization': `Bearer ${refreshToken}`
+                }
+            });
+        } catch(error) {
+            console.error('Logout error:', error);
+        }
+    }
+    clearSession();
+    window.location.href = 'index.html';
+}
@@ -8,33 +8,17 @@ document.addEventListener('DOMContentLoaded', function() {
         return;
     }
 
-    // Function to handle unauthorized responses
-    async function handleUnauthorized() {
-        alert('Your session has expired. Please log in again.');
-        localStorage.removeItem('token');
-        localStorage.removeItem('user');
-        window.location.href = 'index.html';
-    }
-
-    // Function to make authenticated API calls
+    // Function to make authenticated API calls (expired access tokens are refreshed by authFetch)
     async function makeAuthenticatedRequest(url, options = {}) {
-        const token = localStorage.getItem('token');
-        if (!token) {
-            handleUnauthorized();
-            return null;
-        }
-
-        const response = await fetch(url, {
+        const response = await authFetch(url, {
             ...options,
             headers: {
                 ...options.headers,
-                'Authorization': `Bearer ${token}`,
                 'Content-Type': 'application/json'
             }
         });
 
         if (response.status === 401) {
-            await handleUnauthorized();
             return null;
         }
 
@@ -262,9 +246,7 @@ document.addEventListener('DOMContentLoaded', function() {
     if(logoutLink) {
         logoutLink.addEventListener('click', function(e) {
             e.preventDefault();
-            localStorage.removeItem('token');
-            localStorage.removeItem('user');
-            window.location.href = 'index.html';
+            logout();
         });
     }
     
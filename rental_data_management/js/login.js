@@ -22,8 +22,9 @@ document.addEventListener('DOMContentLoaded', function() {
                 const data = await response.json();
                 
                 if(response.ok) {
-                    // Store the token and user data
+                    // Store the tokens and user data
                     localStorage.setItem('token', data.access_token);
+                    localStorage.setItem('refresh_token', data.refresh_token);
                     localStorage.setItem('user', JSON.stringify(data.user));
                     
                     // Redirect to dashboard
@@ -186,21 +186,28 @@ document.addEventListener('DOMContentLoaded', function() {
             formData.append('file', fileInput.files[0]);
             
             try {
-                const response = await fetch('http://localhost:5000/api/upload', {
+                const response = await authFetch('http://localhost:5000/api/upload', {
                     method: 'POST',
-                    headers: {
-                        'Authorization': `Bearer ${token}`
-                    },
                     body: formData
                 });
                 
                 const data = await response.json();
                 
-                if(response.ok) {
-                    alert('File uploaded successfully');
-                    uploadModal.style.display = 'none';
-                } else {
+                if(!response.ok) {
                     alert(data.message || 'Upload failed');
+                    return;
+                }
+                
+                // The import runs in the background; poll until it finishes
+                uploadModal.style.display = 'none';
+                const job = await waitForUploadJob(data.job_id);
+                
+                if(job.status === 'completed') {
+                    alert(job.message || 'File uploaded successfully');
+                } else if(job.status === 'cancelled') {
+                    alert('Upload was cancelled');
+                } else {
+                    alert(job.error || 'Upload failed');
                 }
             } catch(error) {
                 console.error('Upload error:', error);
@@ -209,6 +216,24 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
+    // Poll a background upload job until it completes, fails or is cancelled
+    async function waitForUploadJob(jobId) {
+        while(true) {
+            const response = await authFetch(`http://localhost:5000/api/upload/${jobId}`);
+            const job = await response.json();
+            
+            if(!response.ok) {
+                return { status: 'failed', error: job.message };
+            }
+            if(['completed', 'failed', 'cancelled'].includes(job.status)) {
+                return job;
+            }
+            
+            console.log(`Upload ${job.status}: ${job.rows_parsed} rows parsed, ${job.inserted} inserted`);
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+    
     // New Entry Form
     const newEntryForm = document.getElementById('newEntryForm');
     
@@ -228,11 +253,10 @@ document.addEventListener('DOMContentLoaded', function() {
                     `http://localhost:5000/api/sites/${siteId}` : 
                     'http://localhost:5000/api/sites';
                 
-                const response = await fetch(url, {
+                const response = await authFetch(url, {
                     method: siteId ? 'PUT' : 'POST',
                     headers: {
-                        'Content-Type': 'application/json',
-                        'Authorization': `Bearer ${token}`
+                        'Content-Type': 'application/json'
                     },
                     body: JSON.stringify(data)
                 });
@@ -298,11 +322,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // Fetch site data for editing
     async function fetchSiteData(siteId) {
         try {
-            const response = await fetch(`http://localhost:5000/api/sites?site_id=${siteId}`, {
-                headers: {
-                    'Authorization': `Bearer ${token}`
-                }
-            });
+            const response = await authFetch(`http://localhost:5000/api/sites?site_id=${siteId}`);
             
             const data = await response.json();
             
@@ -89,17 +89,15 @@ document.addEventListener('DOMContentLoaded', function() {
                     url.searchParams.append('lease_period', document.getElementById('leasePeriod').value);
                 }
                 
-                const response = await fetch(url, {
-                    headers: {
-                        'Authorization': `Bearer ${token}`
-                    }
-                });
+                // Stream rows as newline-delimited JSON so large reports render progressively
+                url.searchParams.append('format', 'ndjson');
                 
-                const data = await response.json();
+                const response = await authFetch(url);
                 
                 if(response.ok) {
-                    displayReportData(data.data, selectedReportType);
+                    await streamReportData(response, selectedReportType);
                 } else {
+                    const data = await response.json();
                     alert(data.message || 'Failed to generate report');
                 }
             } catch(error) {
@@ -141,35 +139,52 @@ document.addEventListener('DOMContentLoaded', function() {
     const exportBtn = document.querySelector('.btn-export');
     
     if(exportBtn) {
-        exportBtn.addEventListener('click', function() {
-            const table = document.getElementById('reportTable');
-            if(!table) return;
+        exportBtn.addEventListener('click', async function() {
+            const fromDate = document.getElementById('fromDate').value;
+            const toDate = document.getElementById('toDate').value;
             
-            // Create CSV content
-            let csv = [];
-            const rows = table.querySelectorAll('tr');
+            if(!fromDate || !toDate) {
+                alert('Please select both from and to dates');
+                return;
+            }
             
-            rows.forEach(row => {
-                const rowData = [];
-                row.querySelectorAll('th, td').forEach(cell => {
-                    rowData.push(cell.textContent);
-                });
-                csv.push(rowData.join(','));
-            });
+            // Full site rows in the upload layout, so the file can be edited and re-uploaded
+            const url = new URL('http://localhost:5000/api/reports/export');
+            url.searchParams.append('from_date', fromDate);
+            url.searchParams.append('to_date', toDate);
+            url.searchParams.append('format', 'xlsx');
             
-            // Create and download file
-            const blob = new Blob([csv.join('\n')], { type: 'text/csv' });
-            const url = window.URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = 'report.csv';
-            a.click();
-            window.URL.revokeObjectURL(url);
+            const selectedReportType = document.querySelector('input[name="reportType"]:checked').value;
+            if(selectedReportType === 'Lease Period Report' && document.getElementById('leasePeriod').value) {
+                url.searchParams.append('lease_period', document.getElementById('leasePeriod').value);
+            }
+            
+            try {
+                const response = await authFetch(url);
+                
+                if(!response.ok) {
+                    const data = await response.json();
+                    alert(data.message || 'Failed to export report');
+                    return;
+                }
+                
+                // Create and download file
+                const blob = await response.blob();
+                const blobUrl = window.URL.createObjectURL(blob);
+                const a = document.createElement('a');
+                a.href = blobUrl;
+                a.download = 'report.xlsx';
+                a.click();
+                window.URL.revokeObjectURL(blobUrl);
+            } catch(error) {
+                console.error('Report export error:', error);
+                alert('An error occurred while exporting the report');
+            }
         });
     }
     
-    // Display report data in table
-    function displayReportData(data, reportType) {
+    // Display report rows in the table as they arrive from the NDJSON stream
+    async function streamReportData(response, reportType) {
         const tableHead = document.querySelector('#reportTable thead tr');
         const tableBody = document.querySelector('#reportTable tbody');
         
@@ -178,24 +193,103 @@ document.addEventListener('DOMContentLoaded', function() {
         // Clear existing content
         tableHead.innerHTML = '';
         tableBody.innerHTML = '';
+        const oldFoot = document.querySelector('#reportTable tfoot');
+        if(oldFoot) oldFoot.remove();
         
-        // Add headers
-        const headers = Object.keys(data[0] || {});
-        headers.forEach(header => {
-            const th = document.createElement('th');
-            th.textContent = header.replace(/_/g, ' ').toUpperCase();
-            tableHead.appendChild(th);
-        });
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let headers = null;
+        let streamError = null;
+        let summary = null;
         
-        // Add data rows
-        data.forEach(row => {
-            const tr = document.createElement('tr');
-            headers.forEach(header => {
-                const td = document.createElement('td');
-                td.textContent = row[header];
-                tr.appendChild(td);
+        // Append one batch of complete lines to the table
+        function appendLines(lines) {
+            const fragment = document.createDocumentFragment();
+            lines.forEach(line => {
+                if(!line.trim()) return;
+                const row = JSON.parse(line);
+                
+                // A stream that fails after it started ends with an error record
+                if(row.error !== undefined && Object.keys(row).length === 1) {
+                    streamError = row.error;
+                    return;
+                }
+                
+                // A complete stream ends with the totals and REGION/DIV subtotals
+                if(row.summary !== undefined && Object.keys(row).length === 1) {
+                    summary = row.summary;
+                    return;
+                }
+                
+                // Add headers from the first row
+                if(!headers) {
+                    headers = Object.keys(row);
+                    headers.forEach(header => {
+                        const th = document.createElement('th');
+                        th.textContent = header.replace(/_/g, ' ').toUpperCase();
+                        tableHead.appendChild(th);
+                    });
+                }
+                
+                const tr = document.createElement('tr');
+                headers.forEach(header => {
+                    const td = document.createElement('td');
+                    td.textContent = row[header];
+                    tr.appendChild(td);
+                });
+                fragment.appendChild(tr);
             });
-            tableBody.appendChild(tr);
+            tableBody.appendChild(fragment);
+        }
+        
+        while(true) {
+            const { done, value } = await reader.read();
+            if(done) break;
+            
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();  // Keep the trailing partial line for the next chunk
+            appendLines(lines);
+        }
+        
+        buffer += decoder.decode();
+        appendLines([buffer]);
+        
+        if(summary && headers) {
+            renderSummary(summary, headers);
+        }
+        if(streamError) {
+            alert('The report is incomplete: ' + streamError);
+        }
+    }
+    
+    // Show subtotals and the grand total under the rows, in the columns they sum
+    function renderSummary(summary, headers) {
+        const tableFoot = document.createElement('tfoot');
+        
+        summary.subtotals.forEach(subtotal => {
+            const label = subtotal.level === 'region' ?
+                subtotal.region + ' total' :
+                subtotal.region + ' / ' + subtotal.div + ' subtotal';
+            tableFoot.appendChild(summaryRow(label, subtotal, headers));
+        });
+        tableFoot.appendChild(summaryRow('Grand total', summary.totals, headers));
+        
+        document.querySelector('#reportTable').appendChild(tableFoot);
+    }
+    
+    function summaryRow(label, entry, headers) {
+        const tr = document.createElement('tr');
+        headers.forEach((header, index) => {
+            const td = document.createElement('td');
+            if(index === 0) {
+                td.textContent = label + ' (' + entry.count + ' sites)';
+            } else if(entry[header] !== undefined) {
+                td.textContent = entry[header];
+            }
+            tr.appendChild(td);
         });
+        return tr;
     }
 }); 
\ No newline at end of file